@@ -188,18 +188,14 @@ class DbNode(m.Model):
         appropriate subclass.
         """
         from aiida.orm.node import Node
-        from aiida.common.old_pluginloader import from_type_to_pluginclassname
-        from aiida.common.pluginloader import load_plugin
+        from aiida.common.pluginloader import get_node_class
         from aiida.common import aiidalogger
 
         try:
-            pluginclassname = from_type_to_pluginclassname(self.type)
+            PluginClass = get_node_class(self.type)
         except DbContentError:
             raise DbContentError("The type name of node with pk= {} is "
                                  "not valid: '{}'".format(self.pk, self.type))
-
-        try:
-            PluginClass = load_plugin(Node, 'aiida.orm', pluginclassname)
         except MissingPluginError:
             aiidalogger.error("Unable to find plugin for type '{}' (node= {}), "
                               "will use base Node class".format(self.type, self.pk))
@@ -1115,23 +1111,41 @@ class DbAttributeBaseClass(DbMultipleValueAttributeBaseClass):
             stored in the Db table, correctly converted
             to the right type.
         """
-        dballsubvalues = cls.objects.filter(dbnode__id=dbnodepk).values_list(
-            'key', 'datatype', 'tval', 'fval',
-            'ival', 'bval', 'dval')
-
-        data = {_[0]: {
-            "datatype": _[1],
-            "tval": _[2],
-            "fval": _[3],
-            "ival": _[4],
-            "bval": _[5],
-            "dval": _[6],
-        } for _ in dballsubvalues
+        return cls.get_all_values_for_nodepks([dbnodepk])[dbnodepk]
+
+    @classmethod
+    def get_all_values_for_nodepks(cls, dbnodepks):
+        """
+        Return the attributes of many dbnodes, retrieved with a single query.
+
+        :param dbnodepks: an iterable of PKs of dbnodes
+        :return: a dictionary where the keys are the PKs, and each value is a
+            dictionary where each key is a level-0 attribute stored in the
+            Db table, correctly converted to the right type.
+        """
+        dbnodepks = list(dbnodepks)
+        data_by_pk = {pk: {} for pk in dbnodepks}
+        if dbnodepks:
+            dballsubvalues = cls.objects.filter(
+                dbnode__id__in=dbnodepks).values_list(
+                'dbnode_id', 'key', 'datatype', 'tval', 'fval',
+                'ival', 'bval', 'dval')
+
+            for _ in dballsubvalues:
+                data_by_pk[_[0]][_[1]] = {
+                    "datatype": _[2],
+                    "tval": _[3],
+                    "fval": _[4],
+                    "ival": _[5],
+                    "bval": _[6],
+                    "dval": _[7],
                 }
+
         try:
-            return deserialize_attributes(data, sep=cls._sep,
-                                          original_class=cls,
-                                          original_pk=dbnodepk)
+            return {pk: deserialize_attributes(data, sep=cls._sep,
+                                               original_class=cls,
+                                               original_pk=pk)
+                    for pk, data in data_by_pk.iteritems()}
         except DeserializationException as e:
             exc = DbContentError(e.message)
             exc.original_exception = e
@@ -1140,36 +1154,59 @@ class DbAttributeBaseClass(DbMultipleValueAttributeBaseClass):
     @classmethod
     def reset_values_for_node(cls, dbnode, attributes, with_transaction=True,
                               return_not_store=False):
-        from django.db import transaction
+        if return_not_store:
+            if isinstance(dbnode, (int, long)):
+                dbnode = DbNode(id=dbnode)
+            nodes_to_store = []
+            # create_value returns a list of nodes to store
+            for k, v in attributes.iteritems():
+                nodes_to_store.extend(
+                    cls.create_value(k, v,
+                                     subspecifier_value=dbnode,
+                                     ))
+            return nodes_to_store
 
-        # cls.validate_key(key)
+        cls.reset_values_for_nodes([(dbnode, attributes)],
+                                   with_transaction=with_transaction)
+
+    @classmethod
+    def reset_values_for_nodes(cls, attributes_by_node, with_transaction=True,
+                               delete_existing=True, batch_size=1000):
+        """
+        Replace all the attributes of many dbnodes, flattening them into a
+        single bulk insert (in batches of batch_size rows) preceded by a
+        single delete.
 
-        nodes_to_store = []
+        :param attributes_by_node: a list of (dbnode, attributes) pairs,
+          where dbnode is a DbNode or its PK and attributes a dictionary
+        :param with_transaction: True if you want this function to be managed
+          with transactions. Set to False if you already have a manual
+          management of transactions in the block where you are calling this
+          function (useful for speed improvements to avoid recursive
+          transactions)
+        :param delete_existing: if False, the existing attributes are not
+          deleted (e.g. for new nodes, that cannot have any)
+        :param batch_size: the number of rows inserted by each query
+        """
+        from django.db import transaction
 
         try:
             if with_transaction:
                 sid = transaction.savepoint()
 
-            if isinstance(dbnode, (int, long)):
-                dbnode_node = DbNode(id=dbnode)
-            else:
-                dbnode_node = dbnode
-
-            # create_value returns a list of nodes to store
-            for k, v in attributes.iteritems():
-                nodes_to_store.extend(
-                    cls.create_value(k, v,
-                                     subspecifier_value=dbnode_node,
-                                     ))
+            nodes_to_store = []
+            dbnode_pks = []
+            for dbnode, attributes in attributes_by_node:
+                nodes_to_store.extend(cls.reset_values_for_node(
+                    dbnode, attributes, return_not_store=True))
+                dbnode_pks.append(
+                    dbnode if isinstance(dbnode, (int, long)) else dbnode.pk)
 
-            if return_not_store:
-                return nodes_to_store
-            else:
-                # Reset. For set, use also a filter for key__in=attributes.keys()
-                cls.objects.filter(dbnode=dbnode_node).delete()
+            if delete_existing and dbnode_pks:
+                cls.objects.filter(dbnode__id__in=dbnode_pks).delete()
 
-                if nodes_to_store:
-                    cls.objects.bulk_create(nodes_to_store)
+            if nodes_to_store:
+                cls.objects.bulk_create(nodes_to_store, batch_size=batch_size)
 
             if with_transaction:
                 transaction.savepoint_commit(sid)
@@ -148,3 +148,25 @@ class TestDbExtrasDjango(AiidaTestCase):
         self.assertEquals(n1.dbnode.extras, new_attrs)
         # Also check that other nodes were not damaged
         self.assertEquals(n2.dbnode.extras, {'pippo2': [3, 4, 'b']})
+
+    def test_many_nodes(self):
+        from aiida.backends.djsite.db.models import DbExtra
+
+        n1 = Node().store()
+        n2 = Node().store()
+        n3 = Node().store()
+
+        DbExtra.set_value_for_node(n1.dbnode, "pippo", [1, 2, 'a'])
+        DbExtra.set_value_for_node(n3.dbnode, "pippo3", {'x': 1.5})
+
+        new_attrs_1 = {"newval1": "v", "newval2": [1, {"c": "d", "e": 2}]}
+        new_attrs_2 = {"newval3": 3}
+        # Nodes can be given either as DbNodes or as PKs
+        DbExtra.reset_values_for_nodes([(n1.dbnode, new_attrs_1),
+                                        (n2.pk, new_attrs_2)])
+
+        self.assertEquals(
+            DbExtra.get_all_values_for_nodepks([n1.pk, n2.pk, n3.pk]),
+            {n1.pk: new_attrs_1, n2.pk: new_attrs_2,
+             n3.pk: {'pippo3': {'x': 1.5}}})
+        self.assertEquals(DbExtra.get_all_values_for_nodepks([]), {})
@@ -85,57 +85,6 @@ class QueryManagerDjango(AbstractQueryManager):
         else:
             return queryresults
 
-    def get_creation_statistics(
-            self,
-            user_email=None
-    ):
-        """
-        Return a dictionary with the statistics of node creation, summarized by day,
-        optimized for the Django backend.
-
-        :note: Days when no nodes were created are not present in the returned `ctime_by_day` dictionary.
-
-        :param user_email: If None (default), return statistics for all users.
-            If an email is specified, return only the statistics for the given user.
-
-        :return: a dictionary as
-            follows::
-
-                {
-                   "total": TOTAL_NUM_OF_NODES,
-                   "types": {TYPESTRING1: count, TYPESTRING2: count, ...},
-                   "ctime_by_day": {'YYYY-MMM-DD': count, ...}
-
-            where in `ctime_by_day` the key is a string in the format 'YYYY-MM-DD' and the value is
-            an integer with the number of nodes created that day.
-        """
-        import sqlalchemy as sa
-        from aiida.backends.djsite.querybuilder_django import dummy_model
-
-        # Get the session (uses internally aldjemy - so, sqlalchemy) also for the Djsite backend
-        s = dummy_model.get_aldjemy_session()
-
-        retdict = {}
-
-        # Total number of nodes
-        retdict["total"] = s.query(dummy_model.DbNode).count()
-
-        # Nodes per type
-        retdict["types"] = dict(s.query(dummy_model.DbNode.type.label('typestring'),
-            sa.func.count(dummy_model.DbNode.id)).group_by('typestring').all())
-
-        # Nodes created per day
-        stat = s.query(sa.func.date_trunc('day', dummy_model.DbNode.ctime).label('cday'),
-                       sa.func.count(dummy_model.DbNode.id)).group_by('cday').order_by('cday').all()
-
-        ctime_by_day = {_[0].strftime('%Y-%m-%d'): _[1] for _ in stat}
-        retdict["ctime_by_day"] = ctime_by_day
-
-        return retdict
-        # Still not containing all dates
-            # temporary fix only for DJANGO backend
-            # Will be useless when the _join_ancestors method of the QueryBuilder
-            # will be re-implemented without using the DbPath
     def query_past_days(self, q_object, args):
         """
         Subselect to filter data nodes by their age.
@@ -34,6 +34,9 @@ from aiida.common.exceptions import (
     )
 
 class QueryBuilderImplDjango(QueryBuilderInterface):
+    # An attribute (or extra) is projected as the PK of its DbAttribute
+    # (DbExtra) row, functions and groupings would act on the PKs
+    supports_funcs_on_attributes = False
 
     def __init__(self, *args, **kwargs):
         #~ from aiida.orm.implementation.django.node import Node as AiidaNode
@@ -645,8 +648,63 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
         with transaction.atomic():
             return query.first()
 
+    def get_aiida_res_column(self, key, column):
+        """
+        Convert many values returned by the query for the same key. The
+        attributes and extras, for which the query returns the PK of the
+        DbAttribute/DbExtra (or of the node, if all of them are projected),
+        are retrieved with a single query.
+        """
+        if key in ('attributes', 'extras'):
+            attribute_class = DbAttribute if key == 'attributes' else DbExtra
+            all_values = attribute_class.get_all_values_for_nodepks(
+                set(column))
+            return [all_values[res] for res in column]
+        elif key.startswith('attributes.') or key.startswith('extras.'):
+            attribute_class = (DbAttribute if key.startswith('attributes.')
+                               else DbExtra)
+            values = {
+                attribute.id: attribute.getvalue()
+                for attribute in attribute_class.objects.filter(
+                    id__in=[res for res in column if res is not None])
+            }
+            # Missing attributes are returned as None, as in get_aiida_res
+            return [values.get(res) for res in column]
+        elif key in ('_metadata', 'transport_params'):
+            return [self.get_aiida_res(key, res) for res in column]
+        return super(QueryBuilderImplDjango, self).get_aiida_res_column(
+            key, column)
+
+    def _get_all_values_in_rows(self, tag_to_index_dict, rows):
+        """
+        For the columns where all the attributes (or extras) of the nodes
+        are projected, the query returns the PK of the node, and for those
+        where a single attribute (or extra) is projected, the PK of the
+        DbAttribute (DbExtra). Here I retrieve them for all the given rows
+        at once, with one query per column, instead of one query per row.
+
+        :returns: a dictionary column index -> {PK: value}
+        """
+        all_values = {}
+        for colindex, key in tag_to_index_dict.items():
+            if key == 'attributes':
+                attribute_class = DbAttribute
+            elif key == 'extras':
+                attribute_class = DbExtra
+            elif key.startswith('attributes.') or key.startswith('extras.'):
+                column = [row[colindex] for row in rows]
+                all_values[colindex] = dict(
+                    zip(column, self.get_aiida_res_column(key, column)))
+                continue
+            else:
+                continue
+            all_values[colindex] = attribute_class.get_all_values_for_nodepks(
+                set(row[colindex] for row in rows))
+        return all_values
+
     def iterall(self, query, batch_size, tag_to_index_dict):
         from django.db import transaction
+        from aiida.common.utils import grouper
 
         with transaction.atomic():
             results = query.yield_per(batch_size)
@@ -656,20 +714,24 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
                 # if you have provided an ormclass
 
                 if tag_to_index_dict.values() == ['*']:
-                    for rowitem in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                    rows = ([rowitem] for rowitem in results)
                 else:
-                    for rowitem, in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                    rows = ([rowitem] for rowitem, in results)
             elif len(tag_to_index_dict) > 1:
-                for resultrow in results:
+                rows = results
+            else:
+                raise Exception("Got an empty dictionary: {}".format(tag_to_index_dict))
+
+            for chunk in grouper(batch_size or 100, rows):
+                all_values = self._get_all_values_in_rows(tag_to_index_dict, chunk)
+                for resultrow in chunk:
                     yield [
-                        self.get_aiida_res(tag_to_index_dict[colindex], rowitem)
+                        all_values[colindex][rowitem]
+                        if colindex in all_values
+                        else self.get_aiida_res(tag_to_index_dict[colindex], rowitem)
                         for colindex, rowitem
                         in enumerate(resultrow)
                     ]
-            else:
-                raise Exception("Got an empty dictionary: {}".format(tag_to_index_dict))
 
 
     def iterdict(self, query, batch_size, tag_to_projected_entity_dict):
@@ -115,8 +115,11 @@ class AbstractQueryManager(object):
     ):
         """
         Return a dictionary with the statistics of node creation, summarized by day.
+        The counting is done in the database, with the aggregation functions
+        of the QueryBuilder (see :func:`QueryBuilder.group_by`).
 
-        :note: Days when no nodes were created are not present in the returned `ctime_by_day` dictionary.
+        :note: Days between the first and the last creation date when no nodes were created
+            are present in the returned `ctime_by_day` dictionary with a count of 0.
 
         :param user_email: If None (default), return statistics for all users.
             If an email is specified, return only the statistics for the given user.
@@ -134,57 +137,51 @@ class AbstractQueryManager(object):
         """
         from aiida.orm.querybuilder import QueryBuilder as QB
         from aiida.orm import User, Node
-        from collections import Counter
         import datetime
 
-        def count_statistics(dataset):
-
-            def get_statistics_dict(dataset):
-                results = {}
-                for count, typestring in sorted(
-                        (v, k) for k, v in dataset.iteritems())[::-1]:
-                    results[typestring] = count
-                return results
-
-            count_dict = {}
-
-            types = Counter([r[2] for r in dataset])
-            count_dict["types"] = get_statistics_dict(types)
-
-            ctimelist = [r[1].strftime("%Y-%m-%d") for r in dataset]
-            ctime = Counter(ctimelist)
-
-            if len(ctimelist) > 0:
-
-                # For the way the string is formatted, we can just sort it alphabetically
-                firstdate = datetime.datetime.strptime(sorted(ctimelist)[0], '%Y-%m-%d')
-                lastdate = datetime.datetime.strptime(sorted(ctimelist)[-1], '%Y-%m-%d')
-
-                curdate = firstdate
-                outdata = {}
-
-                while curdate <= lastdate:
-                    curdatestring = curdate.strftime('%Y-%m-%d')
-                    outdata[curdatestring] = ctime.get(curdatestring, 0)
-                    curdate += datetime.timedelta(days=1)
-                count_dict["ctime_by_day"] = outdata
-
-            else:
-                count_dict["ctime_by_day"] = {}
-
-            return count_dict
+        def get_query(project, group_by):
+            """
+            Return a query counting the nodes (of the given user, if any),
+            grouped by the given entity.
+            """
+            q = QB()
+            q.append(Node, project=[project, {'id': {'func': 'count'}}],
+                     tag='node')
+            if user_email is not None:
+                q.append(User, creator_of='node',
+                         filters={'email': user_email})
+            q.group_by({'node': [group_by]})
+            return q
 
         statistics = {}
 
-        q = QB()
-        q.append(Node, project=['id', 'ctime', 'type'], tag='node')
-        if user_email is not None:
-            q.append(User, creator_of='node', project='email', filters={'email': user_email})
-        qb_res = q.all()
-
-        # total count
-        statistics["total"] = len(qb_res)
-        statistics.update(count_statistics(qb_res))
+        # The counting is done by the database, only one row per type
+        # and one row per day are returned
+        types = dict(get_query('type', 'type').all())
+        statistics["total"] = sum(types.values())
+        statistics["types"] = types
+
+        ctime_date = {'ctime': {'func': 'date'}}
+        ctime = {
+            date.strftime('%Y-%m-%d'): count for date, count
+            in get_query(ctime_date, ctime_date).all()
+        }
+
+        if ctime:
+            # For the way the string is formatted, we can just sort it alphabetically
+            firstdate = datetime.datetime.strptime(min(ctime), '%Y-%m-%d')
+            lastdate = datetime.datetime.strptime(max(ctime), '%Y-%m-%d')
+
+            curdate = firstdate
+            outdata = {}
+
+            while curdate <= lastdate:
+                curdatestring = curdate.strftime('%Y-%m-%d')
+                outdata[curdatestring] = ctime.get(curdatestring, 0)
+                curdate += datetime.timedelta(days=1)
+            statistics["ctime_by_day"] = outdata
+        else:
+            statistics["ctime_by_day"] = {}
 
         return statistics
 
@@ -311,5 +308,6 @@ class AbstractQueryManager(object):
         qb = QueryBuilder()
         qb.append(Node, tag='low_node',
                   filters={'id': {'in': node_pks}})
-        qb.append(Node, ancestor_of='low_node', project=return_values)
+        qb.append(Node, ancestor_of='low_node', project=return_values,
+                  distinct_walk=True)
         return qb.all()
@@ -12,6 +12,10 @@ from abc import abstractmethod, ABCMeta
 
 class QueryBuilderInterface():
     __metaclass__ = ABCMeta
+    # Whether functions (e.g. aggregates) can be applied to attributes and
+    # extras, and whether they can be used to group by
+    supports_funcs_on_attributes = True
+
     @abstractmethod
     def __init__(self, *args, **kwargs):
         pass
@@ -143,6 +147,26 @@ class QueryBuilderInterface():
         """
         pass
 
+    def get_aiida_res_column(self, key, column):
+        """
+        Convert with :meth:`.get_aiida_res` many values returned by the
+        query for the same key (a column of results). Plain python values
+        (numbers, strings, dates) are returned as they are. Backends can
+        override this method to convert all the values at once.
+
+        :param key: the key that these entries would be returned with
+        :param column: a sequence of results returned by the query
+
+        :returns: a sequence of aiida-compatible instances
+        """
+        from datetime import datetime
+
+        plain_types = (int, long, float, bool, basestring, datetime,
+                       type(None))
+        if all(isinstance(res, plain_types) for res in column):
+            return column
+        return [self.get_aiida_res(key, res) for res in column]
+
     @abstractmethod
     def get_ormclass(self,  cls, ormclasstype):
         pass
@@ -166,6 +190,34 @@ class QueryBuilderInterface():
         """
         pass
 
+    def estimate_count(self, query):
+        """
+        Estimate the number of results with the planner of the database,
+        i.e. from the table statistics (as in ``pg_class.reltuples``)
+        and the selectivity of the filters, without executing the query.
+        Both backends use PostgreSQL, so this is implemented here.
+
+        :param query: an instance of sqlalchemy.orm.Query
+
+        :returns: the estimated number of results
+        """
+        import json
+        from sqlalchemy.dialects import postgresql
+
+        compiled = query.statement.compile(dialect=postgresql.dialect())
+        try:
+            # Executed on the DBAPI connection, so that the parameters use
+            # the paramstyle of the compiled statement
+            plan = self.get_session().connection().execute(
+                u'EXPLAIN (FORMAT JSON) ' + compiled.string,
+                compiled.params).scalar()
+        except Exception as e:
+            self.get_session().rollback()
+            raise e
+        if isinstance(plan, basestring):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
     @abstractmethod
     def first(self):
         """
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Add the current_state column to the dbnode table
+
+Revision ID: b4f1a8e3c2d7
+Revises: 89176227b25
+Create Date: 2017-11-20 16:12:04.327195
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm.session import Session
+from aiida.backends.sqlalchemy.utils import (install_current_state_trigger,
+                                             get_state_order_sql)
+
+# revision identifiers, used by Alembic.
+revision = 'b4f1a8e3c2d7'
+down_revision = '89176227b25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('db_dbnode', sa.Column('current_state',
+                                         sa.VARCHAR(length=255),
+                                         nullable=True))
+    op.create_index('ix_db_dbnode_current_state', 'db_dbnode',
+                    ['current_state'])
+
+    # Fill in the most recent state of all the nodes that have one
+    conn = op.get_bind()
+    conn.execute("""
+        UPDATE db_dbnode SET current_state = latest.state
+        FROM (
+            SELECT DISTINCT ON (dbnode_id) dbnode_id, state
+            FROM db_dbcalcstate
+            ORDER BY dbnode_id, {}
+        ) AS latest
+        WHERE db_dbnode.id = latest.dbnode_id
+        """.format(get_state_order_sql('state')))
+
+    # I get the session using the alembic connection
+    # (Keep in mind that alembic uses the AiiDA SQLA
+    # session)
+    session = Session(bind=op.get_bind())
+    install_current_state_trigger(session)
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute("DROP TRIGGER IF EXISTS autoupdate_current_state ON db_dbcalcstate")
+    conn.execute("DROP FUNCTION IF EXISTS update_current_state()")
+    op.drop_index('ix_db_dbnode_current_state', 'db_dbnode')
+    op.drop_column('db_dbnode', 'current_state')
@@ -8,7 +8,7 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 
-from sqlalchemy import ForeignKey, select, func, join, and_, case
+from sqlalchemy import ForeignKey, select
 from sqlalchemy.orm import (
     relationship, backref, Query, mapper,
     foreign, aliased
@@ -28,7 +28,7 @@ from aiida.backends.sqlalchemy.models.base import Base, _QueryProperty, _AiidaQu
 from aiida.backends.sqlalchemy.models.utils import uuid_func
 
 from aiida.common import aiidalogger
-from aiida.common.pluginloader import load_plugin
+from aiida.common.pluginloader import get_node_class
 from aiida.common.exceptions import DbContentError, MissingPluginError
 from aiida.common.datastructures import calc_states, _sorted_datastates, sort_states
 
@@ -84,6 +84,12 @@ class DbNode(Base):
     attributes = Column(JSONB)
     extras = Column(JSONB)
 
+    # The most recent state in DbCalcState, kept up to date by a database
+    # trigger (see aiida.backends.sqlalchemy.utils.install_current_state_trigger)
+    # so that the state can be queried without scanning DbCalcState
+    current_state = Column(ChoiceType((_, _) for _ in calc_states),
+                           index=True, nullable=True)
+
     dbcomputer_id = Column(
         Integer,
         ForeignKey('db_dbcomputer.id', deferrable=True, initially="DEFERRED", ondelete="RESTRICT"),
@@ -152,17 +158,13 @@ class DbNode(Base):
         Return the corresponding aiida instance of class aiida.orm.Node or a
         appropriate subclass.
         """
-        from aiida.common.old_pluginloader import from_type_to_pluginclassname
         from aiida.orm.node import Node
 
         try:
-            pluginclassname = from_type_to_pluginclassname(self.type)
+            PluginClass = get_node_class(self.type)
         except DbContentError:
             raise DbContentError("The type name of node with pk= {} is "
                                  "not valid: '{}'".format(self.pk, self.type))
-
-        try:
-            PluginClass = load_plugin(Node, 'aiida.orm', pluginclassname)
         except MissingPluginError:
             aiidalogger.error("Unable to find plugin for type '{}' (node= {}), "
                               "will use base Node class".format(self.type, self.pk))
@@ -303,52 +305,10 @@ class DbNode(Base):
         """
         Return the expression to get the 'latest' state from DbCalcState,
         to be used in queries, where 'latest' is defined using the state order
-        defined in _sorted_datastates.
+        defined in _sorted_datastates. This is the current_state column,
+        that is updated by the database whenever the states change.
         """
-        # Sort first the latest states
-        whens = {
-            v: idx for idx, v
-            in enumerate(_sorted_datastates[::-1], start=1)}
-        custom_sort_order = case(value=DbCalcState.state,
-                                 whens=whens,
-                                 else_=100) # else: high value to put it at the bottom
-
-        # Add numerical state to string, to allow to sort them
-        states_with_num = select([
-            DbCalcState.id.label('id'),
-            DbCalcState.dbnode_id.label('dbnode_id'),
-            DbCalcState.state.label('state_string'),
-            custom_sort_order.label('num_state')
-        ]).select_from(DbCalcState).alias()
-
-        # Get the most 'recent' state (using the state ordering, and the min function) for
-        # each calc
-        calc_state_num = select([
-            states_with_num.c.dbnode_id.label('dbnode_id'),
-            func.min(states_with_num.c.num_state).label('recent_state')
-        ]).group_by(states_with_num.c.dbnode_id).alias()
-
-        # Join the most-recent-state table with the DbCalcState table
-        all_states_q = select([
-            DbCalcState.dbnode_id.label('dbnode_id'),
-            DbCalcState.state.label('state_string'),
-            calc_state_num.c.recent_state.label('recent_state'),
-            custom_sort_order.label('num_state'),
-        ]).select_from(#DbCalcState).alias().join(
-            join(DbCalcState, calc_state_num, DbCalcState.dbnode_id == calc_state_num.c.dbnode_id)).alias()
-
-        # Get the association between each calc and only its corresponding most-recent-state row
-        subq = select([
-            all_states_q.c.dbnode_id.label('dbnode_id'),
-            all_states_q.c.state_string.label('state')
-        ]).select_from(all_states_q).where(all_states_q.c.num_state == all_states_q.c.recent_state).alias()
-
-        # Final filtering for the actual query
-        return select([subq.c.state]).\
-            where(
-                    subq.c.dbnode_id == cls.id,
-                ).\
-            label('laststate')
+        return cls.current_state.label('laststate')
 
 
 class DbLink(Base):
@@ -156,3 +156,39 @@ class TestDbExtrasSqla(AiidaTestCase):
         self.assertEquals(n1.get_extras(), new_attrs)
         # Also check that other nodes were not damaged
         self.assertEquals(n2.get_extras(), {'pippo2': [3, 4, 'b']})
+
+
+class TestJsonSerializationSqla(AiidaTestCase):
+    """
+    Test the (de)serialization of the JSONB columns.
+    """
+
+    def test_datetime_roundtrip(self):
+        import datetime
+        from pytz import UTC
+        from aiida.backends.sqlalchemy.utils import dumps_json, loads_json
+
+        data = {
+            'aware': datetime.datetime(2017, 1, 2, 3, 4, 5, 6789, tzinfo=UTC),
+            'naive': datetime.datetime(2017, 1, 2, 3, 4, 5, 1),
+            'nested': [{'date': datetime.datetime(2000, 12, 31, 23, 59, 59,
+                                                  999999, tzinfo=UTC)}],
+            'symbols': ['Si', 'Ge', '2017-01-02'],
+            'number': 1.5,
+        }
+        self.assertEquals(loads_json(dumps_json(data)), data)
+
+    def test_loads_existing_strings(self):
+        from dateutil import parser
+        from aiida.backends.sqlalchemy.utils import loads_json
+
+        # Strings stored with other precisions are still parsed as datetimes
+        s = '{"a": ["2017-01-02T03:04:05.12+01:00", "x"], "b": null}'
+        self.assertEquals(loads_json(s), {
+            'a': [parser.parse("2017-01-02T03:04:05.12+01:00"), 'x'],
+            'b': None})
+
+        # Payloads without datetimes are returned as decoded
+        s = '{"a": ["2017-01-02", "T"], "b": {"c": 1}}'
+        self.assertEquals(loads_json(s), {'a': ['2017-01-02', 'T'],
+                                          'b': {'c': 1}})
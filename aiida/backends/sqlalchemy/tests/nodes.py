@@ -341,3 +341,52 @@ class TestNodeBasicSQLA(AiidaTestCase):
         self.assertEqual(len(res), 1,
                          "There should be a node in the session/DB with the "
                          "UUID {}".format(node_uuid))
+
+
+class TestCurrentStateSQLA(AiidaTestCase):
+    """
+    Check that the current_state column of DbNode is kept in sync with
+    the DbCalcState table by the database trigger.
+    """
+    def test_current_state(self):
+        from aiida.orm import JobCalculation
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.common.datastructures import calc_states
+        from aiida.backends.sqlalchemy import get_scoped_session
+        from aiida.backends.sqlalchemy.models.node import DbNode
+
+        session = get_scoped_session()
+
+        c = JobCalculation(computer=self.computer,
+                           resources={
+                               'num_machines': 1,
+                               'num_mpiprocs_per_machine': 1}
+                           )
+        c.store()
+
+        def get_current_state():
+            return session.query(DbNode.current_state).filter(
+                DbNode.id == c.pk).one()[0].code
+
+        self.assertEquals(get_current_state(), calc_states.NEW)
+
+        c._set_state(calc_states.TOSUBMIT)
+        self.assertEquals(get_current_state(), calc_states.TOSUBMIT)
+
+        c._set_state(calc_states.SUBMITTING)
+        self.assertEquals(get_current_state(), calc_states.SUBMITTING)
+
+        # The QueryBuilder filters on the state through the new column
+        qb = QueryBuilder()
+        qb.append(JobCalculation,
+                  filters={'id': c.pk,
+                           'state': {'==': calc_states.SUBMITTING}},
+                  project=['id'])
+        self.assertEquals(qb.all(), [[c.pk]])
+
+        qb = QueryBuilder()
+        qb.append(JobCalculation,
+                  filters={'id': c.pk,
+                           'state': {'==': calc_states.TOSUBMIT}},
+                  project=['id'])
+        self.assertEquals(qb.count(), 0)
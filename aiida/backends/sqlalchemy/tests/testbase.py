@@ -19,7 +19,7 @@ from aiida.backends.settings import AIIDADB_PROFILE
 from aiida.backends.sqlalchemy.models.base import Base
 from aiida.backends.sqlalchemy.models.computer import DbComputer
 from aiida.backends.sqlalchemy.models.user import DbUser
-from aiida.backends.sqlalchemy.utils import install_tc
+from aiida.backends.sqlalchemy.utils import install_current_state_trigger
 from aiida.backends.testimplbase import AiidaTestImplementation
 from aiida.common.setup import get_profile_config
 from aiida.common.utils import get_configured_user_email
@@ -63,7 +63,7 @@ class SqlAlchemyTests(AiidaTestImplementation):
         if self.drop_all:
             Base.metadata.drop_all(self.test_session.connection)
             Base.metadata.create_all(self.test_session.connection)
-            install_tc(self.test_session.connection)
+            install_current_state_trigger(self.test_session.connection)
         else:
             self.clean_db()
 
@@ -17,10 +17,12 @@ try:
     # using
     json_dumps = partial(json.dumps, double_precision=15)
     json_loads = partial(json.loads, precise_float=True)
+    _json_supports_default = False
 except ImportError:
     import json
     json_dumps = json.dumps
     json_loads = json.loads
+    _json_supports_default = True
 
 import datetime
 
@@ -30,6 +32,7 @@ from alembic.config import Config
 from alembic.runtime.environment import EnvironmentContext
 from alembic.script import ScriptDirectory
 from dateutil import parser
+from dateutil.tz import tzoffset, tzutc
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session
 from sqlalchemy.orm import sessionmaker
@@ -150,10 +153,23 @@ def set_daemon_user(user_email):
                                    "AiiDA daemon on this DB instance")
 
 
+def _datetime_to_json(v):
+    """
+    Hook for the JSON encoder: serialize datetime objects in isoformat
+    """
+    if isinstance(v, datetime.datetime):
+        return v.isoformat()
+    raise TypeError("{!r} is not JSON serializable".format(v))
+
+
 def dumps_json(d):
     """
     Transforms all datetime object into isoformat and then returns the JSON
     """
+    if _json_supports_default:
+        # The encoder calls the hook only for the (few) datetime objects,
+        # so we avoid rebuilding every dictionary and list in python
+        return json_dumps(d, default=_datetime_to_json)
 
     def f(v):
         if isinstance(v, list):
@@ -167,15 +183,57 @@ def dumps_json(d):
     return json_dumps(f(d))
 
 date_reg = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+(\+\d{2}:\d{2})?$')
+# Matches a JSON string literal that loads_json would convert to a datetime.
+# Datetimes written by dumps_json never contain characters that need escaping,
+# so if this does not match the serialized text there is nothing to convert.
+_json_date_reg = re.compile(
+    r'"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+(\+\d{2}:\d{2})?"')
 
+_tz_cache = {}
 
-def loads_json(s):
+
+def _parse_isoformat(s):
     """
-    Loads the json and try to parse each basestring as a datetime object
+    Parse a string that matches date_reg as produced by datetime.isoformat(),
+    i.e. 'YYYY-MM-DDTHH:MM:SS.ffffff' optionally followed by '+HH:MM'.
+    Other precisions of the fractional seconds are left to dateutil.
     """
+    length = len(s)
+    if length not in (26, 32) or s[19] != '.':
+        return parser.parse(s)
+
+    if length == 32:
+        offset = s[26:]
+        try:
+            tzinfo = _tz_cache[offset]
+        except KeyError:
+            seconds = int(offset[1:3]) * 3600 + int(offset[4:6]) * 60
+            tzinfo = tzutc() if seconds == 0 else tzoffset(None, seconds)
+            _tz_cache[offset] = tzinfo
+    else:
+        tzinfo = None
+
+    return datetime.datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                             int(s[11:13]), int(s[14:16]), int(s[17:19]),
+                             int(s[20:26]), tzinfo)
+
 
+def loads_json(s):
+    """
+    Loads the json and try to parse each basestring as a datetime object.
+
+    Datetimes are stored as isoformat strings (so that they can still be
+    filtered in the QueryBuilder), therefore the whole serialized document is
+    first scanned once for candidate strings: the large majority of the
+    payloads contain no datetime at all and are returned as decoded,
+    without walking them. Otherwise, only the strings with the length and
+    separators of a datetime are checked against date_reg.
+    """
     ret = json_loads(s)
 
+    if not _json_date_reg.search(s):
+        return ret
+
     def f(d):
         if isinstance(d, list):
             for i, val in enumerate(d):
@@ -186,9 +244,9 @@ def loads_json(s):
                 d[k] = f(v)
             return d
         elif isinstance(d, basestring):
-            if date_reg.match(d):
+            if len(d) >= 21 and d[10] == 'T' and date_reg.match(d):
                 try:
-                    return parser.parse(d)
+                    return _parse_isoformat(d)
                 except (ValueError, TypeError):
                     return d
             return d
@@ -203,6 +261,12 @@ def loads_json(s):
 def install_tc(session):
     """
     Install the transitive closure table with SqlAlchemy.
+
+    The closure is not maintained anymore (the ancestors and descendants
+    are computed with recursive queries by the QueryBuilder): this is only
+    used by the migrations. The initial schema (e15ef2630a1b) installs it,
+    and the downgrade of the migration that deleted the db_dbpath table
+    (70c7d732f1b2) restores it.
     """
     links_table_name = "db_dblink"
     links_table_input_field = "input_id"
@@ -400,6 +464,79 @@ CREATE TRIGGER autoupdate_tc
                             closure_table_child_field=closure_table_child_field)
 
 
+def install_current_state_trigger(session):
+    """
+    Install the trigger that keeps the current_state column of db_dbnode
+    equal to the most recent state of the node in db_dbcalcstate.
+    """
+    session.execute(get_pg_current_state_trigger())
+
+
+def get_state_order_sql(state_field):
+    """
+    Return an SQL expression that gives the position of the value of
+    state_field in the state order, starting from 1 for the most recent
+    state, defined by _sorted_datastates.
+    """
+    from aiida.common.datastructures import _sorted_datastates
+
+    whens = "\n".join("    WHEN '{}' THEN {}".format(state, idx)
+                      for idx, state
+                      in enumerate(_sorted_datastates[::-1], start=1))
+    return "CASE {}\n{}\n    ELSE 100\n  END".format(state_field, whens)
+
+
+def get_pg_current_state_trigger():
+    """
+    Return the SQL that creates the trigger updating db_dbnode.current_state
+    whenever a row of db_dbcalcstate changes.
+    """
+    from string import Template
+
+    pg_current_state = Template("""
+
+DROP TRIGGER IF EXISTS autoupdate_current_state ON db_dbcalcstate;
+DROP FUNCTION IF EXISTS update_current_state();
+
+CREATE OR REPLACE FUNCTION update_current_state()
+  RETURNS trigger AS
+$$BODY$$
+DECLARE
+
+    node_id INTEGER;
+
+BEGIN
+
+  IF tg_op = 'DELETE' THEN
+    node_id := old.dbnode_id;
+  ELSE
+    node_id := new.dbnode_id;
+  END IF;
+
+  UPDATE db_dbnode SET current_state = (
+    SELECT state FROM db_dbcalcstate
+    WHERE dbnode_id = node_id
+    ORDER BY $state_order
+    LIMIT 1)
+  WHERE id = node_id;
+
+  RETURN NULL;
+
+END
+$$BODY$$
+  LANGUAGE plpgsql VOLATILE
+  COST 100;
+
+
+CREATE TRIGGER autoupdate_current_state
+  AFTER INSERT OR DELETE OR UPDATE
+  ON db_dbcalcstate FOR each ROW
+  EXECUTE PROCEDURE update_current_state();
+
+""")
+    return pg_current_state.substitute(state_order=get_state_order_sql('state'))
+
+
 def check_schema_version(force_migration=False, alembic_cfg=None):
     """
     Check if the version stored in the database is the same of the version
@@ -62,7 +62,9 @@ db_test_list = {
         'work.utils': ['aiida.backends.tests.work.test_utils'],
         'work.work_chain': ['aiida.backends.tests.work.work_chain'],
         'work.workfunction': ['aiida.backends.tests.work.workfunction'],
+        'work.job_calcs': ['aiida.backends.tests.work.job_calcs'],
         'work.job_processes': ['aiida.backends.tests.work.job_processes'],
+        'work.transport': ['aiida.backends.tests.work.transport'],
         'pluginloader': ['aiida.backends.tests.test_plugin_loader'],
         'daemon': ['aiida.backends.tests.daemon'],
         'verdi_commands': ['aiida.backends.tests.verdi_commands'],
@@ -8,6 +8,8 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 
+import os
+
 from aiida.backends.testbase import AiidaTestCase
 from aiida.backends.utils import get_workflow_list
 from aiida.common.datastructures import wf_states
@@ -93,3 +95,267 @@ class TestDaemonBasic(AiidaTestCase):
         self.assertEquals(running_no, 0,
                           "At this point there should be "
                           "no running workflows.")
+
+
+class TestRetrieveFilesFromList(AiidaTestCase):
+
+    def setUp(self):
+        super(TestRetrieveFilesFromList, self).setUp()
+        import tempfile
+        from aiida.orm.data.base import Int
+
+        self.remote_dir = tempfile.mkdtemp()
+        # The retrieval only needs a node to refer to in the log messages
+        self.calc = Int(1).store()
+
+    def tearDown(self):
+        super(TestRetrieveFilesFromList, self).tearDown()
+        import shutil
+        shutil.rmtree(self.remote_dir, ignore_errors=True)
+
+    def _write_remote_file(self, relpath, content):
+        path = os.path.join(self.remote_dir, relpath)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def _retrieve(self, folder, retrieve_list, transport_class=None):
+        from aiida.daemon.execmanager import retrieve_files_from_list
+        from aiida.transport.plugins.local import LocalTransport
+
+        if transport_class is None:
+            transport_class = LocalTransport
+        with transport_class() as transport:
+            transport.chdir(self.remote_dir)
+            stats = retrieve_files_from_list(self.calc, transport, folder, retrieve_list)
+            remote_content = transport.listdir('.')
+        return stats, remote_content
+
+    def test_retrieve_few_files(self):
+        from aiida.common.folders import SandboxFolder
+
+        self._write_remote_file('out.txt', 'output')
+        self._write_remote_file('sub/data.txt', 'data')
+
+        with SandboxFolder() as folder:
+            stats, _ = self._retrieve(folder, ['out.txt', ['sub/data.txt', 'results', 2], 'missing.txt'])
+
+            self.assertEquals(sorted(folder.get_content_list()), ['out.txt', 'results'])
+            with open(folder.get_abs_path('results/sub/data.txt')) as f:
+                self.assertEquals(f.read(), 'data')
+        self.assertEquals(stats.num_items, 2)
+        self.assertEquals(stats.num_bytes, len('output') + len('data'))
+
+    def test_retrieve_many_files_with_archive(self):
+        from aiida.common.folders import SandboxFolder
+        from aiida.daemon.execmanager import RETRIEVE_ARCHIVE_MIN_FILES
+
+        names = ['file_{}.dat'.format(i) for i in range(RETRIEVE_ARCHIVE_MIN_FILES)]
+        for name in names:
+            self._write_remote_file(os.path.join('out', name), name)
+        self._write_remote_file('aiida.out', 'output')
+
+        with SandboxFolder() as folder:
+            stats, remote_content = self._retrieve(folder, ['aiida.out', ['out/*.dat', '.', 1], 'missing.txt'])
+
+            self.assertEquals(sorted(folder.get_content_list()), sorted(names + ['aiida.out']))
+            for name in names:
+                with open(folder.get_abs_path(name)) as f:
+                    self.assertEquals(f.read(), name)
+        self.assertEquals(stats.num_items, len(names) + 1)
+        # The temporary archive does not remain on the remote
+        self.assertEquals(sorted(remote_content), ['aiida.out', 'out'])
+
+    def test_retrieve_archive_names_with_dash(self):
+        from aiida.common.folders import SandboxFolder
+        from aiida.daemon.execmanager import RETRIEVE_ARCHIVE_MIN_FILES
+        from aiida.transport.plugins.local import LocalTransport
+
+        gets = []
+
+        class CountingTransport(LocalTransport):
+            def get(self, remotepath, localpath, *args, **kwargs):
+                gets.append(remotepath)
+                super(CountingTransport, self).get(remotepath, localpath, *args, **kwargs)
+
+        # Names starting with a dash are not taken as options of tar
+        names = ['-file_{}.dat'.format(i) for i in range(RETRIEVE_ARCHIVE_MIN_FILES)]
+        for name in names:
+            self._write_remote_file(name, name)
+
+        with SandboxFolder() as folder:
+            stats, _ = self._retrieve(folder, names, CountingTransport)
+
+            self.assertEquals(sorted(folder.get_content_list()), sorted(names))
+            for name in names:
+                with open(folder.get_abs_path(name)) as f:
+                    self.assertEquals(f.read(), name)
+        self.assertEquals(stats.num_items, len(names))
+        # All the files were retrieved at once in the archive
+        self.assertEquals(len(gets), 1)
+        self.assertTrue(gets[0].endswith('.tar.gz'))
+
+
+class TestUploadFiles(AiidaTestCase):
+
+    def setUp(self):
+        super(TestUploadFiles, self).setUp()
+        import tempfile
+        from aiida.orm.data.base import Int
+
+        self.remote_dir = tempfile.mkdtemp()
+        self.local_dir = tempfile.mkdtemp()
+        # The upload only needs a node to refer to in the log messages
+        self.calc = Int(1).store()
+
+    def tearDown(self):
+        super(TestUploadFiles, self).tearDown()
+        import shutil
+        shutil.rmtree(self.remote_dir, ignore_errors=True)
+        shutil.rmtree(self.local_dir, ignore_errors=True)
+
+    def _upload(self, upload_files, uuid):
+        from aiida.common.folders import SandboxFolder
+        from aiida.transport.plugins.local import LocalTransport
+
+        local_copy = os.path.join(self.local_dir, 'pseudo.upf')
+        with open(local_copy, 'w') as f:
+            f.write('pseudo')
+
+        with SandboxFolder() as folder:
+            with folder.open('aiida.in', 'w') as f:
+                f.write('input')
+            subfolder = folder.get_subfolder('out', create=True)
+            with subfolder.open('restart', 'w') as f:
+                f.write('restart')
+
+            with LocalTransport() as transport:
+                return upload_files(self.calc, transport, self.remote_dir, uuid, folder, [],
+                                    [(local_copy, 'Si.upf')], None)
+
+    def _get_tree(self, path):
+        tree = {}
+        for dirpath, dirnames, filenames in os.walk(path):
+            for filename in filenames:
+                with open(os.path.join(dirpath, filename)) as f:
+                    tree[os.path.relpath(os.path.join(dirpath, filename), path)] = f.read()
+        return tree
+
+    def test_upload_with_archive(self):
+        from aiida.daemon.execmanager import _upload_file_by_file, _upload_with_archive
+
+        workdir_archive = self._upload(_upload_with_archive, 'aabbccdd')
+        workdir_files = self._upload(_upload_file_by_file, 'aabbeeff')
+
+        self.assertEquals(workdir_archive, os.path.join(self.remote_dir, 'aa', 'bb', 'ccdd'))
+        self.assertEquals(self._get_tree(workdir_archive), {
+            'aiida.in': 'input', os.path.join('out', 'restart'): 'restart',
+            'Si.upf': 'pseudo'})
+        self.assertEquals(self._get_tree(workdir_archive), self._get_tree(workdir_files))
+
+
+class TestProcessPairsConcurrently(AiidaTestCase):
+
+    def setUp(self):
+        super(TestProcessPairsConcurrently, self).setUp()
+        from aiida.daemon import execmanager
+
+        self.user = User.search_for_users(email=self.user_email)[0]
+        self.pairs = [(self.computer, self.user)]
+        self.timeout = execmanager.PAIR_TIMEOUT
+
+    def tearDown(self):
+        super(TestProcessPairsConcurrently, self).tearDown()
+        from aiida.daemon import execmanager
+        execmanager.PAIR_TIMEOUT = self.timeout
+
+    def test_durations_and_errors(self):
+        from aiida.daemon.execmanager import process_pairs_concurrently, get_pair_durations
+
+        processed = []
+
+        def process(computer, aiidauser):
+            processed.append((computer.name, aiidauser.email))
+            raise RuntimeError("A failing computer must not stop the task")
+
+        process_pairs_concurrently('test_durations', self.pairs, process)
+
+        self.assertEquals(processed, [(self.computer.name, self.user_email)])
+        durations = get_pair_durations('test_durations')
+        self.assertEquals(durations.keys(), [('test_durations', self.computer.name, self.user_email)])
+        self.assertGreaterEqual(durations.values()[0], 0.)
+
+    def test_hung_pair_is_skipped(self):
+        import threading
+        from aiida.daemon import execmanager
+
+        execmanager.PAIR_TIMEOUT = 0.2
+        release = threading.Event()
+        calls = []
+
+        def process(computer, aiidauser):
+            calls.append(computer.name)
+            release.wait(10)
+
+        # The call returns even though the processing of the pair hangs
+        execmanager.process_pairs_concurrently('test_hung', self.pairs, process)
+        self.assertEquals(len(calls), 1)
+        self.assertEquals(execmanager.get_pair_durations('test_hung'), {})
+
+        # While it is still running, the pair is skipped
+        execmanager.process_pairs_concurrently('test_hung', self.pairs, process)
+        self.assertEquals(len(calls), 1)
+
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name.startswith('test_hung'):
+                thread.join(10)
+
+        execmanager.process_pairs_concurrently('test_hung', self.pairs, process)
+        self.assertEquals(len(calls), 2)
+
+    def _check_fallback(self, transport_class):
+        """
+        Check that all the files are retrieved one by one if the archive
+        cannot be used.
+        """
+        from aiida.common.folders import SandboxFolder
+        from aiida.daemon.execmanager import RETRIEVE_ARCHIVE_MIN_FILES
+
+        names = ['file_{}.dat'.format(i) for i in range(RETRIEVE_ARCHIVE_MIN_FILES)]
+        for name in names:
+            self._write_remote_file(name, name)
+
+        with SandboxFolder() as folder:
+            stats, remote_content = self._retrieve(folder, names + ['missing.txt'], transport_class)
+
+            self.assertEquals(sorted(folder.get_content_list()), sorted(names))
+            for name in names:
+                with open(folder.get_abs_path(name)) as f:
+                    self.assertEquals(f.read(), name)
+        self.assertEquals(stats.num_items, len(names))
+        self.assertEquals(sorted(remote_content), sorted(names))
+
+    def test_retrieve_archive_command_fails(self):
+        from aiida.transport.plugins.local import LocalTransport
+
+        class FailingTarTransport(LocalTransport):
+            def exec_command_wait(self, command, stdin=None):
+                retval, stdout, stderr = super(FailingTarTransport, self).exec_command_wait(command, stdin)
+                return 2, stdout, stderr + 'tar: Cannot write: No space left on device\n'
+
+        self._check_fallback(FailingTarTransport)
+
+    def test_retrieve_archive_corrupted(self):
+        from aiida.transport.plugins.local import LocalTransport
+
+        class CorruptingTransport(LocalTransport):
+            def get(self, remotepath, localpath, *args, **kwargs):
+                if remotepath.endswith('.tar.gz'):
+                    with open(localpath, 'w') as f:
+                        f.write('not an archive')
+                else:
+                    super(CorruptingTransport, self).get(remotepath, localpath, *args, **kwargs)
+
+        self._check_fallback(CorruptingTransport)
@@ -1291,6 +1291,45 @@ class TestStructureData(AiidaTestCase):
 
         self.assertEquals(a.get_symbols_set(), set(['Ba', 'Ti', 'O', 'H']))
 
+    def test_append_buffer(self):
+        """
+        Test that the kinds and sites appended to an unstored structure are
+        always consistent with its attributes, and that they are stored.
+        """
+        from aiida.orm.data.structure import StructureData
+
+        a = StructureData(cell=((2., 0., 0.), (0., 2., 0.), (0., 0., 2.)))
+
+        for i in range(20):
+            a.append_atom(position=(0., 0., i * 0.1),
+                          symbols='Ba' if i % 2 else 'Ti')
+            if i == 10:
+                # Reading the attributes in the middle of the appends
+                self.assertEquals(len(a.get_attr('sites')), 11)
+                self.assertEquals(a.get_attr('kinds')[0]['name'], 'Ti')
+        a.append_atom(position=(1., 1., 1.), symbols='Ba', name='Ba2',
+                      mass=100.)
+
+        self.assertEquals([k['name'] for k in a.get_attr('kinds')],
+                          ['Ti', 'Ba', 'Ba2'])
+        self.assertEquals(len(a.get_attrs()['sites']), 21)
+        self.assertEquals(a.get_site_kindnames()[:4],
+                          ['Ti', 'Ba', 'Ti', 'Ba'])
+
+        # Resetting an attribute discards what was appended before
+        a.clear_sites()
+        self.assertEquals(a.sites, [])
+        self.assertEquals(len(a.kinds), 3)
+        a.append_atom(position=(0., 0., 0.), symbols='Ti')
+        a.append_atom(position=(0., 0., 0.5), symbols='Ba', name='Ba2',
+                      mass=100.)
+        a.append_atom(position=(0., 0., 1.), symbols='Ba')
+
+        a.store()
+        self.assertEquals([s.kind_name for s in a.sites],
+                          ['Ti', 'Ba2', 'Ba'])
+        self.assertEquals(a.sites[1].position, (0., 0., 0.5))
+
     @unittest.skipIf(not has_ase(), "Unable to import ase")
     @unittest.skipIf(not has_spglib(), "Unable to import spglib")
     def test_kind_8(self):
@@ -2211,6 +2250,102 @@ class TestArrayData(AiidaTestCase):
             if name == 'third':
                 self.assertAlmostEquals(abs(third - array).max(), 0.)
 
+    def test_mmap_and_cache(self):
+        """
+        Check the memory-mapped reading of the arrays and the shared cache
+        """
+        from aiida.orm.data.array import ArrayData, ArrayCache, array_cache
+        import numpy
+
+        n = ArrayData()
+        first = numpy.random.rand(20, 3)
+        n.set_array('first', first)
+
+        with self.assertRaises(ValueError):
+            n.get_array('first', mmap_mode='w+')
+
+        n.store()
+
+        mapped = n.get_array('first', mmap_mode='r')
+        self.assertIsInstance(mapped, numpy.memmap)
+        self.assertAlmostEquals(abs(first - mapped).max(), 0.)
+        self.assertAlmostEquals(abs(first[3:5] - n._get_array_slice(
+            'first', slice(3, 5))).max(), 0.)
+
+        # Only the arrays read in memory are cached
+        self.assertNotIn((n.uuid, 'first'), array_cache._arrays)
+        n.get_array('first')
+        self.assertIn((n.uuid, 'first'), array_cache._arrays)
+        n.clear_internal_cache()
+        self.assertNotIn((n.uuid, 'first'), array_cache._arrays)
+
+        # The least recently used arrays are dropped first
+        cache = ArrayCache(max_bytes=3 * first.nbytes)
+        for key in ['a', 'b', 'c']:
+            cache.set(key, first.copy())
+        cache.get('a')
+        cache.set('d', first.copy())
+        self.assertEquals(set(cache._arrays.keys()), set(['a', 'c', 'd']))
+        self.assertEquals(cache.nbytes, 3 * first.nbytes)
+        # Arrays larger than the whole cache are not cached
+        cache.set('e', numpy.zeros(4 * first.size))
+        self.assertNotIn('e', cache._arrays)
+
+    def test_chunked_format(self):
+        """
+        Check the storage of the arrays in compressed chunks, the partial
+        reads and the appends
+        """
+        from aiida.orm.data.array import ArrayData
+        import numpy
+
+        n = ArrayData()
+        first = numpy.random.rand(10, 2, 3)
+        second = numpy.arange(7)
+        n.set_array('first', first)
+
+        # Existing arrays are converted
+        n.set_array_format('chunked', chunk_length=4)
+        self.assertEquals(n.get_array_format(), 'chunked')
+        n.set_array('second', second)
+        n.set_array('scalar', numpy.array(3.))
+        self.assertEquals(
+            sorted(n.get_folder_list()),
+            ['first.000000.npz', 'first.000001.npz', 'first.000002.npz',
+             'scalar.000000.npz', 'second.000000.npz', 'second.000001.npz'])
+
+        with self.assertRaises(ValueError):
+            n.get_array('first', mmap_mode='r')
+        with self.assertRaises(ValueError):
+            n.set_array_format('hdf5')
+
+        # Appending rows, also to an incomplete chunk
+        more = numpy.random.rand(3, 2, 3)
+        n.append_to_array('first', more)
+        n.append_to_array('second', numpy.arange(7, 8))
+        with self.assertRaises(ValueError):
+            n.append_to_array('first', numpy.random.rand(3, 3, 3))
+        first = numpy.concatenate([first, more])
+        second = numpy.arange(8)
+        self.assertEquals(n.get_shape('first'), (13, 2, 3))
+        self.assertEquals(n.get_shape('second'), (8,))
+
+        n.store()
+
+        self.assertEquals(set(n.get_arraynames()),
+                          set(['first', 'second', 'scalar']))
+        self.assertAlmostEquals(n.get_array('scalar'), 3.)
+        # The last one reads (and caches) the whole array
+        for index in [5, -1, slice(3, 9), slice(None, None, 5),
+                      (slice(2, 6), 1), (7, 1, 2), slice(12, 2, -2)]:
+            self.assertAlmostEquals(
+                abs(first[index] - n._get_array_slice('first', index)).max(),
+                0.)
+        with self.assertRaises(IndexError):
+            n._get_array_slice('first', 13)
+        self.assertEquals(n.get_array('second').tolist(), second.tolist())
+        self.assertAlmostEquals(abs(first - n.get_array('first')).max(), 0.)
+
 
 class TestTrajectoryData(AiidaTestCase):
     """
@@ -2283,6 +2418,14 @@ class TestTrajectoryData(AiidaTestCase):
             # Step 66 does not exist
             n.get_index_from_stepid(66)
 
+        # Reading only some of the steps
+        self.assertAlmostEqual(
+            abs(positions[1:] - n.get_positions(steps=slice(1, None))).sum(),
+            0.)
+        self.assertAlmostEqual(
+            abs(velocities[0] - n.get_velocities(steps=0)).sum(), 0.)
+        self.assertEqual(n.get_stepids(steps=1), 70)
+
         ########################################################
         # I set the node, this time without times or velocities (the same node)
         n.set_trajectory(stepids=stepids, cells=cells, symbols=symbols,
@@ -2395,6 +2538,54 @@ class TestTrajectoryData(AiidaTestCase):
             # Step 66 does not exist
             n.get_index_from_stepid(66)
 
+    def test_append_steps(self):
+        """
+        Check the incremental construction of a trajectory.
+        """
+        from aiida.orm.data.array.trajectory import TrajectoryData
+        import numpy
+
+        symbols = numpy.array(['H', 'O', 'C'])
+        stepids = numpy.arange(10)
+        cells = numpy.random.rand(10, 3, 3)
+        positions = numpy.random.rand(10, 3, 3)
+        times = stepids * 0.01
+
+        n = TrajectoryData()
+        with self.assertRaises(ValueError):
+            # The first block needs the symbols
+            n.append_steps(stepids[:4], cells[:4], positions[:4])
+        n.append_steps(stepids[:4], cells[:4], positions[:4],
+                       symbols=symbols, times=times[:4])
+        self.assertEqual(n.get_array_format(), 'chunked')
+        # All the arrays have the same number of steps per chunk
+        chunk_length = n._get_chunk_length('positions')
+        self.assertEqual(chunk_length,
+                         n._chunk_target_bytes // positions[0].nbytes)
+        for name in ['steps', 'cells', 'times']:
+            self.assertEqual(n._get_chunk_length(name), chunk_length)
+        with self.assertRaises(ValueError):
+            # The times must be given for all blocks
+            n.append_steps(stepids[4:], cells[4:], positions[4:])
+        with self.assertRaises(ValueError):
+            # Wrong number of atoms
+            n.append_steps(stepids[4:], cells[4:], positions[4:, :2],
+                           times=times[4:])
+        n.append_steps(stepids[4:7], cells[4:7], positions[4:7],
+                       times=times[4:7])
+        n.append_steps(stepids[7:], cells[7:], positions[7:],
+                       symbols=symbols, times=times[7:])
+
+        n.store()
+
+        self.assertEqual(n.numsteps, 10)
+        self.assertEqual(n.numsites, 3)
+        self.assertEqual(n.get_stepids().tolist(), stepids.tolist())
+        self.assertAlmostEqual(abs(times - n.get_times()).sum(), 0.)
+        self.assertAlmostEqual(abs(cells - n.get_cells()).sum(), 0.)
+        self.assertAlmostEqual(abs(positions - n.get_positions()).sum(), 0.)
+        self.assertIsNone(n.get_velocities())
+
     def test_conversion_to_structure(self):
         """
         Check the methods to export a given time step to a StructureData node.
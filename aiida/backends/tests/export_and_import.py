@@ -232,6 +232,99 @@ class TestSimple(AiidaTestCase):
             # Deleting the created temporary folder
             shutil.rmtree(temp_folder, ignore_errors=True)
 
+    def test_export_in_batches(self):
+        """
+        Export with a batch size smaller than the number of entries, so that
+        the entries are streamed to the archive in several chunks
+        """
+        import os
+        import shutil
+        import tempfile
+
+        from aiida.orm import Group, Node
+        from aiida.orm import load_node
+        from aiida.orm.data.base import Int
+        from aiida.orm.importexport import export
+        from aiida.orm.querybuilder import QueryBuilder
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(temp_folder, "export.tar.gz")
+
+            nodes = [Int(value).store() for value in range(5)]
+            uuids = [n.uuid for n in nodes]
+            group = Group(name="export_in_batches").store()
+            group.add_nodes(nodes)
+            group_uuid = group.uuid
+
+            export([n.dbnode for n in nodes] + [group.dbgroup], outfile=filename, silent=True, batch_size=2)
+            self.clean_db()
+            import_data(filename, silent=True)
+
+            for value, uuid in enumerate(uuids):
+                self.assertEquals(load_node(uuid).value, value)
+            qb = QueryBuilder()
+            qb.append(Group, filters={'uuid': {'==': group_uuid}}, tag='group')
+            qb.append(Node, member_of='group', project=['uuid'])
+            self.assertEquals(set(uuid for uuid, in qb.all()), set(uuids))
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    def test_import_in_batches(self):
+        """
+        Import with a batch size smaller than the number of nodes, so that
+        nodes, links and group members are inserted with several queries
+        """
+        import os
+        import shutil
+        import tempfile
+
+        from aiida.common.links import LinkType
+        from aiida.orm import Group, Node
+        from aiida.orm import load_node
+        from aiida.orm.calculation.work import WorkCalculation
+        from aiida.orm.data.base import Int
+        from aiida.orm.importexport import export
+        from aiida.orm.querybuilder import QueryBuilder
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(temp_folder, "export.tar.gz")
+
+            calc = WorkCalculation().store()
+            nodes = [Int(value).store() for value in range(5)]
+            for value, node in enumerate(nodes):
+                node.add_link_from(calc, 'out_{}'.format(value),
+                                   link_type=LinkType.CREATE)
+            uuids = [n.uuid for n in nodes]
+            calc_uuid = calc.uuid
+            group = Group(name="import_in_batches").store()
+            group.add_nodes(nodes)
+            group_uuid = group.uuid
+
+            export([calc.dbnode] + [n.dbnode for n in nodes] + [group.dbgroup],
+                   outfile=filename, silent=True)
+            self.clean_db()
+            ret_dict = import_data(filename, silent=True, batch_size=2)
+
+            self.assertEquals(len(ret_dict['Node']['new']), 6)
+            for value, uuid in enumerate(uuids):
+                node = load_node(uuid)
+                self.assertEquals(node.value, value)
+                self.assertEquals(node.get_inputs(only_in_db=True)[0].uuid,
+                                  calc_uuid)
+            qb = QueryBuilder()
+            qb.append(Group, filters={'uuid': {'==': group_uuid}}, tag='group')
+            qb.append(Node, member_of='group', project=['uuid'])
+            self.assertEquals(set(uuid for uuid, in qb.all()), set(uuids))
+
+            # Importing again adds neither nodes nor links
+            ret_dict = import_data(filename, silent=True, batch_size=2)
+            self.assertNotIn('new', ret_dict.get('Link', {}))
+            self.assertEquals(len(ret_dict['Node']['existing']), 6)
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
     def test_1(self):
         import os
         import shutil
@@ -73,6 +73,73 @@ class TestDataNode(AiidaTestCase):
             a._set_attr('i', 12)
 
 
+class TestNodeHashing(AiidaTestCase):
+    """
+    Tests the content hash of nodes, used to find identical nodes
+    """
+
+    @staticmethod
+    def create_data_node(value, content=None):
+        import tempfile
+
+        node = Data()
+        node._set_attr('value', value)
+        if content is not None:
+            with tempfile.NamedTemporaryFile() as handle:
+                handle.write(content)
+                handle.flush()
+                node.add_path(handle.name, 'file.txt')
+        return node
+
+    def test_identical_nodes_have_same_hash(self):
+        a = self.create_data_node(1, 'content')
+        b = self.create_data_node(1, 'content')
+        self.assertIsNotNone(a.get_hash())
+        self.assertEqual(a.get_hash(), b.get_hash())
+
+    def test_different_attributes(self):
+        a = self.create_data_node(1)
+        b = self.create_data_node(2)
+        self.assertNotEqual(a.get_hash(), b.get_hash())
+
+    def test_different_files(self):
+        a = self.create_data_node(1, 'content')
+        b = self.create_data_node(1, 'other content')
+        self.assertNotEqual(a.get_hash(), b.get_hash())
+
+    def test_hash_stored(self):
+        a = self.create_data_node(1, 'content')
+        hash_ = a.get_hash()
+        a.store()
+        self.assertEqual(a.get_extra(a._HASH_EXTRA_KEY), hash_)
+        self.assertEqual(a.get_hash(), hash_)
+
+    def test_get_same_node(self):
+        a = self.create_data_node(1, 'content').store()
+        b = self.create_data_node(1, 'content')
+        c = self.create_data_node(2, 'content')
+
+        self.assertEqual(b._get_same_node().uuid, a.uuid)
+        self.assertIsNone(c._get_same_node())
+
+        # The node itself is not returned
+        b.store()
+        self.assertEqual(b._get_same_node().uuid, a.uuid)
+
+    def test_calculation_uses_stored_input_hash(self):
+        from aiida.orm.calculation import Calculation
+
+        a = self.create_data_node(1, 'content').store()
+        calc = Calculation()
+        calc.add_link_from(a, 'input', link_type=LinkType.INPUT)
+        hash_ = calc.get_hash()
+        self.assertIsNotNone(hash_)
+
+        # The hash stored in the extras of the input is used, not recomputed
+        a.set_extra(a._HASH_EXTRA_KEY, 'modified')
+        self.assertNotEqual(calc.get_hash(), hash_)
+
+
 class TestTransitiveNoLoops(AiidaTestCase):
     """
     Test the transitive closure functionality
@@ -1973,3 +2040,149 @@ class TestSubNodesAndLinks(AiidaTestCase):
         # more than one input to the same data object!
         with self.assertRaises(ValueError):
             d1.add_link_from(calc2, link_type=LinkType.CREATE)
+
+
+class TestStoreMany(AiidaTestCase):
+    """
+    Test the storage of many nodes at once with store_many.
+    """
+
+    def test_store_many(self):
+        import tempfile
+        from aiida.orm import store_many
+        from aiida.orm.calculation.inline import InlineCalculation
+        from aiida.orm.data.parameter import ParameterData
+
+        stored_input = ParameterData(dict={'a': 0}).store()
+        calc = InlineCalculation()
+        calc.add_link_from(stored_input, label='stored', link_type=LinkType.INPUT)
+        outputs = []
+        for i in range(5):
+            n = ParameterData(dict={'a': i, 'b': [1., 2.]})
+            n.label = 'output_{}'.format(i)
+            with tempfile.NamedTemporaryFile() as handle:
+                handle.write('content {}'.format(i))
+                handle.flush()
+                n.add_path(handle.name, 'file.txt')
+            n.add_link_from(calc, label='output', link_type=LinkType.CREATE)
+            outputs.append(n)
+
+        pks = store_many([calc] + outputs)
+
+        self.assertEquals(pks, [calc.pk] + [n.pk for n in outputs])
+        self.assertTrue(all(n.is_stored for n in [calc] + outputs))
+        self.assertEquals([n.pk for n in calc.get_inputs()], [stored_input.pk])
+
+        for i, n in enumerate(outputs):
+            loaded = load_node(n.pk)
+            self.assertEquals(loaded.label, 'output_{}'.format(i))
+            self.assertEquals(loaded.get_dict(), {'a': i, 'b': [1., 2.]})
+            self.assertEquals([_.pk for _ in loaded.get_inputs()], [calc.pk])
+            self.assertEquals(
+                loaded.get_extra(loaded._HASH_EXTRA_KEY), loaded.get_hash())
+            with open(loaded.get_abs_path('file.txt')) as f:
+                self.assertEquals(f.read(), 'content {}'.format(i))
+
+    def test_store_many_errors(self):
+        from aiida.orm import store_many
+
+        n1 = Node()
+        n2 = Node()
+        n3 = Node()
+        n2.add_link_from(n1, label='in', link_type=LinkType.INPUT)
+        n1.add_link_from(n2, label='in', link_type=LinkType.INPUT)
+        # The cached links form a loop
+        with self.assertRaises(ValueError):
+            store_many([n1, n2])
+
+        n4 = Node()
+        n4.add_link_from(n3, label='in', link_type=LinkType.INPUT)
+        # The source of the link is neither stored nor given
+        with self.assertRaises(ModificationNotAllowed):
+            store_many([n4])
+
+        n3.store()
+        with self.assertRaises(ModificationNotAllowed):
+            store_many([n3, n4])
+        self.assertFalse(n4.is_stored)
+
+    def test_store_many_failure(self):
+        """
+        If a node fails to store after the nodes stored in bulk were
+        inserted, all nodes are left unstored and can be stored again.
+        """
+        import tempfile
+        from aiida.orm import store_many
+        from aiida.orm.data.parameter import ParameterData
+
+        class FailingParameterData(ParameterData):
+            def store(self, with_transaction=True):
+                raise ValueError('failing on purpose')
+
+        n1 = ParameterData(dict={'a': 1})
+        with tempfile.NamedTemporaryFile() as handle:
+            handle.write('content')
+            handle.flush()
+            n1.add_path(handle.name, 'file.txt')
+        n2 = ParameterData(dict={'a': 2})
+        n2.add_link_from(n1, label='in', link_type=LinkType.INPUT)
+        failing = FailingParameterData(dict={'a': 3})
+        failing.add_link_from(n1, label='in', link_type=LinkType.INPUT)
+
+        with self.assertRaises(ValueError):
+            store_many([n1, n2, failing])
+
+        for n in [n1, n2, failing]:
+            self.assertFalse(n.is_stored)
+        self.assertEquals(n1.get_dict(), {'a': 1})
+        self.assertEquals(n2.get_dict(), {'a': 2})
+        with open(n1.get_abs_path('file.txt')) as f:
+            self.assertEquals(f.read(), 'content')
+        self.assertEquals(
+            [(src.uuid, label) for label, (src, _)
+             in n2._inputlinks_cache.iteritems()], [(n1.uuid, 'in')])
+        self.assertEquals(
+            [(src.uuid, label) for label, (src, _)
+             in failing._inputlinks_cache.iteritems()], [(n1.uuid, 'in')])
+
+        store_many([n1, n2])
+        self.assertTrue(n1.is_stored)
+        self.assertTrue(n2.is_stored)
+        self.assertEquals([_.pk for _ in load_node(n2.pk).get_inputs()],
+                          [n1.pk])
+
+    def test_store_many_failure_with_calculation(self):
+        """
+        The store() of a JobCalculation also sets its state: if a later node
+        fails to store, no row of the nodes remains in the DB.
+        """
+        from aiida.common.datastructures import calc_states
+        from aiida.orm import store_many
+        from aiida.orm.calculation.job import JobCalculation
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.querybuilder import QueryBuilder
+
+        class FailingParameterData(ParameterData):
+            def store(self, with_transaction=True):
+                raise ValueError('failing on purpose')
+
+        n1 = ParameterData(dict={'a': 1})
+        calc = JobCalculation(computer=self.computer, resources={
+            'num_machines': 1, 'num_mpiprocs_per_machine': 1})
+        calc.add_link_from(n1, label='in', link_type=LinkType.INPUT)
+        failing = FailingParameterData(dict={'a': 2})
+        failing.add_link_from(calc, label='out', link_type=LinkType.CREATE)
+
+        with self.assertRaises(ValueError):
+            store_many([n1, calc, failing])
+
+        self.assertFalse(n1.is_stored)
+        self.assertFalse(calc.is_stored)
+        qb = QueryBuilder()
+        qb.append(Node, filters={'uuid': {'in': [n1.uuid, calc.uuid]}})
+        self.assertEquals(qb.count(), 0)
+
+        store_many([n1, calc])
+        self.assertEquals(calc.get_state(), calc_states.NEW)
+        self.assertEquals([_.pk for _ in load_node(calc.pk).get_inputs()],
+                          [n1.pk])
@@ -571,6 +571,54 @@ class QueryBuilderLimitOffsetsTest(AiidaTestCase):
         res = list(zip(*qb.all())[0])
         self.assertEqual(res, range(4,1, -1))
 
+    def test_keyset_pagination(self):
+        from aiida.orm import Node
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.common.exceptions import InputValidationError
+
+        # Nodes with repeated labels, so that the id breaks the ties
+        for i in range(10):
+            n = Node()
+            n.label = 'keyset_{}'.format(i % 3)
+            n.description = 'test_keyset_pagination'
+            n.store()
+
+        for order in ('asc', 'desc'):
+            # Same direction for all columns, and mixed directions
+            for id_order in ('asc', 'desc'):
+                qb = QueryBuilder().append(
+                    Node, tag='node', project=['label', 'id'],
+                    filters={'description': 'test_keyset_pagination'}
+                ).order_by({'node': [{'label': order}, {'id': id_order}]})
+                expected = qb.all()
+                self.assertEqual(len(expected), 10)
+
+                qb.limit(4)
+                pages = [qb.all()]
+                while pages[-1]:
+                    pages.append(qb.after(pages[-1][-1]).all())
+                self.assertEqual([len(page) for page in pages], [4, 4, 2, 0])
+                self.assertEqual(sum(pages, []), expected)
+
+        qb = QueryBuilder().append(Node, tag='node', project=['id'])
+        qb.order_by({'node': ['id']})
+        qb.after([1, 2])
+        with self.assertRaises(InputValidationError):
+            qb.all()
+        with self.assertRaises(InputValidationError):
+            qb.after(1)
+
+    def test_estimate_count(self):
+        from aiida.orm import Node
+        from aiida.orm.querybuilder import QueryBuilder
+
+        for i in range(3):
+            Node().store()
+        # Only an estimate, but always a non-negative integer
+        estimate = QueryBuilder().append(Node).estimate_count()
+        self.assertTrue(isinstance(estimate, (int, long)))
+        self.assertTrue(estimate >= 0)
+
 
 class QueryBuilderJoinsTests(AiidaTestCase):
     def test_joins1(self):
@@ -863,6 +911,205 @@ class QueryBuilderPath(AiidaTestCase):
 
 
 
+    def test_query_path_pruning(self):
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm import Node
+        from aiida.common.links import LinkType
+        from aiida.common.exceptions import InputValidationError
+
+        nodes = {}
+        for label in ('n1', 'n2', 'x3', 'n4', 'n5', 'n6'):
+            n = Node()
+            n.label = label
+            n.store()
+            nodes[label] = n
+
+        # A diamond n1 -> (n2, x3) -> n4, followed by n4 -> n5 -> n6
+        nodes['n2'].add_link_from(nodes['n1'], link_type=LinkType.INPUT)
+        nodes['x3'].add_link_from(nodes['n1'], link_type=LinkType.INPUT)
+        nodes['n4'].add_link_from(nodes['n2'], link_type=LinkType.INPUT)
+        nodes['n4'].add_link_from(nodes['x3'], link_type=LinkType.INPUT)
+        nodes['n5'].add_link_from(nodes['n4'], link_type=LinkType.INPUT)
+        nodes['n6'].add_link_from(nodes['n5'], link_type=LinkType.CREATE)
+
+        def get_descendants(**kwargs):
+            qb = QueryBuilder().append(
+                    Node, filters={'id': nodes['n1'].pk}, tag='anc'
+                ).append(Node, descendant_of='anc', project='label', **kwargs)
+            return sorted(label for label, in qb.all())
+
+        # By default, one row per path
+        self.assertEquals(get_descendants(),
+            ['n2', 'n4', 'n4', 'n5', 'n5', 'n6', 'n6', 'x3'])
+        self.assertEquals(get_descendants(distinct_walk=True),
+            ['n2', 'n4', 'n5', 'n6', 'x3'])
+        # The depth limits are applied inside the recursion
+        self.assertEquals(get_descendants(max_depth=2),
+            ['n2', 'n4', 'n4', 'x3'])
+        self.assertEquals(get_descendants(edge_filters={'depth': {'<': 2}}),
+            ['n2', 'n4', 'n4', 'x3'])
+        self.assertEquals(get_descendants(max_depth=2, distinct_walk=True),
+            ['n2', 'n4', 'x3'])
+        self.assertEquals(get_descendants(link_types=[LinkType.INPUT]),
+            ['n2', 'n4', 'n4', 'n5', 'n5', 'x3'])
+        self.assertEquals(get_descendants(
+                traversal_filters={'label': {'like': 'n%'}}),
+            ['n2', 'n4', 'n5', 'n6'])
+
+        qb = QueryBuilder().append(
+                Node, filters={'id': nodes['n6'].pk}, tag='desc'
+            ).append(Node, ancestor_of='desc', project='label',
+                     edge_project='depth', distinct_walk=True)
+        self.assertEquals(sorted(qb.all()),
+            [['n1', 3], ['n2', 2], ['n4', 1], ['n5', 0], ['x3', 2]])
+
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, tag='anc').append(
+                Node, output_of='anc', max_depth=2)
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, tag='anc').append(
+                Node, descendant_of='anc', link_types=['wronglink'])
+
+
+class TestQueryBuilderArrays(AiidaTestCase):
+    def test_arrays(self):
+        from aiida.orm.node import Node
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.common.exceptions import InputValidationError
+
+        nodes = []
+        for i in range(7):
+            n = Node()
+            n.label = 'test_arrays'
+            n._set_attr('energy', i * 0.5)
+            n._set_attr('kind', 'k{}'.format(i % 2))
+            if i % 3:
+                n._set_attr('sometimes', i)
+            n._set_attr('vector', [i, i + 1])
+            nodes.append(n.store())
+
+        qb = QueryBuilder()
+        qb.append(Node, filters={'label': 'test_arrays'}, tag='node',
+                  project=['id', 'attributes.energy', 'attributes.kind',
+                           'attributes.sometimes'])
+        qb.order_by({'node': ['id']})
+        # A small batch size, so that several batches are concatenated
+        arrays = qb.arrays(batch_size=3)
+
+        self.assertEqual(arrays.keys(), ['node'])
+        self.assertEqual(arrays['node']['id'].tolist(),
+                         [n.pk for n in nodes])
+        self.assertEqual(arrays['node']['attributes.energy'].dtype.kind, 'f')
+        self.assertEqual(arrays['node']['attributes.energy'].tolist(),
+                         [i * 0.5 for i in range(7)])
+        self.assertEqual(arrays['node']['attributes.kind'].tolist(),
+                         ['k0', 'k1', 'k0', 'k1', 'k0', 'k1', 'k0'])
+        self.assertEqual(arrays['node']['attributes.sometimes'].tolist(),
+                         [None, 1, 2, None, 4, 5, None])
+        # Same values as all()
+        self.assertEqual(
+            [list(row) for row in zip(*[
+                arrays['node'][key].tolist() for key in
+                ['id', 'attributes.energy', 'attributes.kind',
+                 'attributes.sometimes']])],
+            qb.all())
+
+        qb = QueryBuilder()
+        qb.append(Node, filters={'id': -1}, project=['id'], tag='node')
+        self.assertEqual(len(qb.arrays()['node']['id']), 0)
+
+        # Lists and dictionaries give one-dimensional arrays of objects
+        qb = QueryBuilder()
+        qb.append(Node, filters={'label': 'test_arrays'}, tag='node',
+                  project=['attributes', 'attributes.vector'])
+        qb.order_by({'node': ['id']})
+        arrays = qb.arrays(batch_size=3)
+        for key in ['attributes', 'attributes.vector']:
+            self.assertEqual(arrays['node'][key].shape, (len(nodes),))
+            self.assertEqual(arrays['node'][key].dtype, object)
+        self.assertEqual(arrays['node']['attributes.vector'].tolist(),
+                         [[i, i + 1] for i in range(7)])
+        self.assertEqual(arrays['node']['attributes'][1]['kind'], 'k1')
+
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, project='*').arrays()
+
+
+class TestQueryBuilderGroupBy(AiidaTestCase):
+    @classmethod
+    def setUpClass(cls, *args, **kwargs):
+        from aiida.orm.node import Node
+
+        super(TestQueryBuilderGroupBy, cls).setUpClass(*args, **kwargs)
+        for i in range(6):
+            n = Node()
+            n.label = 'test_group_by_{}'.format(i % 2)
+            n.description = 'test_group_by'
+            n._set_attr('energy', float(i))
+            n.store()
+
+    def get_query(self, project):
+        from aiida.orm.node import Node
+        from aiida.orm.querybuilder import QueryBuilder
+
+        qb = QueryBuilder()
+        qb.append(Node, filters={'description': 'test_group_by'},
+                  tag='node', project=['label'] + project)
+        qb.group_by({'node': ['label']})
+        qb.order_by({'node': ['label']})
+        return qb
+
+    def test_group_by(self):
+        from aiida.orm.node import Node
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.common.exceptions import InputValidationError
+
+        self.assertEqual(
+            self.get_query([{'id': {'func': 'count'}}]).all(),
+            [['test_group_by_0', 3], ['test_group_by_1', 3]])
+
+        # The group_by survives the round trip through the queryhelp
+        qb = QueryBuilder(**self.get_query(
+            [{'id': {'func': 'count'}}]).get_json_compatible_queryhelp())
+        self.assertEqual(qb.count(), 2)
+
+        with self.assertRaises(InputValidationError):
+            self.get_query([{'id': {'func': 'median'}}]).all()
+        with self.assertRaises(InputValidationError):
+            QueryBuilder().append(Node, tag='node').group_by(
+                {'node': [{'id': {'order': 'asc'}}]})
+
+    @unittest.skipIf(settings.BACKEND == u'django',
+              "Casting of attributes is not implemented in Django")
+    def test_group_by_attributes(self):
+        self.assertEqual(
+            self.get_query([
+                {'attributes.energy': {'cast': 'f', 'func': 'min'}},
+                {'attributes.energy': {'cast': 'f', 'func': 'max'}},
+                {'attributes.energy': {'cast': 'f', 'func': 'sum'}},
+            ]).all(),
+            [['test_group_by_0', 0., 4., 6.], ['test_group_by_1', 1., 5., 9.]])
+        self.assertEqual(
+            [[label, float(avg)] for label, avg in self.get_query([
+                {'attributes.energy': {'cast': 'f', 'func': 'avg'}}]).all()],
+            [['test_group_by_0', 2.], ['test_group_by_1', 3.]])
+
+    @unittest.skipIf(settings.BACKEND == u'sqlalchemy',
+              "Functions on attributes are implemented in SQLAlchemy")
+    def test_group_by_attributes_django(self):
+        from aiida.orm.node import Node
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.common.exceptions import InputValidationError
+
+        with self.assertRaises(InputValidationError):
+            self.get_query([{'attributes.energy': {'func': 'max'}}]).all()
+        with self.assertRaises(InputValidationError):
+            qb = QueryBuilder()
+            qb.append(Node, tag='node', project=[{'id': {'func': 'count'}}])
+            qb.group_by({'node': ['attributes.energy']})
+            qb.all()
+
+
 class TestConsistency(AiidaTestCase):
     def test_create_node_and_query(self):
         from aiida.orm import Node
@@ -391,6 +391,81 @@ class RESTApiTestSuite(RESTApiTestCase):
                                      "/computers/page/4?perpage=2&orderby=+id",
                                      expected_errormsg=expected_error)
 
+    ############### keyset pagination and count modes ###################
+    def test_computers_list_after(self):
+        """
+        Get the computers after the last one of the previous page (keyset
+        pagination), following the link to the next page
+        """
+        from urllib import unquote
+
+        self.app.config['TESTING'] = True
+        with self.app.test_client() as client:
+            rv = client.get(self._url_prefix + "/computers?orderby=+id&limit=2")
+            response = json.loads(rv.data)
+            ids = [comp['id'] for comp in response["data"]["computers"]]
+            self.assertEqual(
+                ids, [comp['id'] for comp in
+                      self.get_dummy_data()["computers"][:2]])
+            link = unquote(rv.headers['Link'])
+            self.assertIn("after={}".format(ids[-1]), link)
+            self.assertIn("rel=next", link)
+
+        RESTApiTestCase.process_test(self, "computers",
+                                     "/computers?orderby=+id&limit=2&after=" +
+                                     str(ids[-1]),
+                                     expected_range=[2, 4])
+
+    def test_after_link_unicode(self):
+        """
+        The link to the next page is built when the last value of the
+        ordered columns is a unicode string with non-ascii characters
+        """
+        from urllib import unquote
+        from aiida.restapi.common.utils import Utils
+
+        utils = Utils(PREFIX=self._url_prefix,
+                      PERPAGE_DEFAULT=self._PERPAGE_DEFAULT,
+                      LIMIT_DEFAULT=self._LIMIT_DEFAULT)
+        headers = utils.build_headers(
+            url=self._url_prefix + "/nodes?orderby=+label&limit=2",
+            next_after=[u'r\xe9sultat'])
+        link = unquote(headers['Link']).decode('utf-8')
+        self.assertIn(u'after="r\xe9sultat"', link)
+        self.assertIn("rel=next", link)
+
+    def test_computers_list_after_offset(self):
+        """
+        If we use after and offset at same time, it would return the
+        error message.
+        """
+        expected_error = "after key is incompatible with offset and with " \
+                         "requesting a specific page"
+        RESTApiTestCase.process_test(self, "computers",
+                                     "/computers?offset=2&after=1&orderby=+id",
+                                     expected_errormsg=expected_error)
+
+    def test_computers_list_count(self):
+        """
+        The total count can be estimated or skipped
+        """
+        self.app.config['TESTING'] = True
+        with self.app.test_client() as client:
+            rv = client.get(self._url_prefix + "/computers?orderby=+id")
+            self.assertEqual(int(rv.headers['X-Total-Count']),
+                             len(self.get_dummy_data()["computers"]))
+
+            rv = client.get(self._url_prefix +
+                            "/computers?orderby=+id&count=estimate")
+            self.assertNotIn('X-Total-Count', rv.headers)
+            self.assertIn('X-Total-Count-Estimate', rv.headers)
+
+            rv = client.get(self._url_prefix + "/computers?orderby=+id&count=none")
+            self.assertNotIn('X-Total-Count', rv.headers)
+            response = json.loads(rv.data)
+            self.assertEqual(len(response["data"]["computers"]),
+                             len(self.get_dummy_data()["computers"]))
+
     ############### list filters ########################
     def test_computers_filter_id1(self):
         """
@@ -774,3 +849,31 @@ class RESTApiTestSuite(RESTApiTestCase):
                                                         url,
                                                         response, uuid=node_uuid)
 
+
+    ############### Translators registry #############
+    def test_node_translators(self):
+        """
+        The translators of the node subclasses are collected only once,
+        and each translator only sees its own subclasses
+        """
+        from aiida.restapi.translator.node import get_node_translators
+        from aiida.restapi.translator.data import DataTranslator
+        from aiida.restapi.translator.data.structure import \
+            StructureDataTranslator
+
+        translators = get_node_translators()
+        self.assertIs(get_node_translators(), translators)
+        for name in ('NodeTranslator', 'CalculationTranslator',
+                     'CodeTranslator', 'DataTranslator',
+                     'StructureDataTranslator', 'KpointsDataTranslator',
+                     'BandsDataTranslator', 'UpfDataTranslator'):
+            self.assertIn(name, translators)
+        self.assertIs(translators['StructureDataTranslator'],
+                      StructureDataTranslator)
+
+        subclasses = DataTranslator(
+            LIMIT_DEFAULT=self._LIMIT_DEFAULT)._subclasses
+        self.assertIn('StructureDataTranslator', subclasses)
+        self.assertIn('DataTranslator', subclasses)
+        self.assertNotIn('CalculationTranslator', subclasses)
+        self.assertNotIn('NodeTranslator', subclasses)
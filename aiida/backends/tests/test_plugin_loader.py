@@ -82,3 +82,30 @@ class TestExistingPlugins(AiidaTestCase):
         """
         tcod_plugins = all_plugins('transports')
         self.assertIsInstance(tcod_plugins, list)
+
+
+class TestNodeClassCache(AiidaTestCase):
+    """
+    Test the cache of the Node classes loaded from the node type strings.
+    """
+    def test_get_node_class(self):
+        from aiida.common import pluginloader
+        from aiida.common.exceptions import MissingPluginError
+        from aiida.orm.data.structure import StructureData
+
+        pluginloader.clear_node_class_cache()
+        type_string = StructureData._plugin_type_string
+        self.assertIs(pluginloader.get_node_class(type_string), StructureData)
+        self.assertIs(pluginloader._node_class_cache[type_string],
+                      StructureData)
+        self.assertIs(pluginloader.get_node_class(type_string), StructureData)
+
+        # Also missing plugins are cached
+        missing = 'data.notexistingplugin.NotExistingPluginData.'
+        for _ in range(2):
+            with self.assertRaises(MissingPluginError):
+                pluginloader.get_node_class(missing)
+        self.assertIsNone(pluginloader._node_class_cache[missing])
+
+        pluginloader.clear_node_class_cache()
+        self.assertEquals(pluginloader._node_class_cache, {})
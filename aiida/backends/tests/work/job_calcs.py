@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from collections import namedtuple
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.work.job_calcs import JobManager
+
+DummyAuthinfo = namedtuple('DummyAuthinfo', ['id'])
+
+
+class DummyTransport(object):
+    def __init__(self, safe_open_interval=0.):
+        self.safe_open_interval = safe_open_interval
+
+    def get_safe_open_interval(self):
+        return self.safe_open_interval
+
+
+class DummyLoop(object):
+    """ A loop that stores the delayed calls until asked to call them """
+
+    def __init__(self):
+        self.delayed = []
+
+    def call_later(self, delay, fn, *args):
+        self.delayed.append((delay, fn, args))
+
+    def do_delayed(self):
+        delayed = self.delayed
+        self.delayed = []
+        for delay, fn, args in delayed:
+            fn(*args)
+
+
+class DummyTransportQueue(object):
+    """ A transport queue that stores the callbacks until asked to call them """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def call_me_with_transport(self, authinfo, callback):
+        self.callbacks.append((authinfo, callback))
+
+    def do_callbacks(self, transport=DummyTransport()):
+        callbacks = self.callbacks
+        self.callbacks = []
+        for authinfo, callback in callbacks:
+            callback(authinfo, transport)
+
+
+class CountingJobManager(JobManager):
+    """ A job manager that records the scheduler queries instead of running them """
+
+    def __init__(self, transport_queue, loop, found_jobs):
+        super(CountingJobManager, self).__init__(transport_queue, loop)
+        self.found_jobs = found_jobs
+        self.queries = []
+
+    def _get_jobs_from_scheduler(self, authinfo, transport, job_ids):
+        self.queries.append(sorted(job_ids))
+        return self.found_jobs
+
+
+class TestJobManager(AiidaTestCase):
+    def setUp(self):
+        super(TestJobManager, self).setUp()
+        self.transport_queue = DummyTransportQueue()
+        self.loop = DummyLoop()
+
+    def test_requests_are_batched(self):
+        found_jobs = {'1': 'info1', '2': 'info2'}
+        manager = CountingJobManager(self.transport_queue, self.loop, found_jobs)
+        authinfo = DummyAuthinfo(1)
+        received = {}
+
+        def make_callback(job_id):
+            def callback(authinfo, transport, job_info):
+                received[job_id] = job_info
+
+            return callback
+
+        for job_id in ['1', '2', '3']:
+            manager.request_job_info_update(authinfo, job_id, make_callback(job_id))
+
+        # Only one transport request for the authinfo
+        self.assertEqual(len(self.transport_queue.callbacks), 1)
+        self.assertEqual(manager.get_num_waiting(), 3)
+
+        self.transport_queue.do_callbacks()
+
+        self.assertEqual(manager.queries, [['1', '2', '3']])
+        self.assertEqual(received, {'1': 'info1', '2': 'info2', '3': None})
+        self.assertEqual(manager.get_num_waiting(), 0)
+
+    def test_separate_authinfos(self):
+        manager = CountingJobManager(self.transport_queue, self.loop, {})
+
+        manager.request_job_info_update(DummyAuthinfo(1), '1', lambda *args: None)
+        manager.request_job_info_update(DummyAuthinfo(2), '1', lambda *args: None)
+
+        self.assertEqual(len(self.transport_queue.callbacks), 2)
+        self.transport_queue.do_callbacks()
+        self.assertEqual(len(manager.queries), 2)
+
+    def test_failed_query_is_retried(self):
+        manager = CountingJobManager(self.transport_queue, self.loop, {'1': 'info1'})
+        received = []
+
+        def fail_once(authinfo, transport, job_ids):
+            manager._get_jobs_from_scheduler = lambda *args: {'1': 'info1'}
+            raise RuntimeError('Scheduler unavailable')
+
+        manager._get_jobs_from_scheduler = fail_once
+        manager.request_job_info_update(DummyAuthinfo(1), '1', lambda a, t, info: received.append(info))
+
+        self.transport_queue.do_callbacks()
+        self.assertEqual(received, [])
+        self.assertEqual(manager.get_num_waiting(), 1)
+
+        # The transport is only asked for again after the backoff
+        self.assertEqual(self.transport_queue.callbacks, [])
+        self.assertEqual([delay for delay, _, _ in self.loop.delayed], [JobManager.MIN_BACKOFF])
+        self.loop.do_delayed()
+
+        self.transport_queue.do_callbacks()
+        self.assertEqual(received, ['info1'])
+
+    def test_failed_query_backoff(self):
+        manager = CountingJobManager(self.transport_queue, self.loop, {})
+
+        def fail(authinfo, transport, job_ids):
+            raise RuntimeError('Scheduler unavailable')
+
+        manager._get_jobs_from_scheduler = fail
+        manager.request_job_info_update(DummyAuthinfo(1), '1', lambda *args: None)
+
+        delays = []
+        for _ in range(3):
+            self.transport_queue.do_callbacks(DummyTransport(safe_open_interval=10.))
+            delays.extend(delay for delay, _, _ in self.loop.delayed)
+            # Requests made during the backoff wait for the same retry
+            manager.request_job_info_update(DummyAuthinfo(1), '2', lambda *args: None)
+            self.assertEqual(self.transport_queue.callbacks, [])
+            self.loop.do_delayed()
+
+        # The delay starts from the safe open interval and doubles
+        self.assertEqual(delays, [10., 20., 40.])
+        self.assertEqual(manager.get_num_waiting(), 4)
@@ -77,3 +77,39 @@ class TestJobProcess(AiidaTestCase):
         }
 
         Job(inputs)
+
+    def test_use_cache(self):
+        """
+        Verify that with ``_use_cache`` the outputs of an identical finished
+        calculation are reused, without submitting the calculation.
+        """
+        from aiida.common.datastructures import calc_states
+        from aiida.common.links import LinkType
+        from aiida.orm.data.parameter import ParameterData
+
+        inputs = {
+            '_options': {
+                'computer': self.computer,
+                'resources': {
+                    'num_machines': 1,
+                    'num_mpiprocs_per_machine': 1
+                },
+                'max_wallclock_seconds': 10,
+            },
+        }
+        cached_calc = Job(inputs).calc
+        output = ParameterData(dict={'a': 1})
+        output.add_link_from(cached_calc, 'output_parameters', LinkType.CREATE)
+        output.store()
+        cached_calc._set_state(calc_states.FINISHED)
+
+        inputs['_use_cache'] = True
+        result, calc = self.runner.run_get_node(Job, **inputs)
+
+        self.assertNotEquals(calc.pk, cached_calc.pk)
+        self.assertEquals(calc.get_state(), calc_states.FINISHED)
+        self.assertEquals(calc.get_extra(JobProcess.CACHED_FROM_EXTRA_KEY), cached_calc.uuid)
+        self.assertEquals(result['output_parameters'].get_dict(), {'a': 1})
+        self.assertNotEquals(result['output_parameters'].pk, output.pk)
+        self.assertEquals(calc.get_outputs_dict(link_type=LinkType.CREATE)['output_parameters'].pk,
+                          result['output_parameters'].pk)
@@ -18,6 +18,7 @@ from aiida.orm import load_node
 from aiida.orm.data.base import Int
 from aiida.orm.data.frozendict import FrozenDict
 from aiida.work.test_utils import DummyProcess, BadOutput
+from aiida.work import persistence
 from aiida import work
 
 
@@ -123,6 +124,39 @@ class TestProcess(AiidaTestCase):
         proc2 = bundle.unbundle()
 
 
+class TestAiiDAPersister(AiidaTestCase):
+    def test_save_load_checkpoint(self):
+        for checkpoint_format in persistence.CHECKPOINT_FORMATS:
+            persister = persistence.AiiDAPersister(checkpoint_format)
+            proc = DummyProcess()
+
+            persister.save_checkpoint(proc)
+            bundle = persister.load_checkpoint(proc.pid)
+            self.assertEqual(bundle, work.Bundle(proc))
+
+    def test_save_load_custom_checkpoint_format(self):
+        class CustomCheckpointFormat(persistence.YamlCheckpointFormat):
+            prefix = 'custom:'
+
+        persister = persistence.AiiDAPersister(CustomCheckpointFormat())
+        proc = DummyProcess()
+
+        persister.save_checkpoint(proc)
+        checkpoint = proc.calc.get_attr(persistence.AiiDAPersister.CALC_NODE_CHECKPOINT_KEY)
+        self.assertTrue(checkpoint.startswith(CustomCheckpointFormat.prefix))
+        bundle = persister.load_checkpoint(proc.pid)
+        self.assertEqual(bundle, work.Bundle(proc))
+
+    def test_load_legacy_checkpoint(self):
+        import yaml
+
+        proc = DummyProcess()
+        proc.calc._set_attr(persistence.AiiDAPersister.CALC_NODE_CHECKPOINT_KEY, yaml.dump(work.Bundle(proc)))
+
+        bundle = persistence.AiiDAPersister().load_checkpoint(proc.pid)
+        self.assertEqual(bundle, work.Bundle(proc))
+
+
 class TestFunctionProcess(AiidaTestCase):
     def test_fixed_inputs(self):
         def wf(a, b, c):
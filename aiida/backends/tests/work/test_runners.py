@@ -53,6 +53,95 @@ class TestWorkchain(AiidaTestCase):
 
         self.assertTrue(future.result())
 
+    def test_call_on_multiple_calculations_finish(self):
+        loop = self.runner.loop
+        procs = [Proc(runner=self.runner) for _ in range(3)]
+        finished = []
+
+        def calc_done(pk):
+            finished.append(pk)
+            if len(finished) == len(procs):
+                loop.stop()
+
+        for proc in procs:
+            self.runner.call_on_calculation_finish(proc.calc.pk, calc_done)
+
+        for proc in procs:
+            proc.play()
+        self._run_loop_for(5.)
+
+        self.assertItemsEqual(finished, [proc.calc.pk for proc in procs])
+
+    def test_poll_calculations_failure(self):
+        """
+        Polling goes on if a query fails.
+        """
+        loop = self.runner.loop
+        proc = Proc(runner=self.runner)
+        finished = []
+
+        def calc_done(pk):
+            finished.append(pk)
+            loop.stop()
+
+        def fail(pks):
+            raise RuntimeError('failing on purpose')
+
+        # Register the callback without scheduling a poll, so that only the
+        # failed poll below can reschedule it
+        self.runner._calculation_callbacks[proc.calc.pk] = [calc_done]
+        self.runner._polling_calculations = True
+        self.runner._get_finished_calculations = fail
+        with self.assertRaises(RuntimeError):
+            self.runner._poll_calculations()
+        del self.runner._get_finished_calculations
+        self.assertTrue(self.runner._polling_calculations)
+        self.assertEqual(self.runner.calculation_poll_stats.num_polls, 1)
+        self.assertEqual(self.runner.calculation_poll_stats.num_failed, 1)
+
+        proc.play()
+        self._run_loop_for(5.)
+
+        self.assertEqual(finished, [proc.calc.pk])
+
+    def test_get_finished_calculations(self):
+        from aiida.common.datastructures import calc_states
+        from aiida.orm.calculation.job import JobCalculation
+
+        calcs = []
+        for state in [calc_states.NEW, calc_states.FINISHED, calc_states.FAILED]:
+            calc = JobCalculation(computer=self.computer, resources={
+                'num_machines': 1, 'num_mpiprocs_per_machine': 1}).store()
+            calc._set_state(state)
+            calcs.append(calc)
+
+        finished, missing = self.runner._get_finished_calculations([calc.pk for calc in calcs] + [-1])
+        self.assertItemsEqual(finished, [calcs[1].pk, calcs[2].pk])
+        self.assertEqual(missing, [-1])
+
+    def test_call_on_missing_calculation_finish(self):
+        from aiida.common.exceptions import NotExistent
+
+        with self.assertRaises(NotExistent):
+            self.runner.call_on_calculation_finish(-1, lambda pk: None)
+        self.assertEqual(self.runner._calculation_callbacks, {})
+
+    def test_poll_missing_calculation(self):
+        """
+        A calculation that no longer exists is no longer polled
+        """
+        called = []
+
+        self.runner._calculation_callbacks[-1] = [called.append]
+        self.runner._polling_calculations = True
+        self.runner._poll_calculations()
+
+        self.assertEqual(self.runner._calculation_callbacks, {})
+        self.assertFalse(self.runner._polling_calculations)
+        self.assertEqual(called, [])
+        self.assertEqual(self.runner.calculation_poll_stats.num_polls, 1)
+        self.assertEqual(self.runner.calculation_poll_stats.num_failed, 0)
+
     def test_call_on_wf_finish(self):
         loop = self.runner.loop
         future = plum.Future()
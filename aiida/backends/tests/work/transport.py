@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from aiida.backends.testbase import AiidaTestCase
+from aiida.transport.plugins.local import LocalTransport
+from aiida.work.transport import TransportQueue
+
+
+class SlowLocalTransport(LocalTransport):
+    """ A local transport that should not be opened more often than every 5s """
+
+    def get_safe_open_interval(self):
+        return 5.
+
+
+class DummyAuthinfo(object):
+    def __init__(self, pk, transport_class=LocalTransport):
+        self.id = pk
+        self.num_transports = 0
+        self._transport_class = transport_class
+
+    def get_transport(self):
+        self.num_transports += 1
+        return self._transport_class()
+
+
+class DummyLoop(object):
+    """ A loop that stores callbacks until explicitly asked to run them """
+
+    def __init__(self):
+        self.callbacks = []
+        self.delayed = []
+
+    def add_callback(self, fn, *args):
+        self.callbacks.append((fn, args))
+
+    def call_later(self, delay, fn, *args):
+        self.delayed.append((delay, fn, args))
+
+    def run_callbacks(self):
+        callbacks = self.callbacks
+        self.callbacks = []
+        for fn, args in callbacks:
+            fn(*args)
+
+    def run_delayed(self):
+        delayed = self.delayed
+        self.delayed = []
+        for delay, fn, args in delayed:
+            fn(*args)
+
+
+class TestTransportQueue(AiidaTestCase):
+    def setUp(self):
+        super(TestTransportQueue, self).setUp()
+        self.loop = DummyLoop()
+        self.authinfo = DummyAuthinfo(1)
+
+    def test_transport_is_reused(self):
+        queue = TransportQueue(self.loop, interval=0.)
+        transports = []
+
+        def callback(authinfo, transport):
+            self.assertTrue(transport.is_open)
+            transports.append(transport)
+
+        queue.call_me_with_transport(self.authinfo, callback)
+        self.loop.run_callbacks()
+        queue.call_me_with_transport(self.authinfo, callback)
+        self.loop.run_callbacks()
+
+        self.assertEqual(len(transports), 2)
+        self.assertIs(transports[0], transports[1])
+        self.assertEqual(self.authinfo.num_transports, 1)
+        self.assertTrue(transports[0].is_open)
+
+        queue.close()
+        self.assertFalse(transports[0].is_open)
+
+    def test_idle_transport_is_closed(self):
+        queue = TransportQueue(self.loop)
+        transports = []
+
+        queue.call_me_with_transport(self.authinfo, lambda authinfo, transport: transports.append(transport))
+        self.loop.run_callbacks()
+        self.assertTrue(transports[0].is_open)
+
+        # Fire the idle timeout
+        self.loop.run_delayed()
+        self.assertFalse(transports[0].is_open)
+
+        # A new transport is opened for the next request
+        queue.call_me_with_transport(self.authinfo, lambda authinfo, transport: transports.append(transport))
+        self.loop.run_callbacks()
+        self.assertIsNot(transports[0], transports[1])
+        self.assertEqual(self.authinfo.num_transports, 2)
+        queue.close()
+
+    def test_no_idle_timeout(self):
+        queue = TransportQueue(self.loop, idle_timeout=0.)
+        transports = []
+
+        queue.call_me_with_transport(self.authinfo, lambda authinfo, transport: transports.append(transport))
+        self.loop.run_callbacks()
+        self.assertFalse(transports[0].is_open)
+
+    def test_reuse_interval(self):
+        """
+        A client asking again as soon as it is serviced gets the open
+        transport only after the interval, bounded by the safe open interval
+        of the transport
+        """
+        queue = TransportQueue(self.loop, interval=10.)
+        authinfo = DummyAuthinfo(2, SlowLocalTransport)
+        transports = []
+
+        def callback(authinfo, transport):
+            transports.append(transport)
+            if len(transports) < 2:
+                queue.call_me_with_transport(authinfo, callback)
+
+        queue.call_me_with_transport(authinfo, callback)
+        self.loop.run_delayed()
+        self.assertEqual(len(transports), 1)
+
+        # The request made from within the callback is delayed
+        self.assertEqual(self.loop.callbacks, [])
+        delays = [delay for delay, fn, args in self.loop.delayed if fn == queue._do_callback]
+        self.assertEqual(len(delays), 1)
+        self.assertTrue(0. < delays[0] <= 5.)
+
+        self.loop.run_delayed()
+        self.assertEqual(len(transports), 2)
+        self.assertIs(transports[0], transports[1])
+        self.assertEqual(authinfo.num_transports, 1)
+        queue.close()
+
+    def test_reuse_without_safe_interval(self):
+        """
+        A transport that can be opened with any frequency is reused without
+        waiting for the interval
+        """
+        queue = TransportQueue(self.loop)
+        transports = []
+
+        def callback(authinfo, transport):
+            transports.append(transport)
+            if len(transports) < 2:
+                queue.call_me_with_transport(authinfo, callback)
+
+        queue.call_me_with_transport(self.authinfo, callback)
+        self.loop.run_callbacks()
+        self.assertEqual(len(transports), 1)
+        self.assertEqual(len(self.loop.callbacks), 1)
+
+        self.loop.run_callbacks()
+        self.assertEqual(len(transports), 2)
+        self.assertIs(transports[0], transports[1])
+        queue.close()
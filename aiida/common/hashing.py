@@ -182,6 +182,7 @@ def make_hash(object_to_hash, float_precision=12):
     of dictionaries using hashes.
     """
     import numpy as np
+    from aiida.common.folders import Folder
 
     if isinstance(object_to_hash, (tuple, list)):
         hashes = tuple([
@@ -223,6 +224,9 @@ def make_hash(object_to_hash, float_precision=12):
     elif type(object_to_hash).__module__ == np.__name__:
         return make_hash_with_type('N', str(object_to_hash))
 
+    elif isinstance(object_to_hash, unicode):
+        return make_hash_with_type('s', object_to_hash.encode('utf-8'))
+
     elif isinstance(object_to_hash, basestring):
         return make_hash_with_type('s', object_to_hash)
 
@@ -240,7 +244,33 @@ def make_hash(object_to_hash, float_precision=12):
 
     elif isinstance(object_to_hash, datetime):
         return make_hash_with_type('d', str(object_to_hash))
+
+    elif isinstance(object_to_hash, Folder):
+        return make_hash_with_type('F', make_hash(_get_folder_file_hashes(object_to_hash)))
     # Possibly add more types here, as needed
     else:
         raise ValueError("Value of type {} cannot be hashed".format(
                 type(object_to_hash)))
+
+
+def _get_folder_file_hashes(folder, blocksize=65536):
+    """
+    Get the hashes of the content of all the files in a folder, recursively.
+
+    :param folder: the folder to hash
+    :param blocksize: the size of the chunks in which files are read
+    :return: a sorted list of tuples (relative path, hash of the content)
+    """
+    import os
+
+    file_hashes = []
+    for dirpath, _, filenames in os.walk(folder.abspath):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            file_hash = hashlib.sha224()
+            with open(path, 'rb') as handle:
+                for block in iter(lambda: handle.read(blocksize), b''):
+                    file_hash.update(block)
+            file_hashes.append((os.path.relpath(path, folder.abspath), file_hash.hexdigest()))
+
+    return sorted(file_hashes)
@@ -150,6 +150,49 @@ def load_plugin(base_class, plugins_module, plugin_type):
     return plugin
 
 
+# The Node classes found by get_node_class, indexed by node type string
+# (None if no plugin was found for the type string)
+_node_class_cache = {}
+
+
+def get_node_class(type_string):
+    """
+    Return the Node subclass corresponding to a node type string (as stored
+    in the DbNode table). The result (also if no plugin is found) is cached,
+    so that the plugin is looked up only once per type string, and not for
+    every node that is loaded.
+
+    :param type_string: the node type string, e.g. 'data.structure.StructureData.'
+    :return: the Node subclass
+    :raise DbContentError: if the type string is not valid
+    :raise MissingPluginError: if no plugin is found for the type string
+    """
+    try:
+        plugin_class = _node_class_cache[type_string]
+    except KeyError:
+        from aiida.common.old_pluginloader import from_type_to_pluginclassname
+        from aiida.orm.node import Node
+
+        pluginclassname = from_type_to_pluginclassname(type_string)
+        try:
+            plugin_class = load_plugin(Node, 'aiida.orm', pluginclassname)
+        except MissingPluginError:
+            plugin_class = None
+        _node_class_cache[type_string] = plugin_class
+
+    if plugin_class is None:
+        raise MissingPluginError(
+            "No plugin found for type '{}'".format(type_string))
+    return plugin_class
+
+
+def clear_node_class_cache():
+    """
+    Clear the cache of get_node_class, e.g. after installing new plugins.
+    """
+    _node_class_cache.clear()
+
+
 def BaseFactory(module, base_class, base_modname, suffix=None):
     """
     Return a plugin class, also find external plugins
@@ -902,7 +902,15 @@ _property_table = {
         "bool",
         "Boolean whether to print deprecation warnings",
         False,
-        None)
+        None),
+    "arraydata.cache_size_mb": (
+        "arraydata_cache_size_mb",
+        "int",
+        "Maximum size (in MB) of the in-memory cache of the arrays read from "
+        "disk by the stored ArrayData nodes (shared by all nodes); "
+        "0 disables the cache",
+        256,
+        None),
 }
 
 
@@ -28,11 +28,30 @@ from aiida.orm import load_node
 from aiida.orm import DataFactory
 from aiida.orm.data.folder import FolderData
 from aiida.utils.logger import get_dblogger_extra
+from collections import namedtuple
 import os
+import threading
 
 
 execlogger = aiidalogger.getChild('execmanager')
 
+# The minimum number of items of a retrieve list for which they are retrieved
+# packed in a single archive, rather than with one transfer each
+RETRIEVE_ARCHIVE_MIN_FILES = 10
+
+RetrievalStats = namedtuple('RetrievalStats', ['num_items', 'num_bytes', 'seconds'])
+
+# The maximum number of (computer, aiidauser) pairs that a daemon task
+# processes at the same time, and the time in seconds after which it stops
+# waiting for one of them
+MAX_CONCURRENT_PAIRS = 4
+PAIR_TIMEOUT = 600
+
+# The bookkeeping of process_pairs_concurrently, shared by all the tasks
+_pairs_lock = threading.Lock()
+_busy_pairs = set()
+_pair_durations = {}
+
 
 def update_running_calcs_status(authinfo):
     """
@@ -205,22 +224,24 @@ def retrieve_jobs():
     # ~ only_enabled=True)
     # ~ )
 
-    for computer, aiidauser in computers_users_to_check:
-        execlogger.debug("({},{}) pair to check".format(
-            aiidauser.email, computer.name))
-        try:
-            authinfo = get_authinfo(computer.dbcomputer, aiidauser._dbuser)
-            retrieve_computed_for_authinfo(authinfo)
-        except Exception as e:
-            msg = ("Error while retrieving calculation status for "
-                   "aiidauser={} on computer={}, "
-                   "error type is {}, error message: {}".format(
-                aiidauser.email,
-                computer.name,
-                e.__class__.__name__, e.message))
-            execlogger.error(msg)
-            # Continue with next computer
-            continue
+    process_pairs_concurrently(
+        'retrieve_jobs', computers_users_to_check, _retrieve_jobs_for_pair)
+
+
+def _retrieve_jobs_for_pair(computer, aiidauser):
+    execlogger.debug("({},{}) pair to check".format(
+        aiidauser.email, computer.name))
+    try:
+        authinfo = get_authinfo(computer.dbcomputer, aiidauser._dbuser)
+        retrieve_computed_for_authinfo(authinfo)
+    except Exception as e:
+        msg = ("Error while retrieving calculation status for "
+               "aiidauser={} on computer={}, "
+               "error type is {}, error message: {}".format(
+            aiidauser.email,
+            computer.name,
+            e.__class__.__name__, e.message))
+        execlogger.error(msg)
 
 
 def update_jobs():
@@ -237,32 +258,32 @@ def update_jobs():
         only_enabled=True
     )
 
-    for computer, aiidauser in computers_users_to_check:
-        execlogger.debug(
-            "({},{}) pair to check".format(aiidauser.email, computer.name)
-        )
+    process_pairs_concurrently(
+        'update_jobs', computers_users_to_check, _update_jobs_for_pair)
 
-        try:
-            authinfo = get_authinfo(computer.dbcomputer, aiidauser._dbuser)
-            computed_calcs = update_running_calcs_status(authinfo)
-        except Exception as e:
-            msg = ("Error while updating calculation status "
-                   "for aiidauser={} on computer={}, "
-                   "error type is {}, error message: {}".format(
-                aiidauser.email,
-                computer.name,
-                e.__class__.__name__, e.message))
-            execlogger.error(msg)
-            # Continue with next computer
-            continue
+
+def _update_jobs_for_pair(computer, aiidauser):
+    execlogger.debug(
+        "({},{}) pair to check".format(aiidauser.email, computer.name)
+    )
+
+    try:
+        authinfo = get_authinfo(computer.dbcomputer, aiidauser._dbuser)
+        computed_calcs = update_running_calcs_status(authinfo)
+    except Exception as e:
+        msg = ("Error while updating calculation status "
+               "for aiidauser={} on computer={}, "
+               "error type is {}, error message: {}".format(
+            aiidauser.email,
+            computer.name,
+            e.__class__.__name__, e.message))
+        execlogger.error(msg)
 
 
 def submit_jobs():
     """
     Submit all jobs in the TOSUBMIT state.
     """
-    from aiida.orm import JobCalculation, Computer, User
-    from aiida.utils.logger import get_dblogger_extra
     from aiida.backends.utils import QueryFactory
 
     qmanager = QueryFactory()()
@@ -273,55 +294,181 @@ def submit_jobs():
         only_enabled=True
     )
 
-    for computer, aiidauser in computers_users_to_check:
+    process_pairs_concurrently(
+        'submit_jobs', computers_users_to_check, _submit_jobs_for_pair)
 
-        execlogger.error("({},{}) pair to submit".format(
-            aiidauser.email, computer.name))
 
+def _submit_jobs_for_pair(computer, aiidauser):
+    from aiida.utils.logger import get_dblogger_extra
+    from aiida.backends.utils import QueryFactory
+
+    execlogger.error("({},{}) pair to submit".format(
+        aiidauser.email, computer.name))
+
+    try:
         try:
-            try:
-                authinfo = get_authinfo(computer.dbcomputer, aiidauser._dbuser)
-            except AuthenticationError:
-                # TODO!!
-                # Put each calculation in the SUBMISSIONFAILED state because
-                # I do not have AuthInfo to submit them
-                calcs_to_inquire = qmanager.query_jobcalculations_by_computer_user_state(
-                    state=calc_states.TOSUBMIT,
-                    computer=computer, user=aiidauser
-                )
-                # ~ calcs_to_inquire = JobCalculation._get_all_with_state(
-                # ~ state=calc_states.TOSUBMIT,
-                # ~ computer=computer, user=aiidauser)
-                for calc in calcs_to_inquire:
-                    try:
-                        calc._set_state(calc_states.SUBMISSIONFAILED)
-                    except ModificationNotAllowed:
-                        # Someone already set it, just skip
-                        pass
-                    logger_extra = get_dblogger_extra(calc)
-                    execlogger.error("Submission of calc {} failed, "
-                                     "computer pk= {} ({}) is not configured "
-                                     "for aiidauser {}".format(
-                        calc.pk, computer.pk, computer.get_name(),
-                        aiidauser.email),
-                        extra=logger_extra)
-                # Go to the next (dbcomputer,aiidauser) pair
+            authinfo = get_authinfo(computer.dbcomputer, aiidauser._dbuser)
+        except AuthenticationError:
+            # TODO!!
+            # Put each calculation in the SUBMISSIONFAILED state because
+            # I do not have AuthInfo to submit them
+            qmanager = QueryFactory()()
+            calcs_to_inquire = qmanager.query_jobcalculations_by_computer_user_state(
+                state=calc_states.TOSUBMIT,
+                computer=computer, user=aiidauser
+            )
+            # ~ calcs_to_inquire = JobCalculation._get_all_with_state(
+            # ~ state=calc_states.TOSUBMIT,
+            # ~ computer=computer, user=aiidauser)
+            for calc in calcs_to_inquire:
+                try:
+                    calc._set_state(calc_states.SUBMISSIONFAILED)
+                except ModificationNotAllowed:
+                    # Someone already set it, just skip
+                    pass
+                logger_extra = get_dblogger_extra(calc)
+                execlogger.error("Submission of calc {} failed, "
+                                 "computer pk= {} ({}) is not configured "
+                                 "for aiidauser {}".format(
+                    calc.pk, computer.pk, computer.get_name(),
+                    aiidauser.email),
+                    extra=logger_extra)
+            # Go to the next (dbcomputer,aiidauser) pair
+            return
+
+        submitted_calcs = submit_jobs_with_authinfo(authinfo)
+    except Exception as e:
+        import traceback
+
+        msg = ("Error while submitting jobs "
+               "for aiidauser={} on computer={}, "
+               "error type is {}, traceback: {}".format(
+            aiidauser.email,
+            computer.name,
+            e.__class__.__name__, traceback.format_exc()))
+        print msg
+        execlogger.error(msg)
+
+
+def process_pairs_concurrently(task_name, computers_users, process):
+    """
+    Call process(computer, aiidauser) for each (computer, aiidauser) pair,
+    each in its own thread and with at most MAX_CONCURRENT_PAIRS threads
+    running at the same time, so that a slow computer does not hold up the
+    others.
+
+    A thread cannot be killed: the function stops waiting for a pair after
+    PAIR_TIMEOUT seconds, and the pair is skipped by the following calls for
+    the same task until its thread has finished.
+
+    The duration of the last processing of each pair is recorded, see
+    get_pair_durations.
+
+    :param task_name: the name of the daemon task, used for the bookkeeping
+    :param computers_users: an iterable of (computer, aiidauser) pairs
+    :param process: the function to call for each pair. It should catch its
+        own exceptions, anything it raises is only logged.
+    """
+    import time
+
+    to_process = []
+    for computer, aiidauser in computers_users:
+        key = (task_name, computer.name, aiidauser.email)
+        with _pairs_lock:
+            if key in _busy_pairs:
+                execlogger.warning(
+                    "{} for aiidauser={} on computer={} is still running from "
+                    "a previous cycle, skipping it".format(
+                        task_name, aiidauser.email, computer.name))
                 continue
+            _busy_pairs.add(key)
+        to_process.append((key, computer.pk, aiidauser.pk))
+
+    running = {}
+    while to_process or running:
+        while to_process and len(running) < MAX_CONCURRENT_PAIRS:
+            key, computer_pk, aiidauser_pk = to_process.pop(0)
+            thread = threading.Thread(
+                target=_process_pair,
+                args=(key, computer_pk, aiidauser_pk, process),
+                name='{}-{}-{}'.format(*key))
+            thread.daemon = True
+            thread.start()
+            running[key] = (thread, time.time())
+
+        for key, (thread, start_time) in running.items():
+            thread.join(0.1)
+            if not thread.is_alive():
+                del running[key]
+            elif time.time() - start_time > PAIR_TIMEOUT:
+                execlogger.error(
+                    "{} for aiidauser={} on computer={} did not finish within "
+                    "{} s, no longer waiting for it".format(
+                        key[0], key[2], key[1], PAIR_TIMEOUT))
+                del running[key]
 
-            submitted_calcs = submit_jobs_with_authinfo(authinfo)
-        except Exception as e:
-            import traceback
 
-            msg = ("Error while submitting jobs "
-                   "for aiidauser={} on computer={}, "
-                   "error type is {}, traceback: {}".format(
-                aiidauser.email,
-                computer.name,
-                e.__class__.__name__, traceback.format_exc()))
-            print msg
-            execlogger.error(msg)
-            # Continue with next computer
-            continue
+def get_pair_durations(task_name=None):
+    """
+    Return the duration, in seconds, of the last processing of each
+    (computer, aiidauser) pair by the daemon tasks.
+
+    :param task_name: if given, only return the durations for this task
+        (e.g. 'submit_jobs', 'update_jobs' or 'retrieve_jobs')
+    :return: a dictionary with (task name, computer name, aiidauser email)
+        tuples as keys
+    """
+    with _pairs_lock:
+        return {key: duration for key, duration in _pair_durations.iteritems()
+                if task_name is None or key[0] == task_name}
+
+
+def _process_pair(key, computer_pk, aiidauser_pk, process):
+    """
+    The body of the threads of process_pairs_concurrently. The computer and
+    the user are loaded again, so that they belong to the database
+    connection of this thread.
+    """
+    import time
+    from aiida.orm import Computer, User
+
+    start_time = time.time()
+    try:
+        computer = Computer.get(computer_pk)
+        aiidauser = User.search_for_users(id=aiidauser_pk)[0]
+        process(computer, aiidauser)
+    except Exception:
+        import traceback
+        execlogger.error("Unexpected error while running {} for aiidauser={} "
+                         "on computer={}: {}".format(key[0], key[2], key[1],
+                                                     traceback.format_exc()))
+    finally:
+        duration = time.time() - start_time
+        with _pairs_lock:
+            _pair_durations[key] = duration
+            _busy_pairs.discard(key)
+        execlogger.debug("{} for aiidauser={} on computer={} took {:.2f} s".format(
+            key[0], key[2], key[1], duration))
+        _close_thread_db_connection()
+
+
+def _close_thread_db_connection():
+    """
+    Close the database connection of the current thread, which is not
+    reused once the thread ends, and discard its SQLAlchemy session.
+    """
+    from aiida.backends import settings
+    from aiida.backends.profile import BACKEND_DJANGO, BACKEND_SQLA
+
+    if settings.BACKEND == BACKEND_DJANGO:
+        from django.db import connection
+        connection.close()
+    elif settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends import sqlalchemy as sa
+        # Remove the session from the registry rather than only closing it,
+        # so that the registry does not keep a session per finished thread
+        if sa.scopedsessionclass is not None:
+            sa.scopedsessionclass.remove()
 
 
 # endregion
@@ -498,75 +645,24 @@ def submit_calc(calc, authinfo, transport=None):
                     "No remote_working_directory configured for computer "
                     "'{}'".format(calc.pk, computer.name))
 
-            # If it already exists, no exception is raised
-            try:
-                t.chdir(remote_working_directory)
-            except IOError:
-                execlogger.debug(
-                    "[submission of calc {}] "
-                    "Unable to chdir in {}, trying to create it".
-                        format(calc.pk, remote_working_directory),
-                    extra=logger_extra)
-                try:
-                    t.makedirs(remote_working_directory)
-                    t.chdir(remote_working_directory)
-                except (IOError, OSError) as e:
-                    raise ConfigurationError(
-                        "[submission of calc {}] "
-                        "Unable to create the remote directory {} on "
-                        "computer '{}': {}".
-                            format(calc.pk, remote_working_directory, computer.name,
-                                   e.message))
-            # Store remotely with sharding (here is where we choose
-            # the folder structure of remote jobs; then I store this
-            # in the calculation properties using _set_remote_dir
-            # and I do not have to know the logic, but I just need to
-            # read the absolute path from the calculation properties.
-            t.mkdir(calcinfo.uuid[:2], ignore_existing=True)
-            t.chdir(calcinfo.uuid[:2])
-            t.mkdir(calcinfo.uuid[2:4], ignore_existing=True)
-            t.chdir(calcinfo.uuid[2:4])
-            t.mkdir(calcinfo.uuid[4:])
-            t.chdir(calcinfo.uuid[4:])
-            workdir = t.getcwd()
-            # I store the workdir of the calculation for later file
-            # retrieval
-            calc._set_remote_workdir(workdir)
-
-            # I first create the code files, so that the code can put
-            # default files to be overwritten by the plugin itself.
-            # Still, beware! The code file itself could be overwritten...
-            # But I checked for this earlier.
-            for code in input_codes:
-                if code.is_local():
-                    # Note: this will possibly overwrite files
-                    for f in code.get_folder_list():
-                        t.put(code.get_abs_path(f), f)
-                    t.chmod(code.get_local_executable(), 0755)  # rwxr-xr-x
-
-            # copy all files, recursively with folders
-            for f in folder.get_content_list():
-                execlogger.debug("[submission of calc {}] "
-                                 "copying file/folder {}...".format(calc.pk, f),
-                                 extra=logger_extra)
-                t.put(folder.get_abs_path(f), f)
-
             # local_copy_list is a list of tuples,
             # each with (src_abs_path, dest_rel_path)
             # NOTE: validation of these lists are done
             # inside calc._presubmit()
-            local_copy_list = calcinfo.local_copy_list
+            local_copy_list = calcinfo.local_copy_list or []
             remote_copy_list = calcinfo.remote_copy_list
             remote_symlink_list = calcinfo.remote_symlink_list
 
-            if local_copy_list is not None:
-                for src_abs_path, dest_rel_path in local_copy_list:
-                    execlogger.debug("[submission of calc {}] "
-                                     "copying local file/folder to {}".format(
-                        calc.pk, dest_rel_path),
-                        extra=logger_extra)
-                    t.put(src_abs_path, dest_rel_path)
-
+            if computer.get_upload_archive():
+                upload_files = _upload_with_archive
+            else:
+                upload_files = _upload_file_by_file
+            workdir = upload_files(calc, t, remote_working_directory,
+                                   calcinfo.uuid, folder, input_codes,
+                                   local_copy_list, logger_extra)
+            # I store the workdir of the calculation for later file
+            # retrieval
+            calc._set_remote_workdir(workdir)
             if remote_copy_list is not None:
                 for (remote_computer_uuid, remote_abs_path,
                      dest_rel_path) in remote_copy_list:
@@ -651,6 +747,144 @@ def submit_calc(calc, authinfo, transport=None):
             t.close()
 
 
+def _upload_file_by_file(calc, t, remote_working_directory, uuid, folder,
+                         input_codes, local_copy_list, logger_extra):
+    """
+    Create the sharded working directory of a calculation and copy to it the
+    files of the local codes, of the input folder and of the local_copy_list,
+    one item at a time.
+
+    :return: the absolute path of the working directory, which is also the
+        current directory of the transport
+    """
+    # If it already exists, no exception is raised
+    try:
+        t.chdir(remote_working_directory)
+    except IOError:
+        execlogger.debug(
+            "[submission of calc {}] "
+            "Unable to chdir in {}, trying to create it".
+                format(calc.pk, remote_working_directory),
+            extra=logger_extra)
+        try:
+            t.makedirs(remote_working_directory)
+            t.chdir(remote_working_directory)
+        except (IOError, OSError) as e:
+            raise ConfigurationError(
+                "[submission of calc {}] "
+                "Unable to create the remote directory {} on "
+                "computer '{}': {}".
+                    format(calc.pk, remote_working_directory, calc.get_computer().name,
+                           e.message))
+    # Store remotely with sharding (here is where we choose
+    # the folder structure of remote jobs; then I store this
+    # in the calculation properties using _set_remote_dir
+    # and I do not have to know the logic, but I just need to
+    # read the absolute path from the calculation properties.
+    t.mkdir(uuid[:2], ignore_existing=True)
+    t.chdir(uuid[:2])
+    t.mkdir(uuid[2:4], ignore_existing=True)
+    t.chdir(uuid[2:4])
+    t.mkdir(uuid[4:])
+    t.chdir(uuid[4:])
+    workdir = t.getcwd()
+
+    # I first create the code files, so that the code can put
+    # default files to be overwritten by the plugin itself.
+    # Still, beware! The code file itself could be overwritten...
+    # But I checked for this earlier.
+    for code in input_codes:
+        if code.is_local():
+            # Note: this will possibly overwrite files
+            for f in code.get_folder_list():
+                t.put(code.get_abs_path(f), f)
+            t.chmod(code.get_local_executable(), 0755)  # rwxr-xr-x
+
+    # copy all files, recursively with folders
+    for f in folder.get_content_list():
+        execlogger.debug("[submission of calc {}] "
+                         "copying file/folder {}...".format(calc.pk, f),
+                         extra=logger_extra)
+        t.put(folder.get_abs_path(f), f)
+
+    for src_abs_path, dest_rel_path in local_copy_list:
+        execlogger.debug("[submission of calc {}] "
+                         "copying local file/folder to {}".format(
+            calc.pk, dest_rel_path),
+            extra=logger_extra)
+        t.put(src_abs_path, dest_rel_path)
+
+    return workdir
+
+
+def _upload_with_archive(calc, t, remote_working_directory, uuid, folder,
+                         input_codes, local_copy_list, logger_extra):
+    """
+    Same as _upload_file_by_file, but the working directory is created with a
+    single command and all the files are packed in one archive, that is copied
+    in one go and unpacked on the remote. The remote needs a tar executable.
+
+    :return: the absolute path of the working directory, which is also the
+        current directory of the transport
+    """
+    import tarfile
+    from aiida.common.utils import escape_for_bash
+
+    # The same sharding as in _upload_file_by_file
+    shard_folder = os.path.join(remote_working_directory, uuid[:2], uuid[2:4])
+    workdir = os.path.join(shard_folder, uuid[4:])
+
+    retval, stdout, stderr = t.exec_command_wait(
+        'mkdir -p {} && mkdir {}'.format(escape_for_bash(shard_folder),
+                                         escape_for_bash(workdir)))
+    if retval != 0:
+        raise ConfigurationError(
+            "[submission of calc {}] "
+            "Unable to create the remote directory {} on "
+            "computer '{}': {}".
+                format(calc.pk, workdir, calc.get_computer().name, stderr))
+    t.chdir(workdir)
+
+    def make_executable(tarinfo):
+        tarinfo.mode = 0755  # rwxr-xr-x
+        return tarinfo
+
+    archive_name = '.aiida_upload.tar.gz'
+    with SandboxFolder() as sandbox:
+        local_archive = os.path.join(sandbox.abspath, archive_name)
+        # The members are extracted in order, so later ones overwrite earlier
+        # ones exactly as with the sequence of puts of _upload_file_by_file
+        with tarfile.open(local_archive, 'w:gz', dereference=True) as archive:
+            for code in input_codes:
+                if code.is_local():
+                    for f in code.get_folder_list():
+                        if f == code.get_local_executable():
+                            archive.add(code.get_abs_path(f), f,
+                                        filter=make_executable)
+                        else:
+                            archive.add(code.get_abs_path(f), f)
+
+            for f in folder.get_content_list():
+                archive.add(folder.get_abs_path(f), f)
+
+            for src_abs_path, dest_rel_path in local_copy_list:
+                archive.add(src_abs_path, dest_rel_path)
+
+        execlogger.debug("[submission of calc {}] "
+                         "copying all files in a single archive of {} bytes".format(
+            calc.pk, os.path.getsize(local_archive)),
+            extra=logger_extra)
+        t.putfile(local_archive, archive_name)
+
+    retval, stdout, stderr = t.exec_command_wait(
+        'tar -xzf {0} && rm -f {0}'.format(archive_name))
+    if retval != 0:
+        raise IOError("[submission of calc {}] Unable to unpack the input "
+                      "files in {}: {}".format(calc.pk, workdir, stderr))
+
+    return workdir
+
+
 def retrieve_computed_for_authinfo(authinfo):
     from aiida.orm import JobCalculation
     from aiida.common.folders import SandboxFolder
@@ -957,12 +1191,54 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
     treated as the work directory of the folder and the depth integer determines
     upto what level of the original remotepath nesting the files will be copied.
 
+    If at least RETRIEVE_ARCHIVE_MIN_FILES items have to be retrieved, they are
+    first packed in a single archive on the remote, so that they are transferred
+    with one request instead of one per file. Anything that could not be
+    obtained through the archive is retrieved one item at a time.
+
     :param transport: the Transport instance
     :param folder: a local Folder instance for the transport to store files into
     :param retrieve_list: the list of files to retrieve
+    :return: a RetrievalStats tuple with the number of retrieved items, their
+        total size in bytes and the time spent retrieving them in seconds
     """
-    import os
+    import time
+
+    start_time = time.time()
+
+    all_pairs = _get_retrieve_pairs(transport, folder, retrieve_list)
+
+    if len(all_pairs) >= RETRIEVE_ARCHIVE_MIN_FILES:
+        to_retrieve = _retrieve_with_archive(calculation, transport, folder, all_pairs)
+    else:
+        to_retrieve = all_pairs
+
+    for rem, loc in to_retrieve:
+        transport.logger.debug("[retrieval of calc {}] Trying to retrieve remote item '{}'".format(calculation.pk, rem))
+        transport.get(rem, os.path.join(folder.abspath, loc), ignore_nonexisting=True)
+
+    num_items = 0
+    num_bytes = 0
+    for loc in set(loc for rem, loc in all_pairs):
+        path = os.path.join(folder.abspath, loc)
+        if os.path.exists(path):
+            num_items += 1
+            num_bytes += _get_local_size(path)
+
+    stats = RetrievalStats(num_items, num_bytes, time.time() - start_time)
+    execlogger.debug("[retrieval of calc {}] Retrieved {} item(s), {} bytes in {:.2f} s".format(
+        calculation.pk, stats.num_items, stats.num_bytes, stats.seconds))
 
+    return stats
+
+
+def _get_retrieve_pairs(transport, folder, retrieve_list):
+    """
+    Expand the entries of a retrieve list (see retrieve_files_from_list) into
+    a list of (remote path, local path) tuples, creating the local
+    directories that are needed.
+    """
+    pairs = []
     for item in retrieve_list:
         if isinstance(item, list):
             tmp_rname, tmp_lname, depth = item
@@ -975,7 +1251,7 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
                     local_names.append(os.path.sep.join([tmp_lname] + to_append))
             else:
                 remote_names = [tmp_rname]
-                to_append = remote_names.split(os.path.sep)[-depth:] if depth > 0 else []
+                to_append = tmp_rname.split(os.path.sep)[-depth:] if depth > 0 else []
                 local_names = [os.path.sep.join([tmp_lname] + to_append)]
             if depth > 1:  # create directories in the folder, if needed
                 for this_local_file in local_names:
@@ -992,6 +1268,131 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
                 remote_names = [item]
                 local_names = [os.path.split(item)[1]]
 
-        for rem, loc in zip(remote_names, local_names):
-            transport.logger.debug("[retrieval of calc {}] Trying to retrieve remote item '{}'".format(calculation.pk, rem))
-            transport.get(rem, os.path.join(folder.abspath, loc), ignore_nonexisting=True)
+        pairs.extend(zip(remote_names, local_names))
+
+    return pairs
+
+
+def _only_missing_tar_members(stderr):
+    """
+    Check whether the errors reported by tar when packing the archive are only
+    about items that do not exist, in which case the archive was created
+    anyway with all the other items.
+
+    :param stderr: the stderr of the tar command
+    :return: True if all the lines are about missing items or harmless
+    """
+    for line in stderr.splitlines():
+        if not line.strip():
+            continue
+        if 'No such file or directory' in line or 'Exiting with failure status due to previous errors' in line \
+                or 'Removing leading' in line:
+            continue
+        return False
+    return True
+
+
+def _retrieve_with_archive(calculation, transport, folder, pairs):
+    """
+    Retrieve the remote items of a list of (remote path, local path) tuples by
+    packing them in a single tar archive on the remote, copying the archive
+    and unpacking it locally.
+
+    :return: the list of the tuples that could not be retrieved this way and
+        have to be retrieved one by one
+    """
+    import shutil
+    import tarfile
+    import uuid
+
+    # Items that would end up outside of the extraction folder are left out
+    archived = []
+    not_archived = []
+    for rem, loc in pairs:
+        member = os.path.normpath(rem.lstrip(os.path.sep))
+        if member.split(os.path.sep)[0] in (os.path.curdir, os.path.pardir):
+            not_archived.append((rem, loc))
+        else:
+            archived.append((rem, loc, member))
+
+    if not archived:
+        return pairs
+
+    remote_archive = '.aiida_retrieve_{}.tar.gz'.format(uuid.uuid4().hex)
+    # The names are passed through stdin to avoid hitting the maximum
+    # length of a command line, verbatim so that names starting with a dash
+    # are not taken as options; -h stores the targets of symlinks, as get
+    # does. The C locale keeps the messages parsed by _only_missing_tar_members
+    # in English. A tar without --verbatim-files-from fails and the items are
+    # retrieved one at a time.
+    command = 'LC_ALL=C tar --verbatim-files-from -czhf {} -T -'.format(remote_archive)
+    file_names = '\n'.join(sorted(set(rem for rem, loc, member in archived))) + '\n'
+
+    transport.logger.debug("[retrieval of calc {}] Packing {} remote item(s) in '{}'".format(
+        calculation.pk, len(archived), remote_archive))
+
+    with SandboxFolder() as sandbox:
+        local_archive = os.path.join(sandbox.abspath, remote_archive)
+        try:
+            # Missing items make tar return a non-zero value, but the archive
+            # is created anyway with all the other ones
+            retval, stdout, stderr = transport.exec_command_wait(command, stdin=file_names)
+            if retval != 0 and not _only_missing_tar_members(stderr):
+                transport.logger.warning("[retrieval of calc {}] Packing the archive '{}' failed with exit code "
+                                         "{} and stderr:\n{}\nretrieving one item at a time".format(
+                                             calculation.pk, remote_archive, retval, stderr))
+                return pairs
+            if not transport.isfile(remote_archive):
+                transport.logger.warning("[retrieval of calc {}] Unable to create the archive '{}', "
+                                         "retrieving one item at a time".format(calculation.pk, remote_archive))
+                return pairs
+            transport.get(remote_archive, local_archive)
+        finally:
+            if transport.isfile(remote_archive):
+                transport.remove(remote_archive)
+
+        extract_folder = os.path.join(sandbox.abspath, 'extracted')
+        try:
+            with tarfile.open(local_archive, 'r:gz') as archive:
+                members = [m for m in archive.getmembers()
+                           if not os.path.isabs(m.name) and os.path.pardir not in m.name.split('/')]
+                archive.extractall(extract_folder, members=members)
+        except (tarfile.TarError, EOFError, IOError) as exception:
+            transport.logger.warning("[retrieval of calc {}] Unable to unpack the archive '{}': {}, "
+                                     "retrieving one item at a time".format(calculation.pk, remote_archive, exception))
+            return pairs
+
+        for rem, loc, member in archived:
+            source = os.path.join(extract_folder, member)
+            destination = os.path.join(folder.abspath, loc)
+            if not os.path.lexists(source) or os.path.isdir(destination):
+                not_archived.append((rem, loc))
+                continue
+            if os.path.lexists(destination):
+                os.remove(destination)
+            destination_folder = os.path.dirname(destination)
+            if not os.path.exists(destination_folder):
+                os.makedirs(destination_folder)
+            # Copy rather than move, as the same item may be part of several
+            # entries (e.g. a folder and some of its files)
+            if os.path.isdir(source):
+                shutil.copytree(source, destination)
+            else:
+                shutil.copy(source, destination)
+
+    return not_archived
+
+
+def _get_local_size(path):
+    """
+    Return the size in bytes of a local file, or of all the files in a local
+    directory.
+    """
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+
+    size = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            size += os.path.getsize(os.path.join(dirpath, filename))
+    return size
@@ -7,9 +7,113 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+from collections import OrderedDict
+
 from aiida.orm import Data
 
 
+class ArrayCache(object):
+    """
+    A least-recently-used cache of the arrays read from disk by the stored
+    ArrayData nodes. It is shared by all nodes, and bounded by the total
+    size (in bytes) of the cached arrays: when the size would exceed the
+    limit, the arrays that were not used for the longest time are dropped.
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        :param max_bytes: the maximum total size of the cached arrays. If
+            None, it is read (when first needed) from the
+            ``arraydata.cache_size_mb`` property.
+        """
+        self._max_bytes = max_bytes
+        self._arrays = OrderedDict()
+        self._nbytes = 0
+
+    @property
+    def max_bytes(self):
+        """
+        The maximum total size (in bytes) of the cached arrays.
+        """
+        if self._max_bytes is None:
+            from aiida.common.setup import get_property
+
+            self._max_bytes = get_property(
+                'arraydata.cache_size_mb') * 1024 * 1024
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._max_bytes = value
+        self._shrink(0)
+
+    @property
+    def nbytes(self):
+        """
+        The total size (in bytes) of the cached arrays.
+        """
+        return self._nbytes
+
+    def get(self, key):
+        """
+        Return the array cached with the given key, marking it as the most
+        recently used one.
+
+        :raise KeyError: if no array is cached with this key.
+        """
+        array = self._arrays.pop(key)
+        self._arrays[key] = array
+        return array
+
+    def set(self, key, array):
+        """
+        Cache an array with the given key. Arrays larger than the whole
+        cache are not cached.
+        """
+        self.discard(key)
+        if array.nbytes > self.max_bytes:
+            return
+        self._shrink(array.nbytes)
+        self._arrays[key] = array
+        self._nbytes += array.nbytes
+
+    def discard(self, key):
+        """
+        Remove an array from the cache, if present.
+        """
+        try:
+            array = self._arrays.pop(key)
+        except KeyError:
+            return
+        self._nbytes -= array.nbytes
+
+    def discard_node(self, uuid):
+        """
+        Remove from the cache all the arrays of the node with the given UUID.
+        """
+        for key in [k for k in self._arrays if k[0] == uuid]:
+            self.discard(key)
+
+    def clear(self):
+        """
+        Remove all arrays from the cache.
+        """
+        self._arrays = OrderedDict()
+        self._nbytes = 0
+
+    def _shrink(self, nbytes):
+        """
+        Drop the least recently used arrays, until nbytes more bytes fit.
+        """
+        while self._arrays and self._nbytes + nbytes > self.max_bytes:
+            _, array = self._arrays.popitem(last=False)
+            self._nbytes -= array.nbytes
+
+
+# The cache of the arrays of all stored ArrayData nodes, indexed by
+# (uuid, array name)
+array_cache = ArrayCache()
+
 
 class ArrayData(Data):
     """
@@ -18,20 +122,76 @@ class ArrayData(Data):
     installed).
 
     Each array is stored within the Node folder as a different .npy file.
+    Alternatively (see :py:meth:`.set_array_format`), each array can be split
+    along its first axis in chunks, each stored as a compressed .npz file:
+    this takes less space on disk, allows to read only some of the rows
+    (e.g. some steps of a trajectory) and to append rows to an array
+    without rewriting it.
 
     :note: Before storing, no caching is done: if you perform a
       :py:meth:`.get_array` call, the array will be re-read from disk.
       If instead the ArrayData node has already been stored,
       the array is cached in memory after the first read, and the cached array
-      is used thereafter.
-      If too much RAM memory is used, you can clear the
-      cache with the :py:meth:`.clear_internal_cache` method.
+      is used thereafter. The cache (:py:data:`array_cache`) is shared by all
+      nodes and its size is bounded by the ``arraydata.cache_size_mb``
+      property; you can also remove the arrays of a node with the
+      :py:meth:`.clear_internal_cache` method.
+      Very large arrays can be read without loading them in memory by passing
+      ``mmap_mode`` to :py:meth:`.get_array`.
     """
     array_prefix = "array|"
+    # Attributes describing the chunked format
+    _format_attr = "array_format"
+    _chunk_length_attr = "array_chunk_length"
+    _chunk_length_prefix = "array_chunk_length|"
+    _array_formats = ['npy', 'chunked']
+    # Uncompressed size targeted by each chunk, if the number of rows per
+    # chunk is not given explicitly
+    _chunk_target_bytes = 4 * 1024 * 1024
+
+    def get_array_format(self):
+        """
+        Return the format used to store the arrays of this node: 'npy' (one
+        .npy file per array) or 'chunked' (compressed chunks of rows).
+        """
+        return self.get_attr(self._format_attr, 'npy')
 
-    def __init__(self, *args, **kwargs):
-        super(ArrayData, self).__init__(*args, **kwargs)
-        self._cached_arrays = {}
+    def set_array_format(self, array_format, chunk_length=None):
+        """
+        Choose the format used to store the arrays of this node. Arrays that
+        were already set are converted to the new format. Can only be called
+        before storing.
+
+        :param array_format: 'npy' to store each array in a .npy file, or
+            'chunked' to split each array along its first axis in chunks
+            stored as compressed .npz files.
+        :param chunk_length: only for the 'chunked' format, the number of
+            rows of each chunk. If None, it is chosen for each array so that
+            each chunk is about 4 MB before compression.
+        """
+        if array_format not in self._array_formats:
+            raise ValueError("Invalid array format '{}', valid formats are: "
+                             "{}".format(array_format, self._array_formats))
+        if chunk_length is not None:
+            if array_format != 'chunked':
+                raise ValueError("chunk_length can be specified only for the "
+                                 "'chunked' format")
+            if not isinstance(chunk_length, (int, long)) or chunk_length < 1:
+                raise ValueError("chunk_length must be a positive integer")
+
+        arrays = [(name, self.get_array(name))
+                  for name in self.get_arraynames()]
+        for name, _ in arrays:
+            self.delete_array(name)
+
+        self._set_attr(self._format_attr, array_format)
+        if chunk_length is not None:
+            self._set_attr(self._chunk_length_attr, chunk_length)
+        elif self._chunk_length_attr in self.attrs():
+            self._del_attr(self._chunk_length_attr)
+
+        for name, array in arrays:
+            self.set_array(name, array)
 
     def delete_array(self, name):
         """
@@ -39,22 +199,23 @@ class ArrayData(Data):
 
         :param name: The name of the array to delete from the node.
         """
-        import numpy
-
-        fname = '{}.npy'.format(name)
-        if fname not in self.get_folder_list():
+        fnames = self._get_array_filenames(name)
+        if not fnames:
             raise KeyError(
                 "Array with name '{}' not found in node pk= {}".format(
                     name, self.pk))
 
-        # remove both file and attribute
-        self.remove_path(fname)
-        try:
-            self._del_attr("{}{}".format(self.array_prefix, name))
-        except (KeyError, AttributeError):
-            # Should not happen, but do not crash if for some reason the
-            # property was not set.
-            pass
+        # remove both files and attributes
+        for fname in fnames:
+            self.remove_path(fname)
+        for attr in ["{}{}".format(self.array_prefix, name),
+                     "{}{}".format(self._chunk_length_prefix, name)]:
+            try:
+                self._del_attr(attr)
+            except (KeyError, AttributeError):
+                # Should not happen, but do not crash if for some reason the
+                # property was not set (and it is never set for .npy arrays)
+                pass
 
     def arraynames(self):
         """
@@ -85,7 +246,14 @@ class ArrayData(Data):
         Return a list of all arrays stored in the node, listing the files (and
         not relying on the properties).
         """
-        return [i[:-4] for i in self.get_folder_list() if i.endswith('.npy')]
+        names = set()
+        for i in self.get_folder_list():
+            if i.endswith('.npy'):
+                names.add(i[:-4])
+            elif i.endswith('.npz'):
+                # Chunk files are called name.index.npz
+                names.add(i.split('.')[0])
+        return list(names)
 
     def _arraynames_from_properties(self):
         """
@@ -95,6 +263,30 @@ class ArrayData(Data):
         return [i[len(self.array_prefix):] for i in
                 self.attrs() if i.startswith(self.array_prefix)]
 
+    def _get_array_filenames(self, name):
+        """
+        Return the names of the files in the node folder storing an array,
+        in the order of the chunks for chunked arrays (in any format, so
+        that also an array stored before changing the format is found).
+        """
+        prefix = '{}.'.format(name)
+        return sorted(i for i in self.get_folder_list()
+                      if i == '{}.npy'.format(name) or
+                      (i.startswith(prefix) and i.endswith('.npz')))
+
+    @staticmethod
+    def _get_chunk_filename(name, index):
+        """
+        Return the name of the file storing a chunk of an array.
+        """
+        return '{}.{:06d}.npz'.format(name, index)
+
+    def _get_chunk_length(self, name):
+        """
+        Return the number of rows of each chunk of a chunked array.
+        """
+        return self.get_attr("{}{}".format(self._chunk_length_prefix, name))
+
     def get_shape(self, name):
         """
         Return the shape of an array (read from the value cached in the
@@ -112,50 +304,176 @@ class ArrayData(Data):
         for name in self.get_arraynames():
             yield (name, self.get_array(name))
 
-    def get_array(self, name):
+    def get_array(self, name, mmap_mode=None):
         """
         Return an array stored in the node
 
         :param name: The name of the array to return.
+        :param mmap_mode: if None (default) the whole array is read in
+            memory. Otherwise, it can be 'r' (read-only) or 'c'
+            (copy-on-write) to return a numpy memory-mapped array, whose
+            data are read from disk only when accessed. Memory-mapped arrays
+            are not cached. Arrays stored in the 'chunked' format cannot be
+            memory-mapped: use the functions reading only part of the array
+            instead.
         """
         import numpy
 
+        if mmap_mode not in [None, 'r', 'c']:
+            raise ValueError("Invalid mmap_mode '{}', it can only be None, "
+                             "'r' or 'c'".format(mmap_mode))
+
         # raw function used only internally
         def get_array_from_file(self, name):
-            fname = '{}.npy'.format(name)
-            if fname not in self.get_folder_list():
+            fnames = self._get_array_filenames(name)
+            if not fnames:
                 raise KeyError(
                     "Array with name '{}' not found in node pk= {}".format(
                         name, self.pk))
 
-            array = numpy.load(self.get_abs_path(fname))
+            if fnames[0].endswith('.npy'):
+                array = numpy.load(self.get_abs_path(fnames[0]),
+                                   mmap_mode=mmap_mode)
+            elif mmap_mode is not None:
+                raise ValueError("Array with name '{}' is stored in chunks, "
+                                 "it cannot be memory-mapped".format(name))
+            else:
+                array = self._read_chunks(name, 0, len(fnames))
             return array
 
         # Return with proper caching, but only after storing. Before, instead,
         # always re-read from disk
-        if not self.is_stored:
+        if not self.is_stored or mmap_mode is not None:
             return get_array_from_file(self, name)
         else:
-            if name not in self._cached_arrays:
-                self._cached_arrays[name] = get_array_from_file(self, name)
-            return self._cached_arrays[name]
+            key = (self.uuid, name)
+            try:
+                return array_cache.get(key)
+            except KeyError:
+                array = get_array_from_file(self, name)
+                array_cache.set(key, array)
+                return array
+
+    def _read_chunks(self, name, first, last):
+        """
+        Read some consecutive chunks of a chunked array.
+
+        :param name: The name of the array.
+        :param first: the index of the first chunk to read
+        :param last: the index after the last chunk to read
+        :return: the rows of all chunks, as a single numpy array
+        """
+        import numpy
+
+        chunks = []
+        for index in range(first, last):
+            with numpy.load(self.get_abs_path(
+                    self._get_chunk_filename(name, index))) as npz:
+                chunks.append(npz['chunk'])
+        if len(chunks) == 1:
+            return chunks[0]
+        return numpy.concatenate(chunks)
+
+    def _get_array_slice(self, name, index):
+        """
+        Return a part of an array. If the array is not already cached, it is
+        memory-mapped (or, for chunked arrays, only the chunks containing the
+        requested rows are read) so that only the requested part is read from
+        disk.
+
+        :param name: The name of the array.
+        :param index: anything that can be used to index a numpy array, e.g.
+            an integer, a slice or a tuple of them. If None, the whole array
+            is returned.
+        :return: a numpy array (not a view on the memory-mapped file)
+        """
+        import numpy
+
+        if index is None:
+            return self.get_array(name)
+
+        if self.is_stored:
+            try:
+                return array_cache.get((self.uuid, name))[index]
+            except KeyError:
+                pass
+
+        fnames = self._get_array_filenames(name)
+        if fnames and fnames[0].endswith('.npz'):
+            return self._get_chunked_array_slice(name, index)
+
+        try:
+            array = self.get_array(name, mmap_mode='r')
+        except ValueError:
+            # Arrays of Python objects cannot be memory-mapped
+            return self.get_array(name)[index]
+        part = array[index]
+        if isinstance(part, numpy.ndarray):
+            # Copy the data, so that the file is not kept open
+            return numpy.array(part)
+        return part
+
+    def _get_chunked_array_slice(self, name, index):
+        """
+        Return a part of a chunked array, reading only the chunks that
+        contain the rows selected by the first element of index (if it is an
+        integer or a slice with positive step; otherwise the whole array is
+        read).
+        """
+        import numpy
+
+        shape = self.get_shape(name)
+        if isinstance(index, tuple) and index:
+            row_index, other_index = index[0], index[1:]
+        else:
+            row_index, other_index = index, ()
+
+        if not shape:
+            # A 0-d array is stored in a single chunk
+            return self.get_array(name)[index]
+
+        num_rows = shape[0]
+        chunk_length = self._get_chunk_length(name)
+
+        if isinstance(row_index, (int, long, numpy.integer)):
+            row = row_index + num_rows if row_index < 0 else row_index
+            if not 0 <= row < num_rows:
+                raise IndexError("index {} is out of bounds for axis 0 with "
+                                 "size {}".format(row_index, num_rows))
+            chunk = self._read_chunks(name, row // chunk_length,
+                                      row // chunk_length + 1)
+            return chunk[(row % chunk_length,) + other_index]
+
+        if isinstance(row_index, slice):
+            start, stop, step = row_index.indices(num_rows)
+            if step > 0 and stop > start:
+                first = start // chunk_length
+                last = (stop - 1) // chunk_length + 1
+                offset = first * chunk_length
+                rows = self._read_chunks(name, first, last)
+                return rows[(slice(start - offset, stop - offset, step),) +
+                            other_index]
+
+        return self.get_array(name)[index]
 
     def clear_internal_cache(self):
         """
-        Clear the internal memory cache where the arrays are stored after being
-        read from disk (used in order to reduce at minimum the readings from
-        disk).
+        Remove the arrays of this node from the memory cache where the arrays
+        are stored after being read from disk (used in order to reduce at
+        minimum the readings from disk).
         This function is useful if you want to keep the node in memory, but you
         do not want to waste memory to cache the arrays in RAM.
         """
-        self._cached_arrays = {}
+        if self.is_stored:
+            array_cache.discard_node(self.uuid)
 
     def set_array(self, name, array):
         """
         Store a new numpy array inside the node. Possibly overwrite the array
         if it already existed.
 
-        Internally, it stores a name.npy file in numpy format.
+        Internally, it stores a name.npy file in numpy format (or the
+        name.XXXXXX.npz chunks, in the 'chunked' format).
 
         :param name: The name of the array.
         :param array: The numpy array to store.
@@ -174,24 +492,118 @@ class ArrayData(Data):
             raise ValueError("The name assigned to the array ({}) is not valid,"
                              "it can only contain digits, letters or underscores")
 
-        fname = "{}.npy".format(name)
+        if self._get_array_filenames(name):
+            self.delete_array(name)
+
+        if self.get_array_format() == 'chunked':
+            chunk_length = self.get_attr(self._chunk_length_attr, None)
+            if chunk_length is None:
+                row_nbytes = array[0].nbytes if array.ndim and len(array) \
+                    else array.itemsize
+                chunk_length = max(
+                    1, self._chunk_target_bytes // max(row_nbytes, 1))
+            self._set_attr("{}{}".format(self._chunk_length_prefix, name),
+                           chunk_length)
+            self._write_chunks(name, array, 0)
+        else:
+            fname = "{}.npy".format(name)
 
-        with tempfile.NamedTemporaryFile() as f:
-            # Store in a temporary file, and then add to the node
-            numpy.save(f, array)
-            f.flush()  # Important to flush here, otherwise the next copy command
-            # will just copy an empty file
-            self.add_path(f.name, fname)
+            with tempfile.NamedTemporaryFile() as f:
+                # Store in a temporary file, and then add to the node
+                numpy.save(f, array)
+                f.flush()  # Important to flush here, otherwise the next copy command
+                # will just copy an empty file
+                self.add_path(f.name, fname)
 
         # Mainly for convenience, for querying purposes (both stores the fact
         # that there is an array with that name, and its shape)
         self._set_attr("{}{}".format(self.array_prefix, name),
                        list(array.shape))
 
+    def _write_chunks(self, name, rows, first):
+        """
+        Write rows of a chunked array to the node folder, in compressed
+        chunks.
+
+        :param name: The name of the array.
+        :param rows: the rows to write, starting from the beginning of a chunk
+        :param first: the index of the first chunk to write
+        """
+        import tempfile
+
+        import numpy
+
+        chunk_length = self._get_chunk_length(name)
+        if rows.ndim == 0 or len(rows) == 0:
+            # Store 0-d and empty arrays in a single chunk, so that at least
+            # the dtype is kept
+            chunks = [rows]
+        else:
+            chunks = [rows[i:i + chunk_length]
+                      for i in range(0, len(rows), chunk_length)]
+
+        for index, chunk in enumerate(chunks, start=first):
+            with tempfile.NamedTemporaryFile() as f:
+                numpy.savez_compressed(f, chunk=chunk)
+                f.flush()
+                self.add_path(f.name, self._get_chunk_filename(name, index))
+
+    def append_to_array(self, name, rows):
+        """
+        Append rows to an array, along its first axis (e.g. the new steps of
+        a trajectory while parsing it). If the array does not exist yet, it
+        is created. Can only be called before storing.
+
+        For arrays in the 'chunked' format only the last chunk is rewritten;
+        arrays in the 'npy' format are instead rewritten completely.
+
+        :param name: The name of the array.
+        :param rows: a numpy array with the rows to append; its shape must
+            match the shape of the array, except along the first axis.
+        """
+        import numpy
+
+        if not isinstance(rows, numpy.ndarray):
+            raise TypeError("ArrayData can only store numpy arrays. Convert "
+                            "the object to an array first")
+
+        if name not in self.get_arraynames():
+            self.set_array(name, rows)
+            return
+
+        shape = self.get_shape(name)
+        if not shape or rows.shape[1:] != shape[1:]:
+            raise ValueError("Cannot append rows with shape {} to the array "
+                             "'{}' with shape {}".format(rows.shape, name,
+                                                         shape))
+
+        if not len(rows):
+            return
+
+        fnames = self._get_array_filenames(name)
+        if fnames[0].endswith('.npy'):
+            self.set_array(name, numpy.concatenate(
+                [self.get_array(name), rows]))
+            return
+
+        # Rewrite the last chunk (if incomplete) together with the new rows
+        chunk_length = self._get_chunk_length(name)
+        first = shape[0] // chunk_length
+        if shape[0] % chunk_length:
+            rows = numpy.concatenate(
+                [self._read_chunks(name, first, first + 1), rows])
+        elif len(fnames) > first:
+            # The only chunk of an empty array
+            self.remove_path(fnames[first])
+        self._write_chunks(name, rows, first)
+
+        self._set_attr("{}{}".format(self.array_prefix, name),
+                       [first * chunk_length + len(rows)] + list(shape[1:]))
+
     def _validate(self):
         """
-        Check if the list of .npy files stored inside the node and the
-        list of properties match. Just a name check, no check on the size
+        Check if the list of .npy (or .npz) files stored inside the node and
+        the list of properties match. Just a name check, no check on the size
         since this would require to reload all arrays and this may take time
         and memory.
         """
@@ -152,6 +152,65 @@ class TrajectoryData(ArrayData):
             except KeyError:
                 pass
 
+    def append_steps(self, stepids, cells, positions, symbols=None,
+                     times=None, velocities=None):
+        """
+        Append a block of steps to the trajectory, e.g. while parsing the
+        output of a long run, after checking that types and dimensions are
+        correct. The steps are written to disk immediately, so that the whole
+        trajectory never needs to be in memory.
+
+        The arrays have the same meaning of those of
+        :py:meth:`.set_trajectory`, but contain only the steps of this block.
+        If no array was set yet, the 'chunked' array format is selected (see
+        :py:meth:`.set_array_format`), so that each block only rewrites the
+        last chunk of each array. All the arrays use the same number of steps
+        per chunk, chosen from the size of a step of the largest array.
+
+        :param symbols: required for the first block; for the next blocks,
+            if given, it must be equal to the symbols of the trajectory.
+        :param times: must be given either for all blocks or for none.
+        :param velocities: must be given either for all blocks or for none.
+        """
+        arraynames = self.get_arraynames()
+        if not arraynames:
+            if symbols is None:
+                raise ValueError("The symbols must be given for the first "
+                                 "block of steps")
+            self._internal_validate(stepids, cells, symbols, positions,
+                                    times, velocities)
+            if self.get_array_format() == 'npy' or \
+                    self.get_attr(self._chunk_length_attr, None) is None:
+                # The chunk length is otherwise chosen for each array from
+                # its row size: the small steps and times arrays would get
+                # huge chunks, rewritten completely at each block
+                step_nbytes = max([array[0].nbytes for array
+                                   in [stepids, cells, positions, times,
+                                       velocities]
+                                   if array is not None and len(array)] or [1])
+                self.set_array_format('chunked', chunk_length=max(
+                    1, self._chunk_target_bytes // max(step_nbytes, 1)))
+            self.set_array('symbols', symbols)
+        else:
+            old_symbols = self.get_symbols()
+            if symbols is not None and \
+                    symbols.tolist() != old_symbols.tolist():
+                raise ValueError("The symbols are different from those of "
+                                 "the trajectory")
+            self._internal_validate(stepids, cells, old_symbols, positions,
+                                    times, velocities)
+            for name, array in [('times', times), ('velocities', velocities)]:
+                if (array is not None) != (name in arraynames):
+                    raise ValueError("TrajectoryData.{} must be given either "
+                                     "for all blocks of steps or for "
+                                     "none".format(name))
+
+        for name, array in [('steps', stepids), ('cells', cells),
+                            ('positions', positions), ('times', times),
+                            ('velocities', velocities)]:
+            if array is not None:
+                self.append_to_array(name, array)
+
     def set_structurelist(self, structurelist):
         """
         Create trajectory from the list of
@@ -186,11 +245,23 @@ class TrajectoryData(ArrayData):
         from aiida.common.exceptions import ValidationError
 
         try:
-            self._internal_validate(self.get_stepids(),
-                                    self.get_cells(),
-                                    self.get_symbols(), self.get_positions(),
-                                    self.get_times(),
-                                    self.get_velocities())
+            # Only the first step of each array is read, so that the whole
+            # trajectory does not need to be loaded in memory; the number
+            # of steps is checked on the shapes
+            first = slice(0, 1)
+            self._internal_validate(self.get_stepids(steps=first),
+                                    self.get_cells(steps=first),
+                                    self.get_symbols(),
+                                    self.get_positions(steps=first),
+                                    self.get_times(steps=first),
+                                    self.get_velocities(steps=first))
+            arraynames = self.get_arraynames()
+            for name in ['cells', 'positions', 'times', 'velocities']:
+                if (name in arraynames and
+                        self.get_shape(name)[0] != self.numsteps):
+                    raise ValueError("TrajectoryData.{} has {} steps "
+                                     "instead of {}".format(
+                        name, self.get_shape(name)[0], self.numsteps))
         # Should catch TypeErrors, ValueErrors, and KeyErrors for missing arrays
         except Exception as e:
             raise ValidationError("The TrajectoryData did not validate. "
@@ -228,35 +299,44 @@ class TrajectoryData(ArrayData):
             DeprecationWarning)
         return self.get_stepids()
 
-    def get_stepids(self):
+    def get_stepids(self, steps=None):
         """
         Return the array of steps, if it has already been set.
 
         .. versionadded:: 0.7
            Renamed from get_steps
 
+        :param steps: if specified, only the given steps are returned (it
+            can be anything that can be used to index a numpy array, e.g.
+            an integer or a slice), reading from disk only those steps.
         :raises KeyError: if the trajectory has not been set yet.
         """
-        return self.get_array('steps')
+        return self._get_array_slice('steps', steps)
 
-    def get_times(self):
+    def get_times(self, steps=None):
         """
         Return the array of times (in ps), if it has already been set.
 
+        :param steps: if specified, only the given steps are returned (it
+            can be anything that can be used to index a numpy array, e.g.
+            an integer or a slice), reading from disk only those steps.
         :raises KeyError: if the trajectory has not been set yet.
         """
         try:
-            return self.get_array('times')
+            return self._get_array_slice('times', steps)
         except (AttributeError, KeyError):
             return None
 
-    def get_cells(self):
+    def get_cells(self, steps=None):
         """
         Return the array of cells, if it has already been set.
 
+        :param steps: if specified, only the given steps are returned (it
+            can be anything that can be used to index a numpy array, e.g.
+            an integer or a slice), reading from disk only those steps.
         :raises KeyError: if the trajectory has not been set yet.
         """
-        return self.get_array('cells')
+        return self._get_array_slice('cells', steps)
 
     def get_symbols(self):
         """
@@ -266,15 +346,18 @@ class TrajectoryData(ArrayData):
         """
         return self.get_array('symbols')
 
-    def get_positions(self):
+    def get_positions(self, steps=None):
         """
         Return the array of positions, if it has already been set.
 
+        :param steps: if specified, only the given steps are returned (it
+            can be anything that can be used to index a numpy array, e.g.
+            an integer or a slice), reading from disk only those steps.
         :raises KeyError: if the trajectory has not been set yet.
         """
-        return self.get_array('positions')
+        return self._get_array_slice('positions', steps)
 
-    def get_velocities(self):
+    def get_velocities(self, steps=None):
         """
         Return the array of velocities, if it has already been set.
 
@@ -282,9 +365,13 @@ class TrajectoryData(ArrayData):
           functions, will not raise an exception if the velocities are not
           set, but rather return ``None`` (both if no trajectory was not set yet,
           and if it the trajectory was set but no velocities were specified).
+
+        :param steps: if specified, only the given steps are returned (it
+            can be anything that can be used to index a numpy array, e.g.
+            an integer or a slice), reading from disk only those steps.
         """
         try:
-            return self.get_array('velocities')
+            return self._get_array_slice('velocities', steps)
         except (AttributeError, KeyError):
             return None
 
@@ -343,19 +430,17 @@ class TrajectoryData(ArrayData):
            0 to ``self.numsteps - 1``.
         :raises IndexError: if you require an index beyond the limits.
         :raises KeyError: if you did not store the trajectory yet.
+
+        .. note:: Only the data of the requested step are read from disk.
         """
         if index >= self.numsteps:
             raise IndexError("You have only {} steps, but you are looking beyond"
                              " (index={})".format(self.numsteps, index))
 
-        vel = self.get_velocities()
-        if vel is not None:
-            vel = vel[index, :, :]
-        time = self.get_times()
-        if time is not None:
-            time = time[index]
-        return (self.get_stepids()[index], time, self.get_cells()[index, :, :],
-                self.get_symbols(), self.get_positions()[index, :, :], vel)
+        return (self.get_stepids(steps=index), self.get_times(steps=index),
+                self.get_cells(steps=index), self.get_symbols(),
+                self.get_positions(steps=index),
+                self.get_velocities(steps=index))
 
 
     def step_to_structure(self, index, custom_kinds=None):
@@ -785,8 +785,7 @@ class StructureData(Data):
             self.cell = aseatoms.cell
             self.pbc = aseatoms.pbc
             self.clear_kinds()  # This also calls clear_sites
-            for atom in aseatoms:
-                self.append_atom(ase=atom)
+            self._append_ase_atoms(aseatoms)
         else:
             raise TypeError("The value is not an ase.Atoms object")
 
@@ -836,11 +835,72 @@ class StructureData(Data):
         self.cell = struct.lattice.matrix.tolist()
         self.pbc = [True, True, True]
         self.clear_kinds()
-        for site in struct.sites:
-            self.append_atom(
-                symbols=[x[0].symbol for x in site.species_and_occu.items()],
-                weights=[x[1] for x in site.species_and_occu.items()],
-                position=site.coords.tolist())
+
+        species = [tuple((x[0].symbol, x[1])
+                         for x in site.species_and_occu.items())
+                   for site in struct.sites]
+
+        def get_kind(idx):
+            return Kind(symbols=[x[0] for x in species[idx]],
+                        weights=[x[1] for x in species[idx]])
+
+        self._append_atoms_in_bulk(species, get_kind, struct.cart_coords)
+
+    def _append_ase_atoms(self, aseatoms):
+        """
+        Append all the atoms of an ASE Atoms object, reading the positions,
+        symbols, masses and tags as whole arrays. The resulting kinds and
+        sites are the same that calling append_atom(ase=atom) on each atom
+        would give.
+        """
+        import numpy
+
+        # ASE sets mass to numpy.nan for unstable species; map it to None
+        # so that all these atoms get the same key
+        masses = [None if numpy.isnan(m) else float(m)
+                  for m in aseatoms.get_masses()]
+        keys = zip(aseatoms.get_chemical_symbols(), masses,
+                   [int(t) for t in aseatoms.get_tags()])
+
+        def get_kind(idx):
+            return Kind(ase=aseatoms[idx])
+
+        self._append_atoms_in_bulk(keys, get_kind, aseatoms.get_positions())
+
+    def _append_atoms_in_bulk(self, kind_keys, get_kind, positions):
+        """
+        Append many atoms at once, creating (or reusing) their kinds with the
+        same logic of append_atom, but only once per distinct kind.
+
+        :param kind_keys: a list with a hashable key for each atom; atoms
+            with the same key must have identical kinds
+        :param get_kind: a function that, given the index of an atom,
+            returns its Kind object
+        :param positions: a (N,3) array (or list) with the atomic positions
+        """
+        import numpy
+
+        positions = numpy.array(positions, dtype=float).reshape(-1, 3)
+        if len(positions) != len(kind_keys):
+            raise ValueError("The number of positions ({}) does not match the "
+                             "number of atoms ({})".format(len(positions),
+                                                           len(kind_keys)))
+
+        kind_names = {}
+        site_kind_names = []
+        for idx, key in enumerate(kind_keys):
+            try:
+                site_kind_names.append(kind_names[key])
+            except KeyError:
+                kind_name = self._get_or_append_kind(get_kind(idx)).name
+                kind_names[key] = kind_name
+                site_kind_names.append(kind_name)
+
+        _, _, sites = self._get_structure_buffer()
+        sites.extend({'position': tuple(position), 'kind_name': kind_name}
+                     for position, kind_name
+                     in zip(positions.tolist(), site_kind_names))
+        self._structure_buffer_dirty = True
 
     def _validate(self):
         """
@@ -849,6 +909,10 @@ class StructureData(Data):
 
         from aiida.common.exceptions import ValidationError
 
+        # Write the kinds and sites appended so far to the attributes, that
+        # are what is going to be stored
+        self._flush_structure_buffer(drop=True)
+
         super(StructureData, self)._validate()
 
         try:
@@ -1199,18 +1263,20 @@ class StructureData(Data):
 
         new_kind = Kind(kind=kind)  # So we make a copy
 
-        if kind.name in [k.name for k in self.kinds]:
+        kinds, kind_index, _ = self._get_structure_buffer()
+        if kind.name in kind_index:
             raise ValueError("A kind with the same name ({}) already exists."
                              "".format(kind.name))
 
         # If here, no exceptions have been raised, so I add the site.
-        self._append_to_attr('kinds', new_kind.get_raw())
+        kind_index[new_kind.name] = len(kinds)
+        kinds.append(new_kind)
+        self._structure_buffer_dirty = True
         # Note, this is a dict (with integer keys) so it allows for empty
         # spots!
         if not hasattr(self, '_internal_kind_tags'):
             self._internal_kind_tags = {}
-        self._internal_kind_tags[len(
-            self.get_attr('kinds')) - 1] = kind._internal_tag
+        self._internal_kind_tags[len(kinds) - 1] = kind._internal_tag
 
     def append_site(self, site):
         """
@@ -1229,13 +1295,15 @@ class StructureData(Data):
 
         new_site = Site(site=site)  # So we make a copy
 
-        if site.kind_name not in [k.name for k in self.kinds]:
+        kinds, kind_index, sites = self._get_structure_buffer()
+        if site.kind_name not in kind_index:
             raise ValueError("No kind with name '{}', available kinds are: "
                              "{}".format(site.kind_name,
-                                         [k.name for k in self.kinds]))
+                                         [k.name for k in kinds]))
 
         # If here, no exceptions have been raised, so I add the site.
-        self._append_to_attr('sites', new_site.get_raw())
+        sites.append(new_site.get_raw())
+        self._structure_buffer_dirty = True
 
     def append_atom(self, **kwargs):
         """
@@ -1286,43 +1354,14 @@ class StructureData(Data):
             kind = Kind(**kwargs)
 
         # I look for identical species only if the name is not specified
-        _kinds = self.kinds
-
         if 'name' not in kwargs:
-            # If the kind is identical to an existing one, I use the existing
-            # one, otherwise I replace it
-            exists_already = False
-            for idx, existing_kind in enumerate(_kinds):
-                try:
-                    existing_kind._internal_tag = self._internal_kind_tags[idx]
-                except KeyError:
-                    # self._internal_kind_tags does not contain any info for
-                    # the kind in position idx: I don't have to add anything
-                    # then, and I continue
-                    pass
-                if (kind.compare_with(existing_kind)[0]):
-                    kind = existing_kind
-                    exists_already = True
-                    break
-            if not exists_already:
-                # There is not an identical kind.
-                # By default, the name of 'kind' just contains the elements.
-                # I then check that the name of 'kind' does not already exist,
-                # and if it exists I add a number (starting from 1) until I
-                # find a non-used name.
-                existing_names = [k.name for k in _kinds]
-                simplename = kind.name
-                counter = 1
-                while kind.name in existing_names:
-                    kind.name = "{}{}".format(simplename, counter)
-                    counter += 1
-                self.append_kind(kind)
+            kind = self._get_or_append_kind(kind)
         else:  # 'name' was specified
-            old_kind = None
-            for existing_kind in _kinds:
-                if existing_kind.name == kwargs['name']:
-                    old_kind = existing_kind
-                    break
+            kinds, kind_index, _ = self._get_structure_buffer()
+            try:
+                old_kind = kinds[kind_index[kwargs['name']]]
+            except KeyError:
+                old_kind = None
             if old_kind is None:
                 self.append_kind(kind)
             else:
@@ -1339,6 +1378,131 @@ class StructureData(Data):
         site = Site(kind_name=kind.name, position=position)
         self.append_site(site)
 
+    def _get_or_append_kind(self, kind):
+        """
+        Return the first existing kind identical to the given one (according
+        to :py:meth:`~Kind.compare_with`). If there is none, the kind is
+        appended, after making its name unique by adding a number (starting
+        from 1) to it, and returned.
+
+        :param kind: a Kind object
+        :return: the Kind object to use for the new sites
+        """
+        kinds, kind_index, _ = self._get_structure_buffer()
+
+        # If the kind is identical to an existing one, I use the existing
+        # one, otherwise I replace it
+        for idx, existing_kind in enumerate(kinds):
+            try:
+                existing_kind._internal_tag = self._internal_kind_tags[idx]
+            except (AttributeError, KeyError):
+                # self._internal_kind_tags does not contain any info for
+                # the kind in position idx: I don't have to add anything
+                # then, and I continue
+                pass
+            if kind.compare_with(existing_kind)[0]:
+                return existing_kind
+
+        # There is not an identical kind.
+        # By default, the name of 'kind' just contains the elements.
+        # I then check that the name of 'kind' does not already exist,
+        # and if it exists I add a number (starting from 1) until I
+        # find a non-used name.
+        simplename = kind.name
+        counter = 1
+        while kind.name in kind_index:
+            kind.name = "{}{}".format(simplename, counter)
+            counter += 1
+        self.append_kind(kind)
+        return kind
+
+    def _get_structure_buffer(self):
+        """
+        Return the in-memory buffer where the kinds and sites are appended
+        while the node is not stored, creating it from the attributes if
+        needed. Appending to the attributes directly would re-read and
+        re-set the whole list at each call, which is quadratic in the number
+        of sites.
+
+        :return: a tuple (kinds, kind_index, sites), where kinds is a list
+            of Kind objects, kind_index a dictionary mapping each kind name
+            to its index in kinds, and sites a list of raw sites.
+        """
+        try:
+            return self._structure_buffer
+        except AttributeError:
+            pass
+
+        kinds = self.kinds
+        kind_index = {k.name: idx for idx, k in enumerate(kinds)}
+        sites = list(self.get_attr('sites', []))
+        self._structure_buffer = (kinds, kind_index, sites)
+        self._structure_buffer_dirty = False
+        return self._structure_buffer
+
+    def _flush_structure_buffer(self, drop=False):
+        """
+        Write the kinds and sites of the buffer (if there is one, and it was
+        modified) to the 'kinds' and 'sites' attributes.
+
+        :param drop: if True, also discard the buffer
+        """
+        buffer_ = getattr(self, '_structure_buffer', None)
+        if buffer_ is None:
+            return
+        if getattr(self, '_structure_buffer_dirty', False):
+            # Set the attributes first: if this fails (e.g. the node was
+            # stored in the meantime), the buffer is kept
+            kinds, _, sites = buffer_
+            super(StructureData, self)._set_attr(
+                'kinds', [k.get_raw() for k in kinds])
+            super(StructureData, self)._set_attr('sites', sites)
+            self._structure_buffer_dirty = False
+        if drop:
+            del self._structure_buffer
+
+    def _set_attr(self, key, value, **kwargs):
+        """
+        Set a new attribute, taking care of the kinds and sites buffer.
+        """
+        if key in ['kinds', 'sites']:
+            # The other list might still be only in the buffer
+            self._flush_structure_buffer(drop=True)
+        super(StructureData, self)._set_attr(key, value, **kwargs)
+
+    def _del_attr(self, key):
+        """
+        Delete an attribute, taking care of the kinds and sites buffer.
+        """
+        if key in ['kinds', 'sites']:
+            self._flush_structure_buffer(drop=True)
+        super(StructureData, self)._del_attr(key)
+
+    def get_attr(self, key, *args, **kwargs):
+        """
+        Get an attribute, writing first the kinds and sites buffer to the
+        attributes if needed.
+        """
+        if key in ['kinds', 'sites']:
+            self._flush_structure_buffer()
+        return super(StructureData, self).get_attr(key, *args, **kwargs)
+
+    def iterattrs(self):
+        """
+        Iterator over the attributes, returning tuples (key, value). The
+        kinds and sites buffer is written first to the attributes, if needed.
+        """
+        self._flush_structure_buffer()
+        return super(StructureData, self).iterattrs()
+
+    def attrs(self):
+        """
+        Returns the keys of the attributes as a generator. The kinds and
+        sites buffer is written first to the attributes, if needed.
+        """
+        self._flush_structure_buffer()
+        return super(StructureData, self).attrs()
+
         # def _set_site_type(self, new_site, reset_type_if_needed):
 
     # """
@@ -1442,10 +1606,14 @@ class StructureData(Data):
         """
         Returns a list of sites.
         """
-        try:
-            raw_sites = self.get_attr('sites')
-        except AttributeError:
-            raw_sites = []
+        buffer_ = getattr(self, '_structure_buffer', None)
+        if buffer_ is not None:
+            raw_sites = buffer_[2]
+        else:
+            try:
+                raw_sites = self.get_attr('sites')
+            except AttributeError:
+                raw_sites = []
         return [Site(raw=i) for i in raw_sites]
 
     @property
@@ -1453,6 +1621,10 @@ class StructureData(Data):
         """
         Returns a list of kinds.
         """
+        buffer_ = getattr(self, '_structure_buffer', None)
+        if buffer_ is not None:
+            # Return copies, the buffer must not be modified from outside
+            return [Kind(kind=k) for k in buffer_[0]]
         try:
             raw_kinds = self.get_attr('kinds')
         except AttributeError:
@@ -44,3 +44,4 @@ else:
         BACKEND))
 
 from aiida.orm.computer import delete_computer
+from aiida.orm.implementation.general.node import store_many
@@ -21,8 +21,10 @@ from aiida.common.exceptions import (InternalError, ModificationNotAllowed,
 from aiida.common.folders import RepositoryFolder
 from aiida.common.lang import override
 from aiida.common.links import LinkType
-from aiida.common.utils import get_new_uuid
-from aiida.orm.implementation.general.node import AbstractNode, _NO_DEFAULT
+from aiida.common.utils import get_new_uuid, grouper
+from aiida.orm.implementation.general.node import (
+    AbstractNode, _NO_DEFAULT, STORE_MANY_BATCH_SIZE, _pop_cached_links_from,
+    _get_store_state, _restore_store_state)
 from aiida.orm.mixins import Sealable
 # from aiida.orm.implementation.django.utils import get_db_columns
 from aiida.orm.implementation.general.utils import get_db_columns
@@ -196,7 +198,8 @@ class Node(AbstractNode):
             # in the TC table from self to src
             if QueryBuilder().append(
                     Node, filters={'id':self.pk}, tag='parent').append(
-                    Node, filters={'id':src.pk}, tag='child', descendant_of='parent').count() > 0:
+                    Node, filters={'id':src.pk}, tag='child', descendant_of='parent',
+                    distinct_walk=True).count() > 0:
                 raise ValueError(
                     "The link you are attempting to create would generate a loop")
 
@@ -564,7 +567,7 @@ class Node(AbstractNode):
         from django.db import transaction
         from aiida.common.utils import EmptyContextManager
         from aiida.common.exceptions import ValidationError
-        from aiida.backends.djsite.db.models import DbAttribute
+        from aiida.backends.djsite.db.models import DbAttribute, DbExtra
         import aiida.orm.autogroup
 
         if with_transaction:
@@ -579,6 +582,9 @@ class Node(AbstractNode):
         # I assume that if a node exists in the DB, its folder is in place.
         # On the other hand, periodically the user might need to run some
         # bookkeeping utility to check for lone folders.
+        # The hash also needs the files, so it is computed before moving
+        # the folder
+        extras = self._get_hash_extras()
         self._repository_folder.replace_with_folder(
             self._get_temp_folder().abspath, move=True, overwrite=True)
 
@@ -588,11 +594,13 @@ class Node(AbstractNode):
             with context_man:
                 # Save the row
                 self._dbnode.save()
-                # Save its attributes 'manually' without incrementing
-                # the version for each add.
+                # Save its attributes and hash 'manually' without
+                # incrementing the version for each add.
                 DbAttribute.reset_values_for_node(self.dbnode,
                                                   attributes=self._attrs_cache,
                                                   with_transaction=False)
+                DbExtra.reset_values_for_node(self.dbnode, attributes=extras,
+                                              with_transaction=False)
                 # This should not be used anymore: I delete it to
                 # possibly free memory
                 del self._attrs_cache
@@ -615,3 +623,118 @@ class Node(AbstractNode):
 
         return self
 
+    @classmethod
+    def _db_store_many(cls, nodes, custom_nodes, with_transaction=True):
+        """
+        Store many new nodes in the DB with bulk inserts, moving their
+        sandbox folders to the repository.
+        See :func:`aiida.orm.implementation.general.node.store_many`.
+
+        :param nodes: the nodes to insert in bulk
+        :param custom_nodes: the nodes whose class redefines store()
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        from aiida.common.utils import EmptyContextManager
+        from aiida.backends.djsite.db.models import DbNode, DbAttribute, DbExtra
+
+        if with_transaction:
+            context_man = transaction.atomic()
+        else:
+            context_man = EmptyContextManager()
+
+        # The hash also needs the files, so it is computed before moving
+        # the folders
+        hashes = [node.get_hash() for node in nodes]
+
+        # The state of the nodes is changed only after the transaction
+        # succeeded, so that they are still unstored if it fails. The nodes
+        # with a custom store() change their state when they are stored:
+        # I keep a copy of it to restore it
+        bulk_uuids = set(node.uuid for node in nodes)
+        custom_states = [_get_store_state(node) for node in custom_nodes]
+        moved_nodes = []
+        try:
+            # As in _db_store, I first move the files and then store the DB
+            # entries
+            for node in nodes:
+                node._repository_folder.replace_with_folder(
+                    node._get_temp_folder().abspath, move=True, overwrite=True)
+                moved_nodes.append(node)
+
+            with context_man:
+                DbNode.objects.bulk_create(
+                    [node.dbnode for node in nodes],
+                    batch_size=STORE_MANY_BATCH_SIZE)
+
+                # bulk_create does not set the pks: I get the DbNodes in the
+                # DB, that replace the transient ones
+                dbnodes = {}
+                for chunk in grouper(STORE_MANY_BATCH_SIZE,
+                                     [node.uuid for node in nodes]):
+                    dbnodes.update((unicode(dbnode.uuid), dbnode) for dbnode
+                                   in DbNode.objects.filter(uuid__in=chunk))
+
+                attributes_by_node = []
+                extras_by_node = []
+                for node, hash_ in zip(nodes, hashes):
+                    dbnode = dbnodes[node.uuid]
+                    attributes_by_node.append((dbnode, node._attrs_cache))
+                    if hash_ is not None:
+                        extras_by_node.append(
+                            (dbnode, {node._HASH_EXTRA_KEY: hash_}))
+
+                # The nodes are new, there is nothing to delete
+                DbAttribute.reset_values_for_nodes(
+                    attributes_by_node, with_transaction=False,
+                    delete_existing=False, batch_size=STORE_MANY_BATCH_SIZE)
+                DbExtra.reset_values_for_nodes(
+                    extras_by_node, with_transaction=False,
+                    delete_existing=False, batch_size=STORE_MANY_BATCH_SIZE)
+
+                def get_pk(node):
+                    if node.uuid in dbnodes:
+                        return dbnodes[node.uuid].pk
+                    return node.pk
+
+                # The custom nodes require their parents to be stored: their
+                # links from the nodes stored in bulk are stored below
+                custom_links = _pop_cached_links_from(custom_nodes, bulk_uuids)
+                for node in custom_nodes:
+                    node.store(with_transaction=False)
+
+                links_to_store = []
+                for node in nodes:
+                    for label, (src, link_type) in \
+                            node._inputlinks_cache.iteritems():
+                        links_to_store.append((node, label, src, link_type))
+                DbLink.objects.bulk_create(
+                    [DbLink(input_id=get_pk(src), output_id=get_pk(node),
+                            label=label, type=link_type.value)
+                     for node, label, src, link_type
+                     in links_to_store + custom_links],
+                    batch_size=STORE_MANY_BATCH_SIZE)
+
+        # This is one of the few cases where it is ok to do a 'global'
+        # except, also because I am re-raising the exception
+        except:
+            # I put back the files in the sandbox folders and the state of
+            # the nodes since the transaction did not succeed
+            for node in moved_nodes:
+                node._get_temp_folder().replace_with_folder(
+                    node._repository_folder.abspath, move=True, overwrite=True)
+            for node, state in zip(custom_nodes, custom_states):
+                if node.is_stored:
+                    _restore_store_state(node, state)
+                else:
+                    node._inputlinks_cache.update(state[1])
+            raise
+
+        for node in nodes:
+            node._dbnode = dbnodes[node.uuid]
+            del node._attrs_cache
+            node._temp_folder = None
+            node._to_be_stored = False
+            node._inputlinks_cache.clear()
+
@@ -84,6 +84,10 @@ class AbstractCalculation(SealableWithUpdatableAttributes):
     # A tuple with attributes that can be updated even after
     # the call of the store() method
 
+    # The sealed flag is set at the end of the calculation, it says nothing
+    # about the content of the calculation
+    _hash_ignored_attributes = (SealableWithUpdatableAttributes.SEALED_KEY,)
+
     # Nodes that can be added as input using the use_* methods
     @classproperty
     def _use_methods(cls):
@@ -311,6 +315,25 @@ class AbstractCalculation(SealableWithUpdatableAttributes):
         return dict(self.get_inputs(node_type=Code, also_labels=True)).get(
             self._use_methods['code']['linkname'], None)
 
+    def _get_objects_to_hash(self):
+        """
+        Return the objects used to compute the hash of the calculation: on top
+        of those of the node, the hashes of all the input nodes. The hash
+        stored in the extras of an input is used when there is one, so that
+        the content of stored inputs is not hashed again.
+        """
+        objects = super(AbstractCalculation, self)._get_objects_to_hash()
+        input_hashes = {}
+        for label, node in self.get_inputs_dict(link_type=LinkType.INPUT).iteritems():
+            hash_ = None
+            if node.is_stored:
+                hash_ = node.get_extra(node._HASH_EXTRA_KEY, None)
+            if hash_ is None:
+                hash_ = node.get_hash(ignore_errors=False)
+            input_hashes[label] = hash_
+        objects.append(input_hashes)
+        return objects
+
     def _replace_link_from(self, src, label, link_type=LinkType.INPUT):
         """
         Replace a link.
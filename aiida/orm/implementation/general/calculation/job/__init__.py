@@ -109,6 +109,13 @@ class AbstractJobCalculation(object):
         # c = Calculation().store()
         return self
 
+    def _is_valid_cache(self):
+        """
+        Only calculations that finished successfully can be used in place of
+        an identical calculation.
+        """
+        return self.get_state() == calc_states.FINISHED
+
     def _validate(self):
         """
         Verify if all the input nodes are present and valid.
@@ -670,6 +670,24 @@ class AbstractComputer(object):
                 raise TypeError("def_cpus_per_machine must be an integer (or None)")
         self._set_property("default_mpiprocs_per_machine", def_cpus_per_machine)
 
+    def get_upload_archive(self):
+        """
+        Return True if the input files of the calculations are uploaded to
+        this computer packed in a single archive, rather than one by one.
+        """
+        return self._get_property("upload_archive", False)
+
+    def set_upload_archive(self, val):
+        """
+        Set whether the input files of the calculations are uploaded to this
+        computer packed in a single archive (requires tar on the computer),
+        rather than one by one. This saves many round trips on high-latency
+        connections.
+        """
+        if not isinstance(val, bool):
+            raise TypeError("upload_archive must be a boolean")
+        self._set_property("upload_archive", val)
+
     @abstractmethod
     def get_transport_params(self):
         pass
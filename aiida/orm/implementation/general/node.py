@@ -10,6 +10,7 @@
 from abc import ABCMeta, abstractmethod, abstractproperty
 
 import collections
+import copy
 import logging
 import os
 import types
@@ -27,6 +28,9 @@ from aiida.backends.utils import validate_attribute_key
 
 _NO_DEFAULT = tuple()
 
+# The number of rows inserted with a single INSERT by store_many
+STORE_MANY_BATCH_SIZE = 1000
+
 
 def clean_value(value):
     """
@@ -140,6 +144,12 @@ class AbstractNode(object):
     # See documentation in the set() method.
     _set_incompatibilities = []
 
+    # The key of the extra in which the content hash of the node is stored
+    _HASH_EXTRA_KEY = '_aiida_hash'
+
+    # Attributes that are not taken into account when computing the hash
+    _hash_ignored_attributes = tuple()
+
     def get_desc(self):
         """
         Returns a string with infos retrieved from a node's
@@ -702,13 +712,14 @@ class AbstractNode(object):
             input_list_keys = [i[0] for i in inputs_list]
 
             for label, v in self._inputlinks_cache.iteritems():
-                src = v[0]
+                src, cached_link_type = v
                 if label in input_list_keys:
                     raise InternalError(
                         "There exist a link with the same name "
                         "'{}' both in the DB and in the internal "
                         "cache for node pk= {}!".format(label, self.pk))
-                inputs_list.append((label, src))
+                if link_type is None or cached_link_type == link_type:
+                    inputs_list.append((label, src))
 
         if node_type is None:
             filtered_list = inputs_list
@@ -1574,24 +1585,12 @@ class AbstractNode(object):
             # the case.
             self._check_are_parents_stored()
 
-            # call implementation-dependent store method
+            # call implementation-dependent store method, that also stores
+            # the content hash used to find identical nodes
             self._db_store(with_transaction)
 
             # Set up autogrouping used by verdi run
-            from aiida.orm.autogroup import current_autogroup, Autogroup, VERDIAUTOGROUP_TYPE
-            from aiida.orm import Group
-
-            if current_autogroup is not None:
-                if not isinstance(current_autogroup, Autogroup):
-                    raise ValidationError(
-                        "current_autogroup is not an AiiDA Autogroup")
-
-                if current_autogroup.is_to_be_grouped(self):
-                    group_name = current_autogroup.get_group_name()
-                    if group_name is not None:
-                        g = Group.get_or_create(
-                            name=group_name, type_string=VERDIAUTOGROUP_TYPE)[0]
-                        g.add_nodes(self)
+            _add_to_current_autogroup([self])
 
         # This is useful because in this way I can do
         # n = Node().store()
@@ -1605,7 +1604,8 @@ class AbstractNode(object):
 
         After being called attributes cannot be
         changed anymore! Instead, extras can be changed only AFTER calling
-        this store() function.
+        this store() function. The content hash returned by _get_hash_extras
+        is stored as extra in the same transaction.
 
         :note: After successful storage, those links that are in the cache, and
             for which also the parent node is already stored, will be
@@ -1617,6 +1617,103 @@ class AbstractNode(object):
         """
         pass
 
+    @abstractclassmethod
+    def _db_store_many(cls, nodes, custom_nodes, with_transaction=True):
+        """
+        Store many new nodes in the DB with multi-row inserts, moving their
+        sandbox folders to the repository. The nodes, their attributes and
+        hashes are inserted first, then the custom_nodes are stored with
+        their own store() and finally the cached input links of nodes are
+        inserted. Called by :func:`store_many`, that does all the checks.
+
+        :param nodes: the nodes to insert in bulk
+        :param custom_nodes: the nodes whose class redefines store()
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        pass
+
+    def get_hash(self, ignore_errors=True):
+        """
+        Make a hash from the content of the node: its type, its attributes
+        (except the updatable ones and those in ``_hash_ignored_attributes``),
+        the files in its repository folder and its computer.
+
+        :param ignore_errors: if True, return None instead of raising when
+            the node content cannot be hashed
+        :return: the hash as a string, or None
+        """
+        from aiida.common.hashing import make_hash
+
+        try:
+            return make_hash(self._get_objects_to_hash())
+        except Exception:
+            if ignore_errors:
+                self.logger.warning("Node {} could not be hashed".format(self.uuid), exc_info=True)
+                return None
+            raise
+
+    def _get_objects_to_hash(self):
+        """
+        Return the list of objects that make up the content of the node, and
+        that are used by get_hash.
+        """
+        ignored_attributes = set(self._hash_ignored_attributes)
+        ignored_attributes.update(getattr(self, '_updatable_attributes', tuple()))
+
+        computer = self.get_computer()
+        return [
+            self._plugin_type_string,
+            {key: value for key, value in self.iterattrs() if key not in ignored_attributes},
+            self.folder,
+            computer.uuid if computer is not None else None,
+        ]
+
+    def _get_hash_extras(self):
+        """
+        Return the extras of a new node: its content hash, if it can be
+        computed. It is called by _db_store before moving the sandbox folder,
+        so that the hash is inserted together with the node.
+        """
+        hash_ = self.get_hash()
+        if hash_ is None:
+            return {}
+        return {self._HASH_EXTRA_KEY: hash_}
+
+    def _get_same_node(self):
+        """
+        Return a stored node of the same type with the same content hash that
+        can be used in place of this one, if any.
+
+        :return: a node or None
+        """
+        from aiida.orm.querybuilder import QueryBuilder
+
+        hash_ = self.get_hash()
+        if hash_ is None:
+            return None
+
+        filters = {'extras.{}'.format(self._HASH_EXTRA_KEY): hash_}
+        if self.is_stored:
+            filters['id'] = {'!==': self.pk}
+
+        qb = QueryBuilder()
+        qb.append(self.__class__, filters=filters, subclassing=False, project='*')
+        qb.order_by({self.__class__: {'id': 'asc'}})
+        for node, in qb.iterall():
+            if node._is_valid_cache():
+                return node
+
+        return None
+
+    def _is_valid_cache(self):
+        """
+        Whether this node can be used in place of another node with the same
+        content hash.
+        """
+        return True
+
     def __del__(self):
         """
         Called only upon real object destruction from memory
@@ -1658,7 +1755,7 @@ class AbstractNode(object):
         from aiida.orm import Node
         first_desc = QueryBuilder().append(
             Node, filters={'id':self.pk}, tag='self').append(
-            Node, descendant_of='self', project='id').first()
+            Node, descendant_of='self', project='id', max_depth=1).first()
         return bool(first_desc)
 
 
@@ -1672,7 +1769,7 @@ class AbstractNode(object):
         from aiida.orm import Node
         first_ancestor = QueryBuilder().append(
             Node, filters={'id':self.pk}, tag='self').append(
-            Node, ancestor_of='self', project='id').first()
+            Node, ancestor_of='self', project='id', max_depth=1).first()
         return bool(first_ancestor)
 
     # pylint: disable=no-self-argument
@@ -1707,6 +1804,187 @@ class AbstractNode(object):
 
 
 # pylint: disable=too-few-public-methods
+def _add_to_current_autogroup(nodes):
+    """
+    Add the nodes to the current autogroup (used by verdi run), if any.
+
+    :param nodes: a list of stored nodes
+    """
+    from aiida.orm.autogroup import current_autogroup, Autogroup, VERDIAUTOGROUP_TYPE
+    from aiida.orm import Group
+
+    if current_autogroup is None:
+        return
+
+    if not isinstance(current_autogroup, Autogroup):
+        raise ValidationError(
+            "current_autogroup is not an AiiDA Autogroup")
+
+    to_group = [n for n in nodes if current_autogroup.is_to_be_grouped(n)]
+    if to_group:
+        group_name = current_autogroup.get_group_name()
+        if group_name is not None:
+            g = Group.get_or_create(
+                name=group_name, type_string=VERDIAUTOGROUP_TYPE)[0]
+            g.add_nodes(to_group)
+
+
+def _uses_default_store(node):
+    """
+    Return True if the class of the node does not redefine store(), so that
+    the node can be stored in bulk by :func:`store_many`.
+    """
+    return (getattr(type(node).store, '__func__', None) is
+            AbstractNode.store.__func__)
+
+
+def _pop_cached_links_from(nodes, uuids):
+    """
+    Remove from the link cache of the given nodes the links whose source is
+    one of the nodes with the given uuids. It is used by _db_store_many, so
+    that the nodes with a custom store() do not need those sources to be
+    stored already: these links are stored in bulk instead.
+
+    :return: a list of tuples (node, label, source, link_type)
+    """
+    links = []
+    for node in nodes:
+        for label, (src, link_type) in node._inputlinks_cache.items():
+            if src.uuid in uuids:
+                links.append((node, label, src, link_type))
+                del node._inputlinks_cache[label]
+    return links
+
+
+def _get_store_state(node):
+    """
+    Return a copy of the python state of an unstored node, so that it can be
+    restored with _restore_store_state if _db_store_many fails after the node
+    was stored with its own store(). The attributes are copied, since the
+    backend may keep using the same dictionary after storing.
+    """
+    node_dict = dict(node.__dict__)
+    if '_attrs_cache' in node_dict:
+        node_dict['_attrs_cache'] = copy.deepcopy(node._attrs_cache)
+    return node_dict, dict(node._inputlinks_cache)
+
+
+def _restore_store_state(node, state):
+    """
+    Restore the python state of a node returned by _get_store_state, after
+    its DB entries were rolled back: the node is unstored again and its files
+    are moved back from the repository to its sandbox folder.
+    """
+    node_dict, inputlinks_cache = state
+    node.__dict__.clear()
+    node.__dict__.update(node_dict)
+    node._inputlinks_cache.clear()
+    node._inputlinks_cache.update(inputlinks_cache)
+    node.dbnode.id = None
+    node._get_temp_folder().replace_with_folder(
+        node._repository_folder.abspath, move=True, overwrite=True)
+
+
+def _check_no_cached_loops(nodes):
+    """
+    Check that the CREATE and INPUT links in the cache of the given
+    (unstored) nodes do not form a loop. Since unstored nodes have no links
+    in the DB, a loop can only be formed by links between these nodes.
+
+    :raise ValueError: if the cached links form a loop
+    """
+    uuids = set(node.uuid for node in nodes)
+    # For each node, the nodes (among the given ones) it is linked from
+    parents = {}
+    for node in nodes:
+        parents[node.uuid] = [
+            src.uuid for src, link_type in node._inputlinks_cache.itervalues()
+            if src.uuid in uuids and
+            link_type in (LinkType.CREATE, LinkType.INPUT)]
+
+    # Iterative depth-first search: 1 = being visited, 2 = done
+    status = {}
+    for start in parents:
+        if start in status:
+            continue
+        status[start] = 1
+        stack = [(start, iter(parents[start]))]
+        while stack:
+            current, to_visit = stack[-1]
+            for parent in to_visit:
+                if status.get(parent) == 1:
+                    raise ValueError(
+                        "The cached links of the nodes would generate a loop")
+                if parent not in status:
+                    status[parent] = 1
+                    stack.append((parent, iter(parents[parent])))
+                    break
+            else:
+                status[current] = 2
+                stack.pop()
+
+
+def store_many(nodes, with_transaction=True):
+    """
+    Store many new nodes, together with the input links in their cache.
+
+    The nodes are validated, their sandbox folders are moved to the
+    repository and the nodes, their attributes, their hashes and their
+    cached input links are written with multi-row inserts in a single
+    transaction. This is much faster than calling store() on each node.
+    The source of each cached link must be stored already, or be one of
+    the given nodes.
+
+    Nodes of classes that redefine store() (e.g. JobCalculation) are stored
+    with their own store() in the same transaction, after the other nodes
+    and in the given order.
+
+    :param nodes: a list of unstored nodes
+    :parameter with_transaction: if False, no transaction is used. This
+      is meant to be used ONLY if the outer calling function has already
+      a transaction open!
+    :return: the list of the pks of the nodes, in the same order
+    :raise ModificationNotAllowed: if a node is stored already, or if the
+      source of a cached link is neither stored nor one of the given nodes
+    :raise ValueError: if the cached links would generate a loop
+    """
+    nodes = list(nodes)
+    if not nodes:
+        return []
+
+    uuids = set()
+    for node in nodes:
+        if not isinstance(node, AbstractNode):
+            raise TypeError("{} is not a Node instance".format(node))
+        if not node._to_be_stored:
+            raise ModificationNotAllowed(
+                "Node with pk= {} was already stored".format(node.pk))
+        if node.uuid in uuids:
+            raise ValueError(
+                "Node with UUID={} was given twice".format(node.uuid))
+        uuids.add(node.uuid)
+
+    for node in nodes:
+        node._validate()
+        for label, (src, _) in node._inputlinks_cache.iteritems():
+            if not src.is_stored and src.uuid not in uuids:
+                raise ModificationNotAllowed(
+                    "Cannot store the input link '{}' of node {} because the "
+                    "source node is neither stored nor in the nodes to "
+                    "store".format(label, node.uuid))
+
+    _check_no_cached_loops(nodes)
+
+    bulk_nodes = [n for n in nodes if _uses_default_store(n)]
+    custom_nodes = [n for n in nodes if not _uses_default_store(n)]
+    type(nodes[0])._db_store_many(bulk_nodes, custom_nodes,
+                                  with_transaction=with_transaction)
+
+    _add_to_current_autogroup(bulk_nodes)
+
+    return [node.pk for node in nodes]
+
+
 class NodeOutputManager(object):
     """
     To document
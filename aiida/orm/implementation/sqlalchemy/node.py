@@ -22,18 +22,20 @@ from aiida.backends.sqlalchemy.models.comment import DbComment
 from aiida.backends.sqlalchemy.models.user import DbUser
 from aiida.backends.sqlalchemy.models.computer import DbComputer
 
-from aiida.common.utils import get_new_uuid
+from aiida.common.utils import get_new_uuid, grouper
 from aiida.common.folders import RepositoryFolder
 from aiida.common.exceptions import (InternalError, ModificationNotAllowed,
                                      NotExistent, UniquenessError)
 from aiida.common.links import LinkType
 from aiida.common.lang import override
 
-from aiida.orm.implementation.general.node import AbstractNode, _NO_DEFAULT
+from aiida.orm.implementation.general.node import (
+    AbstractNode, _NO_DEFAULT, STORE_MANY_BATCH_SIZE, _pop_cached_links_from,
+    _get_store_state, _restore_store_state)
 from aiida.orm.implementation.sqlalchemy.computer import Computer
 from aiida.orm.implementation.sqlalchemy.group import Group
 from aiida.orm.implementation.sqlalchemy.utils import django_filter, \
-    get_attr
+    get_attr, deferred_commits
 from aiida.orm.implementation.general.utils import get_db_columns
 from aiida.orm.mixins import Sealable
 
@@ -227,7 +229,8 @@ class Node(AbstractNode):
         if link_type is LinkType.CREATE or link_type is LinkType.INPUT:
             if QueryBuilder().append(
                     Node, filters={'id':self.pk}, tag='parent').append(
-                    Node, filters={'id':src.pk}, tag='child', descendant_of='parent').count() > 0:
+                    Node, filters={'id':src.pk}, tag='child', descendant_of='parent',
+                    distinct_walk=True).count() > 0:
                 raise ValueError(
                     "The link you are attempting to create would generate a loop")
 
@@ -625,6 +628,9 @@ class Node(AbstractNode):
         # I assume that if a node exists in the DB, its folder is in place.
         # On the other hand, periodically the user might need to run some
         # bookkeeping utility to check for lone folders.
+        # The hash also needs the files, so it is computed before moving
+        # the folder
+        extras = self._get_hash_extras()
         self._repository_folder.replace_with_folder(
             self._get_temp_folder().abspath, move=True, overwrite=True)
 
@@ -632,10 +638,12 @@ class Node(AbstractNode):
         try:
             # aiida.backends.sqlalchemy.get_scoped_session().add(self._dbnode)
             session.add(self._dbnode)
-            # Save its attributes 'manually' without incrementing
+            # Save its attributes and hash 'manually' without incrementing
             # the version for each add.
             self.dbnode.attributes = self._attrs_cache
             flag_modified(self.dbnode, "attributes")
+            self.dbnode.extras = extras
+            flag_modified(self.dbnode, "extras")
             # This should not be used anymore: I delete it to
             # possibly free memory
             del self._attrs_cache
@@ -669,6 +677,138 @@ class Node(AbstractNode):
         return self
 
 
+    @classmethod
+    def _db_store_many(cls, nodes, custom_nodes, with_transaction=True):
+        """
+        Store many new nodes in the DB with multi-row inserts, moving their
+        sandbox folders to the repository.
+        See :func:`aiida.orm.implementation.general.node.store_many`.
+
+        :param nodes: the nodes to insert in bulk
+        :param custom_nodes: the nodes whose class redefines store()
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        from aiida.backends.sqlalchemy import get_scoped_session
+        from aiida.utils import timezone
+        session = get_scoped_session()
+
+        # The hash also needs the files, so it is computed before moving
+        # the folders
+        now = timezone.now()
+        rows = []
+        for node in nodes:
+            dbnode = node.dbnode
+            hash_ = node.get_hash()
+            rows.append({
+                'uuid': dbnode.uuid,
+                'type': dbnode.type,
+                'label': dbnode.label or "",
+                'description': dbnode.description or "",
+                'ctime': dbnode.ctime or now,
+                'mtime': now,
+                'nodeversion': dbnode.nodeversion or 1,
+                'public': bool(dbnode.public),
+                'attributes': node._attrs_cache,
+                'extras': ({node._HASH_EXTRA_KEY: hash_}
+                           if hash_ is not None else {}),
+                'dbcomputer_id': (dbnode.dbcomputer.id
+                                  if dbnode.dbcomputer is not None else None),
+                'user_id': dbnode.user.id,
+            })
+
+        # The state of the nodes is changed only after the transaction
+        # succeeded, so that they are still unstored if it fails. The nodes
+        # with a custom store() change their state when they are stored:
+        # I keep a copy of it to restore it
+        bulk_uuids = set(node.uuid for node in nodes)
+        custom_states = [_get_store_state(node) for node in custom_nodes]
+        moved_nodes = []
+        try:
+            # As in _db_store, I first move the files and then store the DB
+            # entries
+            for node in nodes:
+                node._repository_folder.replace_with_folder(
+                    node._get_temp_folder().abspath, move=True, overwrite=True)
+                moved_nodes.append(node)
+
+            table = DbNode.__table__
+            uuid_to_id = {}
+            for chunk in grouper(STORE_MANY_BATCH_SIZE, rows):
+                result = session.execute(
+                    table.insert().values(list(chunk)).returning(
+                        table.c.uuid, table.c.id))
+                uuid_to_id.update((unicode(uuid), pk) for uuid, pk in result)
+
+            def get_pk(node):
+                if node.uuid in uuid_to_id:
+                    return uuid_to_id[node.uuid]
+                return node.pk
+
+            # The custom nodes require their parents to be stored: their
+            # links from the nodes stored in bulk are stored below. Their
+            # store() may commit (e.g. when a JobCalculation sets its state):
+            # the commits are deferred so that everything stays in one
+            # transaction
+            custom_links = _pop_cached_links_from(custom_nodes, bulk_uuids)
+            with deferred_commits(session):
+                for node in custom_nodes:
+                    node.store(with_transaction=False)
+            # Assign the pks of the custom nodes
+            session.flush()
+
+            link_rows = []
+            for node in nodes:
+                for label, (src, link_type) in \
+                        node._inputlinks_cache.iteritems():
+                    link_rows.append((node, label, src, link_type))
+            link_rows = [{
+                'input_id': get_pk(src),
+                'output_id': get_pk(node),
+                'label': label,
+                'type': link_type.value,
+            } for node, label, src, link_type in link_rows + custom_links]
+            for chunk in grouper(STORE_MANY_BATCH_SIZE, link_rows):
+                session.execute(DbLink.__table__.insert().values(list(chunk)))
+
+            # The DbNodes in the DB, that replace the transient ones
+            dbnodes = {}
+            for chunk in grouper(STORE_MANY_BATCH_SIZE, uuid_to_id.values()):
+                dbnodes.update((dbnode.id, dbnode) for dbnode in
+                               session.query(DbNode).filter(
+                                   DbNode.id.in_(chunk)))
+
+            if with_transaction:
+                session.commit()
+
+        # This is one of the few cases where it is ok to do a 'global'
+        # except, also because I am re-raising the exception
+        except:
+            if with_transaction:
+                session.rollback()
+            # I put back the files in the sandbox folders and the state of
+            # the nodes since the transaction did not succeed
+            for node in moved_nodes:
+                node._get_temp_folder().replace_with_folder(
+                    node._repository_folder.abspath, move=True, overwrite=True)
+            for node, state in zip(custom_nodes, custom_states):
+                if node.is_stored:
+                    _restore_store_state(node, state)
+                    # The states of a JobCalculation were rolled back too,
+                    # but are still in the collection of the DbNode
+                    node.dbnode.dbstates = []
+                else:
+                    node._inputlinks_cache.update(state[1])
+            raise
+
+        for node in nodes:
+            node._dbnode = dbnodes[uuid_to_id[node.uuid]]
+            del node._attrs_cache
+            node._temp_folder = None
+            node._to_be_stored = False
+            node._inputlinks_cache.clear()
+
     @property
     def uuid(self):
         return unicode(self.dbnode.uuid)
@@ -7,6 +7,8 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+from contextlib import contextmanager
+
 from sqlalchemy import inspect
 from sqlalchemy.orm.mapper import Mapper
 from sqlalchemy.types import Integer, Boolean
@@ -14,6 +16,23 @@ from sqlalchemy.types import Integer, Boolean
 __all__ = ['django_filter', 'get_attr']
 
 
+@contextmanager
+def deferred_commits(session):
+    """
+    Within this context the commits of the session only flush it: the code
+    that commits on its own (e.g. Model.save, used when setting attributes or
+    the state of a calculation) becomes part of the current transaction, that
+    the caller commits or rolls back as a whole.
+
+    :param session: the SQLAlchemy session
+    """
+    session.commit = session.flush
+    try:
+        yield session
+    finally:
+        del session.commit
+
+
 def iter_dict(attrs):
     if isinstance(attrs, dict):
         for key in sorted(attrs.iterkeys()):
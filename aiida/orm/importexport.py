@@ -19,6 +19,9 @@ from aiida.orm.user import User
 
 IMPORTGROUP_TYPE = 'aiida.import'
 COMP_DUPL_SUFFIX = ' (Imported #{})'
+# The number of rows that are written to (or looked up in) the database with
+# a single query during an import
+IMPORT_BATCH_SIZE = 1000
 
 # Giving names to the various entities. Attributes and links are not AiiDA
 # entities but we will refer to them as entities in the file (to simplify
@@ -305,25 +308,47 @@ def deserialize_field(k, v, fields_info, import_unique_ids_mappings,
             return ("{}_id".format(k), None)
 
 
+def print_import_throughput(ret_dict, start_time):
+    """
+    Print the number of nodes created by an import and the rate at which
+    they were stored.
+
+    :param ret_dict: the dictionary returned by the import functions
+    :param start_time: the time (as returned by time.time()) at which the
+      database part of the import started
+    """
+    import time
+
+    elapsed = time.time() - start_time
+    num_nodes = len(ret_dict.get(NODE_ENTITY_NAME, {}).get('new', []))
+    if elapsed > 0:
+        rate = num_nodes / elapsed
+    else:
+        rate = float(num_nodes)
+
+    print "IMPORTED {} NEW NODES IN {:.2f} s ({:.1f} nodes/s)".format(
+        num_nodes, elapsed, rate)
+
+
 def import_data(in_path,ignore_unknown_nodes=False,
-                silent=False):
+                silent=False, batch_size=IMPORT_BATCH_SIZE):
 
     from aiida.backends.settings import BACKEND
     from aiida.backends.profile import BACKEND_DJANGO, BACKEND_SQLA
 
     if BACKEND == BACKEND_SQLA:
         return import_data_sqla(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
-                         silent=silent)
+                         silent=silent, batch_size=batch_size)
     elif BACKEND == BACKEND_DJANGO:
         return import_data_dj(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
-                       silent=silent)
+                       silent=silent, batch_size=batch_size)
     else:
         raise Exception("Unknown settings.BACKEND: {}".format(
             BACKEND))
 
 
 def import_data_dj(in_path,ignore_unknown_nodes=False,
-                silent=False):
+                silent=False, batch_size=IMPORT_BATCH_SIZE):
     """
     Import exported AiiDA environment to the AiiDA database.
     If the 'in_path' is a folder, calls export_tree; otherwise, tries to
@@ -331,10 +356,13 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
     correct function.
 
     :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param batch_size: the number of rows inserted, or looked up, with a
+      single query
     """
     import json
     import os
     import tarfile
+    import time
     import zipfile
     from itertools import chain
 
@@ -480,6 +508,7 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
         ###############
         # IMPORT DATA #
         ###############
+        start_time = time.time()
         # DO ALL WITH A TRANSACTION
         with transaction.atomic():
             foreign_ids_reverse_mappings = {}
@@ -506,15 +535,19 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                         import_unique_ids = set(v[unique_identifier] for v in
                                                 data['export_data'][model_name].values())
 
-                        relevant_db_entries = {getattr(n, unique_identifier): n
-                                               for n in Model.objects.filter(
-                            **{'{}__in'.format(unique_identifier):
-                                   import_unique_ids})}
-
-                        foreign_ids_reverse_mappings[model_name] = {
-                            k: v.pk for k, v in relevant_db_entries.iteritems()}
+                        # Only fetch the unique identifiers and the pks,
+                        # in batches to keep the queries at a sane size
+                        relevant_db_entries = {}
+                        for ids_group in grouper(batch_size, import_unique_ids):
+                            relevant_db_entries.update(Model.objects.filter(
+                                **{'{}__in'.format(unique_identifier):
+                                       ids_group}).values_list(
+                                unique_identifier, 'pk'))
+
+                        foreign_ids_reverse_mappings[model_name] = dict(
+                            relevant_db_entries)
                         for k, v in data['export_data'][model_name].iteritems():
-                            if v[unique_identifier] in relevant_db_entries.keys():
+                            if v[unique_identifier] in relevant_db_entries:
                                 # Already in DB
                                 existing_entries[model_name][k] = v
                             else:
@@ -618,12 +651,15 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                                                     move=True, overwrite=True)
 
                 # Store them all in once; however, the PK are not set in this way...
-                Model.objects.bulk_create(objects_to_create)
+                Model.objects.bulk_create(objects_to_create,
+                                          batch_size=batch_size)
 
                 # Get back the just-saved entries
-                just_saved = dict(Model.objects.filter(
-                    **{"{}__in".format(unique_identifier):
-                           import_entry_ids.keys()}).values_list(unique_identifier, 'pk'))
+                just_saved = {}
+                for ids_group in grouper(batch_size, import_entry_ids.keys()):
+                    just_saved.update(Model.objects.filter(
+                        **{"{}__in".format(unique_identifier):
+                               ids_group}).values_list(unique_identifier, 'pk'))
 
                 imported_states = []
                 if model_name == NODE_ENTITY_NAME:
@@ -635,7 +671,8 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                         imported_states.append(
                             models.DbCalcState(dbnode_id=new_pk,
                                                state=calc_states.IMPORTED))
-                    models.DbCalcState.objects.bulk_create(imported_states)
+                    models.DbCalcState.objects.bulk_create(
+                        imported_states, batch_size=batch_size)
 
                 # Now I have the PKs, print the info
                 # Moreover, set the foreing_ids_reverse_mappings
@@ -656,6 +693,9 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                 if model_name == NODE_ENTITY_NAME:
                     if not silent:
                         print "STORING NEW NODE ATTRIBUTES..."
+                    # The nodes are new, so there are no attributes to reset:
+                    # collect all of them and store them in bulk
+                    attributes_by_node = []
                     for unique_id, new_pk in just_saved.iteritems():
                         import_entry_id = import_entry_ids[unique_id]
                         # Get attributes from import file
@@ -673,10 +713,12 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                         # Here I have to deserialize the attributes
                         deserialized_attributes = deserialize_attributes(
                             attributes, attributes_conversion)
-                        models.DbAttribute.reset_values_for_node(
-                            dbnode=new_pk,
-                            attributes=deserialized_attributes,
-                            with_transaction=False)
+                        attributes_by_node.append(
+                            (new_pk, deserialized_attributes))
+
+                    models.DbAttribute.reset_values_for_nodes(
+                        attributes_by_node, with_transaction=False,
+                        delete_existing=False, batch_size=batch_size)
 
             if not silent:
                 print "STORING NODE LINKS..."
@@ -685,15 +727,22 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
             import_links = data['links_uuid']
             links_to_store = []
 
-            # Needed for fast checks of existing links
-            existing_links_raw = models.DbLink.objects.all().values_list(
-                'input', 'output', 'label', 'type')
-            existing_links_labels = {(l[0], l[1]): l[2] for l in existing_links_raw}
-            existing_input_links = {(l[1], l[2]): l[0] for l in existing_links_raw}
-
             #~ print foreign_ids_reverse_mappings
             dbnode_reverse_mappings = foreign_ids_reverse_mappings[NODE_ENTITY_NAME]
                 #~ get_class_string(models.DbNode)]
+
+            # Needed for fast checks of existing links. Only the links ending
+            # in one of the imported nodes can clash with the new ones
+            linked_output_ids = set(dbnode_reverse_mappings[l['output']]
+                                    for l in import_links
+                                    if l['output'] in dbnode_reverse_mappings)
+            existing_links_raw = []
+            for ids_group in grouper(batch_size, linked_output_ids):
+                existing_links_raw.extend(models.DbLink.objects.filter(
+                    output__in=ids_group).values_list(
+                    'input', 'output', 'label', 'type'))
+            existing_links_labels = {(l[0], l[1]): l[2] for l in existing_links_raw}
+            existing_input_links = {(l[1], l[2]): l[0] for l in existing_links_raw}
             for link in import_links:
                 try:
                     in_id = dbnode_reverse_mappings[link['input']]
@@ -741,7 +790,8 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                 if not silent:
                     print "   ({} new links...)".format(len(links_to_store))
 
-                models.DbLink.objects.bulk_create(links_to_store)
+                models.DbLink.objects.bulk_create(links_to_store,
+                                                  batch_size=batch_size)
             else:
                 if not silent:
                     print "   (0 new links...)"
@@ -754,8 +804,8 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                 group = models.DbGroup.objects.get(uuid=groupuuid)
                 nodes_to_store = [dbnode_reverse_mappings[node_uuid]
                                   for node_uuid in groupnodes]
-                if nodes_to_store:
-                    group.dbnodes.add(*nodes_to_store)
+                for pks_group in grouper(batch_size, nodes_to_store):
+                    group.dbnodes.add(*pks_group)
 
             ######################################################
             # Put everything in a specific group
@@ -792,10 +842,10 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                     except UniquenessError:
                         counter += 1
 
-                # Add all the nodes to the new group
+                # Add all the nodes to the new group, directly by pk
                 # TODO: decide if we want to return the group name
-                group.add_nodes(models.DbNode.objects.filter(
-                    pk__in=pks_for_group))
+                for pks_group in grouper(batch_size, pks_for_group):
+                    group.dbgroup.dbnodes.add(*pks_group)
 
                 if not silent:
                     print "IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group.name)
@@ -803,6 +853,9 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
                 if not silent:
                     print "NO DBNODES TO IMPORT, SO NO GROUP CREATED"
 
+        if not silent:
+            print_import_throughput(ret_dict, start_time)
+
     if not silent:
         print "*** WARNING: MISSING EXISTING UUID CHECKS!!"
         print "*** WARNING: TODO: UPDATE IMPORT_DATA WITH DEFAULT VALUES! (e.g. calc status, user pwd, ...)"
@@ -811,6 +864,24 @@ def import_data_dj(in_path,ignore_unknown_nodes=False,
     return ret_dict
 
 
+def _add_nodes_to_group_sqla(session, group_id, node_ids, batch_size):
+    """
+    Add the nodes with the given pks to a group, skipping those that are
+    already in it, using multi-row inserts in the group-node table.
+    """
+    from aiida.backends.sqlalchemy.models.group import table_groups_nodes
+
+    for ids_group in grouper(batch_size, set(node_ids)):
+        already_in = set(n[0] for n in session.query(
+            table_groups_nodes.c.dbnode_id).filter(
+            table_groups_nodes.c.dbgroup_id == group_id,
+            table_groups_nodes.c.dbnode_id.in_(ids_group)))
+        rows = [{'dbgroup_id': group_id, 'dbnode_id': node_id}
+                for node_id in ids_group if node_id not in already_in]
+        if rows:
+            session.execute(table_groups_nodes.insert().values(rows))
+
+
 def validate_uuid(given_uuid):
     """
     A simple check for the UUID validity.
@@ -827,20 +898,28 @@ def validate_uuid(given_uuid):
     return str(parsed_uuid) == given_uuid
 
 
-def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
+def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False,
+                     batch_size=IMPORT_BATCH_SIZE):
     """
     Import exported AiiDA environment to the AiiDA database.
     If the 'in_path' is a folder, calls export_tree; otherwise, tries to
     detect the compression format (zip, tar.gz, tar.bz2, ...) and calls the
     correct function.
 
+    Nodes, their states, links and group memberships are written with
+    multi-row INSERT statements of at most batch_size rows each.
+
     :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param batch_size: the number of rows inserted, or looked up, with a
+      single query
     """
     import json
     import os
     import tarfile
+    import time
     import zipfile
     from itertools import chain
+    from uuid import UUID
 
     from aiida.utils import timezone
 
@@ -853,7 +932,7 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
     from aiida.orm.querybuilder import QueryBuilder
 
     # Backend specific imports
-    from aiida.backends.sqlalchemy.models.node import DbCalcState
+    from aiida.backends.sqlalchemy.models.node import DbCalcState, DbLink
 
     # This is the export version expected by this function
     expected_export_version = '0.3'
@@ -1015,6 +1094,7 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
         import aiida.backends.sqlalchemy
 
         session = aiida.backends.sqlalchemy.get_scoped_session()
+        start_time = time.time()
 
         try:
             foreign_ids_reverse_mappings = {}
@@ -1042,19 +1122,23 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                     if unique_identifier is not None:
                         import_unique_ids = set(v[unique_identifier] for v in data['export_data'][entity_name].values())
 
+                        # Only fetch the unique identifiers and the pks,
+                        # in batches to keep the queries at a sane size
                         relevant_db_entries = dict()
-                        if len(import_unique_ids) > 0:
+                        for ids_group in grouper(batch_size, import_unique_ids):
                             qb = QueryBuilder()
                             qb.append(entity, filters={
-                                unique_identifier: {"in": import_unique_ids}},
-                                      project=["*"], tag="res")
-                            relevant_db_entries = {
-                                getattr(v[0], unique_identifier):
-                                    v[0] for v in qb.all()}
-
-                            foreign_ids_reverse_mappings[entity_name] = {
-                                k: v.pk for k, v in
-                                relevant_db_entries.iteritems()}
+                                unique_identifier: {"in": list(ids_group)}},
+                                      project=[unique_identifier, "id"],
+                                      tag="res")
+                            for unique_id, pk in qb.iterall(
+                                    batch_size=batch_size):
+                                if isinstance(unique_id, UUID):
+                                    unique_id = str(unique_id)
+                                relevant_db_entries[unique_id] = pk
+
+                        foreign_ids_reverse_mappings[entity_name] = dict(
+                            relevant_db_entries)
 
                         dupl_counter = 0
                         imported_comp_names = set()
@@ -1104,7 +1188,7 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
 
                                 imported_comp_names.add(v["name"])
 
-                            if v[unique_identifier] in (relevant_db_entries.keys()):
+                            if v[unique_identifier] in relevant_db_entries:
                                 # Already in DB
                                 # again, switched to entity_name in v0.3
                                 existing_entries[entity_name][k] = v
@@ -1136,10 +1220,13 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                                                             existing_entry_id)
 
                 # Store all objects for this model in a list, and store them
-                # all in once at the end.
+                # all in once at the end. Nodes can be very many, so they are
+                # kept as plain rows and inserted in bulk.
                 objects_to_create = list()
                 # This is needed later to associate the import entry with the new pk
                 import_entry_ids = dict()
+                db_entity = get_object_from_string(
+                    entity_names_to_sqla_schema[entity_name])
 
                 for import_entry_id, entry_data in (new_entries[entity_name].iteritems()):
                     unique_id = entry_data[unique_identifier]
@@ -1164,9 +1251,10 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                             import_data[model_fkey] = import_data[file_fkey]
                             import_data.pop(file_fkey, None)
 
-                    db_entity = get_object_from_string(
-                        entity_names_to_sqla_schema[entity_name])
-                    objects_to_create.append(db_entity(**import_data))
+                    if entity_name == NODE_ENTITY_NAME:
+                        objects_to_create.append(import_data)
+                    else:
+                        objects_to_create.append(db_entity(**import_data))
                     import_entry_ids[unique_id] = import_entry_id
 
                 # Before storing entries in the DB, I store the files (if these
@@ -1179,15 +1267,16 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
 
                         # Creating the needed files
                         subfolder = folder.get_subfolder(os.path.join(
-                            nodes_export_subfolder, export_shard_uuid(o.uuid)))
+                            nodes_export_subfolder,
+                            export_shard_uuid(o['uuid'])))
                         if not subfolder.exists():
                             raise ValueError("Unable to find the repository "
                                              "folder for node with UUID={} "
                                              "in the exported file"
-                                             .format(o.uuid))
+                                             .format(o['uuid']))
                         destdir = RepositoryFolder(
                             section=Node._section_name,
-                            uuid=o.uuid)
+                            uuid=o['uuid'])
                         # Replace the folder, possibly destroying existing
                         # previous folders, and move the files (faster if we
                         # are on the same filesystem, and
@@ -1196,7 +1285,7 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                                                     move=True, overwrite=True)
 
                         # For DbNodes, we also have to store Attributes!
-                        import_entry_id = import_entry_ids[str(o.uuid)]
+                        import_entry_id = import_entry_ids[str(o['uuid'])]
                         # Get attributes from import file
                         try:
                             attributes = data['node_attributes'][
@@ -1212,30 +1301,28 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                                     unique_id))
 
                         # Here I have to deserialize the attributes
-                        deserialized_attributes = deserialize_attributes(
+                        o['attributes'] = deserialize_attributes(
                             attributes, attributes_conversion)
-
-                        if deserialized_attributes:
-                            from sqlalchemy.dialects.postgresql import JSONB
-                            o.attributes = dict()
-                            for k, v in deserialized_attributes.items():
-                                o.attributes[k] = v
-
-                # Store them all in once; However, the PK
-                # are not set in this way...
-                if objects_to_create:
+                        o.setdefault('extras', dict())
+
+                    # Store them in batches of multi-row inserts; However,
+                    # the PK are not returned in this way...
+                    for rows in grouper(batch_size, objects_to_create):
+                        session.execute(
+                            db_entity.__table__.insert().values(list(rows)))
+                elif objects_to_create:
                     session.add_all(objects_to_create)
 
                 session.flush()
 
-                if import_entry_ids.keys():
+                just_saved = dict()
+                for ids_group in grouper(batch_size, import_entry_ids.keys()):
                     qb = QueryBuilder()
                     qb.append(entity, filters={
-                        unique_identifier: {"in": import_entry_ids.keys()}},
+                        unique_identifier: {"in": list(ids_group)}},
                               project=[unique_identifier, "id"], tag="res")
-                    just_saved = {v[0]: v[1] for v in qb.all()}
-                else:
-                    just_saved = dict()
+                    just_saved.update(
+                        {v[0]: v[1] for v in qb.iterall(batch_size=batch_size)})
 
                 imported_states = []
                 if entity_sig == entity_names_to_signatures[NODE_ENTITY_NAME]:
@@ -1248,15 +1335,16 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                     # for calculations
                     for unique_id, new_pk in just_saved.iteritems():
                         imported_states.append(
-                            DbCalcState(dbnode_id=new_pk,
-                                        state=calc_states.IMPORTED))
+                            {'dbnode_id': new_pk,
+                             'state': calc_states.IMPORTED})
 
-                    session.add_all(imported_states)
+                    for rows in grouper(batch_size, imported_states):
+                        session.execute(
+                            DbCalcState.__table__.insert().values(list(rows)))
 
                 # Now I have the PKs, print the info
                 # Moreover, set the foreing_ids_reverse_mappings
                 for unique_id, new_pk in just_saved.iteritems():
-                    from uuid import UUID
                     if isinstance(unique_id, UUID):
                         unique_id = str(unique_id)
                     import_entry_id = import_entry_ids[unique_id]
@@ -1278,16 +1366,22 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
             import_links = data['links_uuid']
             links_to_store = []
 
-            # Needed for fast checks of existing links
-            from aiida.backends.sqlalchemy.models.node import DbLink
-            existing_links_raw = session.query(DbLink.input, DbLink.output,
-                                               DbLink.label).all()
+            dbnode_reverse_mappings = foreign_ids_reverse_mappings[NODE_ENTITY_NAME]
+
+            # Needed for fast checks of existing links. Only the links ending
+            # in one of the imported nodes can clash with the new ones
+            linked_output_ids = set(dbnode_reverse_mappings[l['output']]
+                                    for l in import_links
+                                    if l['output'] in dbnode_reverse_mappings)
+            existing_links_raw = []
+            for ids_group in grouper(batch_size, linked_output_ids):
+                existing_links_raw.extend(session.query(
+                    DbLink.input_id, DbLink.output_id, DbLink.label).filter(
+                    DbLink.output_id.in_(ids_group)).all())
             existing_links_labels = {(l[0], l[1]): l[2]
                                      for l in existing_links_raw}
             existing_input_links = {(l[1], l[2]): l[0]
                                     for l in existing_links_raw}
-
-            dbnode_reverse_mappings = foreign_ids_reverse_mappings[NODE_ENTITY_NAME]
             for link in import_links:
                 try:
                     in_id = dbnode_reverse_mappings[link['input']]
@@ -1325,9 +1419,10 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                                          .format(out_id, link['label'], in_id))
                     except KeyError:
                         # New link
-                        links_to_store.append(DbLink(
-                            input_id=in_id, output_id=out_id,
-                            label=link['label'], type=LinkType(link['type']).value))
+                        links_to_store.append({
+                            'input_id': in_id, 'output_id': out_id,
+                            'label': link['label'],
+                            'type': LinkType(link['type']).value})
                         if LINK_ENTITY_NAME not in ret_dict:
                             ret_dict[LINK_ENTITY_NAME] = {'new': []}
                         ret_dict[LINK_ENTITY_NAME]['new'].append((in_id, out_id))
@@ -1336,7 +1431,9 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
             if links_to_store:
                 if not silent:
                     print "   ({} new links...)".format(len(links_to_store))
-                session.add_all(links_to_store)
+                for rows in grouper(batch_size, links_to_store):
+                    session.execute(
+                        DbLink.__table__.insert().values(list(rows)))
             else:
                 if not silent:
                     print "   (0 new links...)"
@@ -1345,16 +1442,14 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                 print "STORING GROUP ELEMENTS..."
             import_groups = data['groups_uuid']
             for groupuuid, groupnodes in import_groups.iteritems():
-                # # TODO: cache these to avoid too many queries
                 qb_group = QueryBuilder().append(
-                    Group, filters={'uuid': {'==': groupuuid}})
-                group = qb_group.first()[0]
+                    Group, filters={'uuid': {'==': groupuuid}},
+                    project=['id'])
+                group_id = qb_group.first()[0]
                 nodes_ids_to_add = [dbnode_reverse_mappings[node_uuid]
                                     for node_uuid in groupnodes]
-                qb_nodes = QueryBuilder().append(
-                    Node, filters={'id': {'in': nodes_ids_to_add}})
-                nodes_to_add = [n[0] for n in qb_nodes.all()]
-                group.add_nodes(nodes_to_add)
+                _add_nodes_to_group_sqla(session, group_id, nodes_ids_to_add,
+                                         batch_size)
 
             ######################################################
             # Put everything in a specific group
@@ -1391,14 +1486,11 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                     else:
                         counter += 1
 
-                # Add all the nodes to the new group
+                # Add all the nodes to the new group, directly by pk
                 # TODO: decide if we want to return the group name
-                from aiida.backends.sqlalchemy.models.node import DbNode
-                group.add_nodes(session.query(DbNode).filter(
-                    DbNode.id.in_(pks_for_group)).distinct().all())
-
-                # group.add_nodes(models.DbNode.objects.filter(
-                #     pk__in=pks_for_group))
+                session.flush()
+                _add_nodes_to_group_sqla(session, group._dbgroup.id,
+                                         pks_for_group, batch_size)
 
                 if not silent:
                     print "IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group.name)
@@ -1412,6 +1504,9 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
             session.rollback()
             raise
 
+        if not silent:
+            print_import_throughput(ret_dict, start_time)
+
     if not silent:
         print "*** WARNING: MISSING EXISTING UUID CHECKS!!"
         print "*** WARNING: TODO: UPDATE IMPORT_DATA WITH DEFAULT VALUES! (e.g. calc status, user pwd, ...)"
@@ -1641,9 +1736,80 @@ def fill_in_query(partial_query, originating_entity_str, current_entity_str,
                       new_tag_suffixes)
 
 
+class JsonContainerStream(object):
+    """
+    Serialize the items of a JSON object (or array) one at a time to a
+    temporary file, so that large containers never have to be held in memory.
+    Once all items are added, the container is written with :meth:`write_to`.
+    """
+
+    def __init__(self, is_list=False):
+        """
+        :param is_list: if True the container is a JSON array, otherwise an object
+        """
+        import tempfile
+
+        self._is_list = is_list
+        self._handle = tempfile.TemporaryFile()
+        self._num_items = 0
+
+    def __len__(self):
+        return self._num_items
+
+    def _start_item(self, key):
+        import json
+
+        if self._num_items > 0:
+            self._handle.write(', ')
+        if not self._is_list:
+            # Like json.dump, non-string keys are converted to strings
+            if not isinstance(key, basestring):
+                key = str(key)
+            self._handle.write(json.dumps(key))
+            self._handle.write(': ')
+        self._num_items += 1
+
+    def add(self, value, key=None):
+        """
+        Add an item to the container
+
+        :param value: the JSON-serializable value
+        :param key: the key of the item, for JSON objects only
+        """
+        import json
+
+        self._start_item(key)
+        json.dump(value, self._handle)
+
+    def add_container(self, container, key=None):
+        """
+        Add a nested container to the container, the nested container is
+        released in the process
+
+        :param container: a :class:`JsonContainerStream`
+        :param key: the key of the item, for JSON objects only
+        """
+        self._start_item(key)
+        container.write_to(self._handle)
+
+    def write_to(self, handle):
+        """
+        Write the complete container to a file handle and release the
+        temporary file.
+        """
+        import shutil
+
+        handle.write('[' if self._is_list else '{')
+        self._handle.seek(0)
+        shutil.copyfileobj(self._handle, handle)
+        self._handle.close()
+        handle.write(']' if self._is_list else '}')
+
+
 def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                      allowed_licenses=None, forbidden_licenses=None,
-                     silent=False, use_querybuilder_ancestors=False):
+                     silent=False, use_querybuilder_ancestors=False,
+                     batch_size=100):
     """
     Export the DB entries passed in the 'what' list to a file tree.
 
@@ -1663,6 +1829,9 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
       then calls function for licenses of Data nodes expecting True if
       license is allowed, False otherwise.
     :param silent: suppress debug prints
+    :param batch_size: the number of database rows fetched at a time. Entries
+      are written to temporary files as they are fetched, so this bounds the
+      memory used by the export
     :raises LicensingException: if any node is licensed under forbidden
       license
     """
@@ -1706,7 +1875,8 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                 qb = QueryBuilder()
                 qb.append(Node, tag='low_node',
                           filters={'id': {'in': given_node_entry_ids}})
-                qb.append(Node, ancestor_of='low_node', project=['id'])
+                qb.append(Node, ancestor_of='low_node', project=['id'],
+                          distinct_walk=True)
                 additional_ids = [_ for _, in qb.all()]
             else:
                 q = QueryFactory()()
@@ -1780,7 +1950,9 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     if not silent:
         print "STORING DATABASE ENTRIES..."
 
+    # Entries are streamed to temporary files, only their ids are kept in memory
     export_data = dict()
+    exported_ids = dict()
     entity_separator = '_'
     for entity_name, partial_query in entries_to_add.iteritems():
 
@@ -1794,7 +1966,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
             fill_in_query(partial_query, entity_name, ref_model_name,
                           [entity_name], entity_separator)
 
-        for temp_d in partial_query.iterdict():
+        for temp_d in partial_query.iterdict(batch_size=batch_size):
             for k in temp_d.keys():
                 # Get current entity
                 current_entity = k.split(entity_separator)[-1]
@@ -1804,24 +1976,26 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                 if temp_d[k]["id"] is None:
                     continue
 
-                temp_d2 = {
-                    temp_d[k]["id"]:
-                        serialize_dict(temp_d[k],
-                                       remove_fields=['id'],
-                                       rename_fields=
-                                       model_fields_to_file_fields[current_entity])}
-                try:
-                    export_data[current_entity].update(temp_d2)
-                except KeyError:
-                    export_data[current_entity] = temp_d2
+                # The same entry (e.g. a user) can be referenced by many rows
+                entity_ids = exported_ids.setdefault(current_entity, set())
+                if temp_d[k]["id"] in entity_ids:
+                    continue
+                entity_ids.add(temp_d[k]["id"])
+
+                if current_entity not in export_data:
+                    export_data[current_entity] = JsonContainerStream()
+                export_data[current_entity].add(
+                    serialize_dict(temp_d[k],
+                                   remove_fields=['id'],
+                                   rename_fields=
+                                   model_fields_to_file_fields[current_entity]),
+                    key=temp_d[k]["id"])
 
     ######################################
     # Manually manage links and attributes
     ######################################
     # I use .get because there may be no nodes to export
-    all_nodes_pk = list()
-    if export_data.has_key(NODE_ENTITY_NAME):
-        all_nodes_pk.extend(export_data.get(NODE_ENTITY_NAME).keys())
+    all_nodes_pk = list(exported_ids.get(NODE_ENTITY_NAME, []))
 
     if sum(len(model_data) for model_data in export_data.values()) == 0:
         if not silent:
@@ -1836,8 +2010,8 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     ## ATTRIBUTES
     if not silent:
         print "STORING NODE ATTRIBUTES..."
-    node_attributes = {}
-    node_attributes_conversion = {}
+    node_attributes = JsonContainerStream()
+    node_attributes_conversion = JsonContainerStream()
 
     # A second QueryBuilder query to get the attributes. See if this can be
     # optimized
@@ -1845,18 +2019,19 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
         all_nodes_query = QueryBuilder()
         all_nodes_query.append(Node, filters={"id": {"in": all_nodes_pk}},
                                project=["*"])
-        for res in all_nodes_query.iterall():
+        for res in all_nodes_query.iterall(batch_size=batch_size):
             n = res[0]
-            (node_attributes[str(n.pk)],
-             node_attributes_conversion[str(n.pk)]) = serialize_dict(
+            attributes, conversion = serialize_dict(
                 n.get_attrs(), track_conversion=True)
+            node_attributes.add(attributes, key=str(n.pk))
+            node_attributes_conversion.add(conversion, key=str(n.pk))
 
     if not silent:
         print "STORING NODE LINKS..."
     ## All 'parent' links (in this way, I can automatically export a node
     ## that will get automatically attached to a parent node in the end DB,
     ## if the parent node is already present in the DB)
-    links_uuid = list()
+    links_uuid = JsonContainerStream(is_list=True)
     # Export links only if there are nodes to be extracted
     if len(all_nodes_pk) > 0:
         links_qb = QueryBuilder()
@@ -1867,8 +2042,8 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                         edge_filters={'type':{'in':(LinkType.CREATE.value, LinkType.INPUT.value)}},
                         edge_project=['label', 'type'], output_of='input')
 
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            links_uuid.append({
+        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall(batch_size=batch_size):
+            links_uuid.add({
                 'input': str(input_uuid),
                 'output': str(output_uuid),
                 'label': str(link_label),
@@ -1877,21 +2052,23 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
 
     if not silent:
         print "STORING GROUP ELEMENTS..."
-    groups_uuid = dict()
+    groups_uuid = JsonContainerStream()
     # If a group is in the exported date, we export the group/node correlation
-    if GROUP_ENTITY_NAME in export_data:
-        for curr_group in export_data[GROUP_ENTITY_NAME]:
-            group_uuid_qb = QueryBuilder()
-            group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
-                                 filters={'id': {'==': curr_group}},
-                                 project=['uuid'], tag='group')
-            group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
-                                 project=['uuid'], member_of='group')
-            for res in group_uuid_qb.iterall():
-                if groups_uuid.has_key(str(res[0])):
-                    groups_uuid[str(res[0])].append(str(res[1]))
-                else:
-                    groups_uuid[str(res[0])] = [str(res[1])]
+    for curr_group in exported_ids.get(GROUP_ENTITY_NAME, []):
+        group_uuid_qb = QueryBuilder()
+        group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
+                             filters={'id': {'==': curr_group}},
+                             project=['uuid'], tag='group')
+        group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
+                             project=['uuid'], member_of='group')
+        group_uuid = None
+        member_uuids = JsonContainerStream(is_list=True)
+        for res in group_uuid_qb.iterall(batch_size=batch_size):
+            group_uuid = str(res[0])
+            member_uuids.add(str(res[1]))
+        # Empty groups are not listed
+        if group_uuid is not None:
+            groups_uuid.add_container(member_uuids, key=group_uuid)
 
     ######################################
     # Now I store
@@ -1900,22 +2077,25 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     nodesubfolder = folder.get_subfolder('nodes',create=True,
                                          reset_limit=True)
 
-    # Add the proper signatures to the exported data
-    for entity_name in export_data.keys():
-        export_data[entity_name] = (
-            export_data.pop(entity_name))
-
     if not silent:
         print "STORING DATA..."
 
     with folder.open('data.json', 'w') as f:
-        json.dump({
-                'node_attributes': node_attributes,
-                'node_attributes_conversion': node_attributes_conversion,
-                'export_data': export_data,
-                'links_uuid': links_uuid,
-                'groups_uuid': groups_uuid,
-                }, f)
+        f.write('{"node_attributes": ')
+        node_attributes.write_to(f)
+        f.write(', "node_attributes_conversion": ')
+        node_attributes_conversion.write_to(f)
+        f.write(', "export_data": {')
+        for i, (entity_name, entity_data) in enumerate(export_data.iteritems()):
+            if i > 0:
+                f.write(', ')
+            f.write('{}: '.format(json.dumps(entity_name)))
+            entity_data.write_to(f)
+        f.write('}, "links_uuid": ')
+        links_uuid.write_to(f)
+        f.write(', "groups_uuid": ')
+        groups_uuid.write_to(f)
+        f.write('}')
 
     # Add proper signature to unique identifiers & all_fields_info
     # Ignore if a key doesn't exist in any of the two dictionaries
@@ -1940,7 +2120,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
         uuid_query = QueryBuilder()
         uuid_query.append(Node, filters={"id": {"in": all_nodes_pk}},
                           project=["uuid"])
-        for res in uuid_query.all():
+        for res in uuid_query.iterall(batch_size=batch_size):
             uuid = str(res[0])
             sharded_uuid = export_shard_uuid(uuid)
 
@@ -2027,18 +2207,20 @@ class MyWritingZipFile(object):
         self._buffer = None
 
     def open(self):
-        import StringIO
+        import tempfile
 
         if self._buffer is not None:
             raise IOError("Cannot open again!")
-        self._buffer = StringIO.StringIO()
+        # Buffer on disk rather than in memory, the file can be large
+        self._buffer = tempfile.NamedTemporaryFile()
 
     def write(self, data):
         self._buffer.write(data)
 
     def close(self):
-        self._buffer.seek(0)
-        self._zipfile.writestr(self._fname, self._buffer.read())
+        self._buffer.flush()
+        self._zipfile.write(self._buffer.name, self._fname)
+        self._buffer.close()
         self._buffer = None
 
     def __enter__(self):
@@ -2082,7 +2264,8 @@ class ZipFolder(object):
             else:
                 compression = zipfile.ZIP_STORED
             self._zipfile = zipfile.ZipFile(zipfolder_or_fname, mode=the_mode,
-                                            compression=compression)
+                                            compression=compression,
+                                            allowZip64=True)
             self._pwd = subfolder
         else:
             if mode is not None:
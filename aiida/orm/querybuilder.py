@@ -26,7 +26,7 @@ from inspect import isclass as inspect_isclass
 from aiida.orm.node import Node
 
 # The SQLAlchemy functionalities:
-from sqlalchemy import and_, or_, not_, func as sa_func, select, join
+from sqlalchemy import and_, or_, not_, func as sa_func, select, join, tuple_
 from sqlalchemy.types import Integer
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql.expression import cast
@@ -55,6 +55,9 @@ class QueryBuilder(object):
     # namely tag of first entity + _EDGE_TAG_DELIM + tag of second entity
     _EDGE_TAG_DELIM = '--'
     _VALID_PROJECTION_KEYS = ('func', 'cast')
+    # The functions that can be applied to projected and grouped entities;
+    # all but 'date' are aggregate functions
+    _VALID_FUNCS = ('max', 'min', 'count', 'sum', 'avg', 'date')
 
 
     def __init__(self, *args, **kwargs):
@@ -86,6 +89,14 @@ class QueryBuilder(object):
         :param order_by:
             How to order the results. As the 2 above, can be set also at later stage,
             check :func:`QueryBuilder.order_by` for more information.
+        :param group_by:
+            How to group the results, to compute aggregates in the projections.
+            Can be set also at later stage, check :func:`QueryBuilder.group_by`
+            for more information.
+        :param after:
+            The values of the ordered entities of the last row of the previous
+            page, for keyset pagination.
+            Check :func:`QueryBuilder.after` for more information.
 
         """
         from aiida.backends.settings import BACKEND
@@ -206,16 +217,27 @@ class QueryBuilder(object):
         # The offset returns results after the offset
         self.offset(kwargs.pop('offset', None))
 
+        # The values of the ordered entities of the last row seen, for keyset
+        # pagination. Can also be set with QueryBuilder.after
+        self.after(kwargs.pop('after', None))
+
         # The user can also specify the order.
         self._order_by = {}
         order_spec = kwargs.pop('order_by', None)
         if order_spec:
             self.order_by(order_spec)
 
+        # The user can also group the results
+        self._group_by = []
+        group_spec = kwargs.pop('group_by', None)
+        if group_spec:
+            self.group_by(group_spec)
+
         # I've gone through all the keywords, popping each item
         # If kwargs is not empty, there is a problem:
         if kwargs:
-            valid_keys = ('path', 'filters', 'project', 'limit', 'offset', 'order_by')
+            valid_keys = ('path', 'filters', 'project', 'limit', 'offset',
+                          'after', 'order_by', 'group_by')
             raise InputValidationError(
                     "Received additional keywords: {}"
                     "\nwhich I cannot process"
@@ -307,7 +329,8 @@ class QueryBuilder(object):
     def append(self, cls=None, type=None, tag=None,
                 filters=None, project=None, subclassing=True,
                 edge_tag=None, edge_filters=None, edge_project=None,
-                outerjoin=False, **kwargs
+                outerjoin=False, max_depth=None, link_types=None,
+                traversal_filters=None, distinct_walk=False, **kwargs
         ):
         """
         Any iterative procedure to build the path for a graph query
@@ -342,6 +365,31 @@ class QueryBuilder(object):
         :param str edge_project:
             The project from the edges. API-details in :meth:`.add_projection`.
 
+        The following keywords are only valid for the recursive joins
+        (*ancestor_of* and *descendant_of*) and are applied inside the
+        recursion, so that the part of the graph that is not needed is
+        not traversed at all:
+
+        :param int max_depth:
+            The maximum number of links to follow (1 means only direct links).
+            Filters on the *depth* of the edge that give an upper bound
+            are also applied inside the recursion.
+        :param list link_types:
+            The types of links to follow, as values of
+            :class:`aiida.common.links.LinkType`. Defaults to *createlink*
+            and *inputlink*.
+        :param dict traversal_filters:
+            Filters (see :meth:`.add_filter`) that every node reached by the
+            recursion has to fulfill. Nodes that do not match are neither
+            returned nor traversed, e.g.
+            ``{'type': {'like': 'calculation.%'}}``.
+        :param bool distinct_walk:
+            If True (default False), each ancestor/descendant pair (at each
+            depth, if the depth is used) is returned only once, instead of
+            once per path connecting them. If neither the depth nor the path
+            is used, this also guarantees that the recursion terminates on
+            graphs with cycles (e.g. when following *returnlink*).
+
         A small usage example how this can be invoked::
 
             qb = QueryBuilder()             # Instantiating empty querybuilder instance
@@ -574,6 +622,21 @@ class QueryBuilder(object):
                         "{}\n".format(joining_value, e.message)
                     )
 
+            if joining_keyword in ('ancestor_of', 'descendant_of'):
+                if max_depth is not None and (
+                        not isinstance(max_depth, int) or max_depth < 1):
+                    raise InputValidationError(
+                        "max_depth has to be a positive integer"
+                    )
+                if link_types is not None:
+                    self._get_recursion_link_types(link_types)
+            elif (max_depth is not None or link_types is not None or
+                    traversal_filters is not None or distinct_walk):
+                raise InputValidationError(
+                    "max_depth, link_types, traversal_filters and distinct_walk\n"
+                    "can only be used with ancestor_of or descendant_of"
+                )
+
 
         except Exception as e:
             if self._debug:
@@ -641,10 +704,16 @@ class QueryBuilder(object):
 
             ################### EXTENDING THE PATH #################################
 
-        self._path.append(dict(
+        path_spec = dict(
                 type=ormclasstype, tag=tag, joining_keyword=joining_keyword,
                 joining_value=joining_value, outerjoin=outerjoin, edge_tag=edge_tag
-            ))
+            )
+        if joining_keyword in ('ancestor_of', 'descendant_of'):
+            path_spec.update(
+                max_depth=max_depth, link_types=link_types,
+                traversal_filters=traversal_filters, distinct_walk=distinct_walk
+            )
+        self._path.append(path_spec)
 
         return self
 
@@ -754,6 +823,91 @@ class QueryBuilder(object):
             self._order_by.append(_order_spec)
         return self
 
+    def group_by(self, group_by):
+        """
+        Set the entities to group by (SQL GROUP BY), so that aggregate
+        functions can be applied in the projections.
+
+        :param group_by:
+            A dictionary (or a list of dictionaries) where keys are valid tags
+            of entities and values are lists of columns or attributes.
+            Each item can also be a dictionary, mapping the column/attribute
+            to a specification with the 'cast' and 'func' keys, with the
+            same meaning they have in projections. The same specification
+            has to be used in the projection of the grouped entity.
+
+        Usage::
+
+            # Number of nodes of each type
+            qb = QueryBuilder()
+            qb.append(Node, tag='node',
+                      project=['type', {'id': {'func': 'count'}}])
+            qb.group_by({'node': ['type']})
+
+            # Number of nodes created each day
+            qb = QueryBuilder()
+            qb.append(Node, tag='node', project=[
+                {'ctime': {'func': 'date'}}, {'id': {'func': 'count'}}])
+            qb.group_by({'node': [{'ctime': {'func': 'date'}}]})
+
+            # Average energy of the ParameterData with the same label
+            qb = QueryBuilder()
+            qb.append(ParameterData, tag='p', project=[
+                'label', {'attributes.energy': {'cast': 'f', 'func': 'avg'}}])
+            qb.group_by({'p': ['label']})
+
+        .. note:: With the Django backend, functions cannot be applied to
+            attributes and extras, and attributes and extras cannot be used
+            to group by: an InputValidationError is raised when the query
+            is built.
+        """
+        self._group_by = []
+
+        if not isinstance(group_by, (list, tuple)):
+            group_by = [group_by]
+
+        for group_spec in group_by:
+            if not isinstance(group_spec, dict):
+                raise InputValidationError(
+                    "Invalid input for group_by statement: {}\n"
+                    "I am expecting a dictionary ORMClass,"
+                    "[columns to group by]"
+                    "".format(group_spec)
+                )
+            _group_spec = {}
+            for tagspec, items_to_group_by in group_spec.items():
+                if not isinstance(items_to_group_by, (tuple, list)):
+                    items_to_group_by = [items_to_group_by]
+                tag = self._get_tag_from_specification(tagspec)
+                _group_spec[tag] = []
+                for item_to_group_by in items_to_group_by:
+                    if isinstance(item_to_group_by, basestring):
+                        item_to_group_by = {item_to_group_by: {}}
+                    elif not isinstance(item_to_group_by, dict):
+                        raise InputValidationError(
+                            "Cannot deal with input to group_by {}\n"
+                            "of type{}"
+                            "\n".format(item_to_group_by,
+                                        type(item_to_group_by))
+                        )
+                    for entityname, spec in item_to_group_by.items():
+                        if not isinstance(spec, dict):
+                            raise InputValidationError(
+                                "I was expecting a dictionary\n"
+                                "You provided {} {}\n"
+                                "".format(type(spec), spec)
+                            )
+                        for key in spec.keys():
+                            if key not in self._VALID_PROJECTION_KEYS:
+                                raise InputValidationError(
+                                    "{} is not a valid key {}".format(
+                                        key, self._VALID_PROJECTION_KEYS)
+                                )
+                    _group_spec[tag].append(item_to_group_by)
+
+            self._group_by.append(_group_spec)
+        return self
+
     def add_filter(self, tagspec, filter_spec):
         """
         Adding a filter to my filters.
@@ -924,24 +1078,62 @@ class QueryBuilder(object):
                     )
             self._query = self._query.add_entity(alias)
         else:
+            self._check_attribute_func(column_name, func)
             entity_to_project = self._get_projectable_entity(
                     alias, column_name, attr_key,
                     cast=cast
                 )
-            if func is None:
-                pass
-            elif func == 'max':
-                entity_to_project = sa_func.max(entity_to_project)
-            elif func == 'min':
-                entity_to_project = sa_func.max(entity_to_project)
-            elif func == 'count':
-                entity_to_project = sa_func.count(entity_to_project)
-            else:
-                raise InputValidationError(
-                        "\nInvalid function specification {}".format(func)
-                    )
+            entity_to_project = self._apply_func(entity_to_project, func)
             self._query =  self._query.add_columns(entity_to_project)
 
+    def _check_attribute_func(self, column_name, func, group_by=False):
+        """
+        Check that the backend can apply the function, or group by, if the
+        entity is an attribute or an extra.
+
+        :param column_name: the name of the column
+        :param func: the name of the function, or None
+        :param group_by: True if the entity is used to group by
+        :raise InputValidationError: if the backend cannot do it
+        """
+        if column_name not in ('attributes', 'extras') or \
+                (func is None and not group_by):
+            return
+        if not self._impl.supports_funcs_on_attributes:
+            raise InputValidationError(
+                    "Functions and group_by cannot be applied to {} "
+                    "with this backend".format(column_name)
+                )
+
+    def _apply_func(self, entity, func):
+        """
+        Apply a function (one of _VALID_FUNCS) to an entity to project or
+        to group by.
+
+        :param entity: the entity (column, attribute, ...)
+        :param func: the name of the function, or None
+        :returns: the new entity
+        """
+        if func is None:
+            return entity
+        elif func == 'max':
+            return sa_func.max(entity)
+        elif func == 'min':
+            return sa_func.min(entity)
+        elif func == 'count':
+            return sa_func.count(entity)
+        elif func == 'sum':
+            return sa_func.sum(entity)
+        elif func == 'avg':
+            return sa_func.avg(entity)
+        elif func == 'date':
+            return sa_func.date(entity)
+        else:
+            raise InputValidationError(
+                    "\nInvalid function specification {}\n"
+                    "Valid functions are: {}".format(func, self._VALID_FUNCS)
+                )
+
 
 
     def _build_projections(self, tag, items_to_project=None):
@@ -1062,6 +1254,43 @@ class QueryBuilder(object):
         self._offset = offset
         return self
 
+    def after(self, values):
+        """
+        Return only the rows that come after the row with the given values
+        of the ordered entities (keyset, or cursor, pagination).
+        This is a faster alternative to :func:`QueryBuilder.offset` to go
+        through the results page by page: the rows before are not scanned and
+        skipped, but excluded by a filter that can use the database indexes.
+
+        The ordering has to be set with :func:`QueryBuilder.order_by` and has
+        to be total, i.e. the last ordered entity should be unique (like the
+        *id*), otherwise rows with the same values might be skipped.
+
+        :param values:
+            A list with one value for each entity of the order_by
+            specification (in the same order), taken from the last row of the
+            previous page. None to start from the first row.
+
+        Usage::
+
+            qb = QueryBuilder()
+            qb.append(Node, tag='node', project=['ctime', 'id'])
+            qb.order_by({'node': [{'ctime': 'desc'}, {'id': 'desc'}]})
+            qb.limit(100)
+            page = qb.all()
+            while page:
+                # ... do something with the page ...
+                page = qb.after(page[-1]).all()
+        """
+        if values is not None:
+            if not isinstance(values, (list, tuple)):
+                raise InputValidationError(
+                    "after has to be a list of values, or None"
+                )
+            values = list(values)
+        self._after = values
+        return self
+
 
     def _build_filters(self, alias, filter_spec):
         """
@@ -1230,11 +1459,92 @@ class QueryBuilder(object):
         )
         return aliased_edge
 
-    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    def _get_recursion_link_types(self, link_types=None):
+        """
+        :param link_types:
+            The link types to follow in a recursive join, as instances or
+            values of :class:`aiida.common.links.LinkType`.
+            If None, the CREATE and INPUT links are followed.
+
+        :returns: A tuple with the values of the link types
         """
-        joining descendants using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
+        if link_types is None:
+            return (LinkType.CREATE.value, LinkType.INPUT.value)
+        if isinstance(link_types, (basestring, LinkType)):
+            link_types = [link_types]
+        valid_values = [_.value for _ in LinkType]
+        values = []
+        for link_type in link_types:
+            value = link_type.value if isinstance(link_type, LinkType) else link_type
+            if value not in valid_values:
+                raise InputValidationError(
+                    "{} is not a valid link type\n"
+                    "Valid link types are: {}".format(link_type, valid_values)
+                )
+            values.append(value)
+        return tuple(values)
+
+    def _get_recursion_depth_limit(self, edge_tag, max_depth=None):
+        """
+        Find the maximum depth the recursion has to reach, from the
+        max_depth given by the user (a number of links) and the upper bounds
+        given in the filters on the depth of the edge.
+        Since the latter are also applied after the recursion, only the
+        simple cases (top-level filters on the depth) are considered.
+
+        :returns: The maximum value of the depth (0 for direct links) or None
+        """
+        limits = []
+        if max_depth is not None:
+            limits.append(max_depth - 1)
+
+        depth_filter = self._filters.get(edge_tag, {}).get('depth', None)
+        if depth_filter is not None:
+            if not isinstance(depth_filter, dict):
+                depth_filter = {'==': depth_filter}
+            for operator, value in depth_filter.items():
+                if not isinstance(value, int):
+                    continue
+                if operator == '<':
+                    limits.append(value - 1)
+                elif operator in ('<=', '=<', '=='):
+                    limits.append(value)
+        if limits:
+            return min(limits)
+        return None
+
+    def _is_edge_entity_used(self, edge_tag, entity_name):
+        """
+        :returns:
+            Whether the given column of an edge is used in a filter, a
+            projection or to order the results
+        """
+        if self._filters.get(edge_tag, {}).get(entity_name, None) is not None:
+            return True
+        for projection in self._projections.get(edge_tag, []):
+            if entity_name in projection.keys() or '*' in projection.keys():
+                return True
+        for order_spec in self._order_by:
+            for item_to_order_by in order_spec.get(edge_tag, []):
+                if entity_name in item_to_order_by.keys():
+                    return True
+        return False
+
+    def _join_descendants_recursive(
+            self, joined_entity, entity_to_join, isouterjoin, filter_dict,
+            expand_path=False, with_depth=True, depth_limit=None,
+            link_types=None, traversal_filters=None, distinct_walk=False):
+        """
+        joining descendants using the recursive functionality.
+
+        The filters on the starting nodes (filter_dict), the maximum depth
+        (depth_limit), the link types and the traversal_filters are applied
+        inside the recursive query, so that only the relevant part of the
+        graph is traversed.
+        If expand_path is True, the path is built and a node already on the
+        path is not visited again. If distinct_walk is True, a UNION is
+        used instead of a UNION ALL, which removes duplicate rows (per
+        depth, if with_depth is True).
         """
 
         self._check_dbentities(
@@ -1247,43 +1557,65 @@ class QueryBuilder(object):
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
         in_recursive_filters = self._build_filters(node1, filter_dict)
+        link_types = self._get_recursion_link_types(link_types)
 
         selection_walk_list = [
                 link1.input_id.label('ancestor_id'),
                 link1.output_id.label('descendant_id'),
-                cast(0, Integer).label('depth'),
             ]
+        if with_depth:
+            selection_walk_list.append(cast(0, Integer).label('depth'))
         if expand_path:
             selection_walk_list.append(array([link1.input_id, link1.output_id]).label('path'))
 
+        walk_from = join(node1, link1, link1.input_id==node1.id)
+        walk_conditions = [
+                in_recursive_filters, # I apply filters for speed here
+                link1.type.in_(link_types) # I follow input and create links by default
+            ]
+        if traversal_filters:
+            node2 = aliased(self._impl.Node)
+            walk_from = walk_from.join(node2, link1.output_id == node2.id)
+            walk_conditions.append(self._build_filters(node2, traversal_filters))
+
         walk = select(selection_walk_list).select_from(
-                join(
-                    node1, link1, link1.input_id==node1.id
-                )
-            ).where(and_(
-                    in_recursive_filters, # I apply filters for speed here
-                    link1.type.in_((LinkType.CREATE.value, LinkType.INPUT.value)) # I follow input and create links
-                )).cte(recursive=True)
+                walk_from
+            ).where(and_(*walk_conditions)).cte(recursive=True)
 
         aliased_walk = aliased(walk)
 
         selection_union_list = [
                 aliased_walk.c.ancestor_id.label('ancestor_id'),
                 link2.output_id.label('descendant_id'),
-                (aliased_walk.c.depth + cast(1, Integer)).label('current_depth')
             ]
+        if with_depth:
+            selection_union_list.append((aliased_walk.c.depth + cast(1, Integer)).label('current_depth'))
         if expand_path:
             selection_union_list.append((aliased_walk.c.path+array([link2.output_id])).label('path'))
 
-        descendants_recursive = aliased(aliased_walk.union_all(
-            select(selection_union_list).select_from(
-                    join(
-                        aliased_walk,
-                        link2,
-                        link2.input_id == aliased_walk.c.descendant_id,
-                    )
-                ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT.value)))
-            )) #.alias()
+        union_from = join(
+                aliased_walk,
+                link2,
+                link2.input_id == aliased_walk.c.descendant_id,
+            )
+        union_conditions = [link2.type.in_(link_types)]
+        if traversal_filters:
+            node3 = aliased(self._impl.Node)
+            union_from = union_from.join(node3, link2.output_id == node3.id)
+            union_conditions.append(self._build_filters(node3, traversal_filters))
+        if depth_limit is not None:
+            union_conditions.append(aliased_walk.c.depth < depth_limit)
+        if expand_path:
+            # I don't walk back to a node that is already on the path
+            union_conditions.append(not_(aliased_walk.c.path.any(link2.output_id)))
+
+        recursive_step = select(selection_union_list).select_from(
+                union_from
+            ).where(and_(*union_conditions))
+        if distinct_walk:
+            descendants_recursive = aliased(aliased_walk.union(recursive_step))
+        else:
+            descendants_recursive = aliased(aliased_walk.union_all(recursive_step))
 
         self._query = self._query.join(
                 descendants_recursive,
@@ -1296,12 +1628,13 @@ class QueryBuilder(object):
         return descendants_recursive.c
 
 
-    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    def _join_ancestors_recursive(
+            self, joined_entity, entity_to_join, isouterjoin, filter_dict,
+            expand_path=False, with_depth=True, depth_limit=None,
+            link_types=None, traversal_filters=None, distinct_walk=False):
         """
-        joining ancestors using the recursive functionality
-        :TODO: Move the filters to be done inside the recursive query (for example on depth)
-        :TODO: Pass an option to also show the path, if this is wanted.
-
+        joining ancestors using the recursive functionality.
+        See :meth:`._join_descendants_recursive` for the parameters.
         """
         self._check_dbentities(
                 (joined_entity, self._impl.Node),
@@ -1313,20 +1646,27 @@ class QueryBuilder(object):
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
         in_recursive_filters = self._build_filters(node1, filter_dict)
+        link_types = self._get_recursion_link_types(link_types)
 
         selection_walk_list = [
                 link1.input_id.label('ancestor_id'),
                 link1.output_id.label('descendant_id'),
-                cast(0, Integer).label('depth'),
             ]
+        if with_depth:
+            selection_walk_list.append(cast(0, Integer).label('depth'))
         if expand_path:
             selection_walk_list.append(array([link1.output_id, link1.input_id]).label('path'))
 
+        walk_from = join(node1, link1, link1.output_id==node1.id)
+        walk_conditions = [in_recursive_filters, link1.type.in_(link_types)]
+        if traversal_filters:
+            node2 = aliased(self._impl.Node)
+            walk_from = walk_from.join(node2, link1.input_id == node2.id)
+            walk_conditions.append(self._build_filters(node2, traversal_filters))
+
         walk = select(selection_walk_list).select_from(
-                join(
-                    node1, link1, link1.output_id==node1.id
-                )
-            ).where(and_(in_recursive_filters, link1.type.in_((LinkType.CREATE.value, LinkType.INPUT.value)))).cte(recursive=True)
+                walk_from
+            ).where(and_(*walk_conditions)).cte(recursive=True)
 
         aliased_walk = aliased(walk)
 
@@ -1334,20 +1674,36 @@ class QueryBuilder(object):
         selection_union_list = [
                 link2.input_id.label('ancestor_id'),
                 aliased_walk.c.descendant_id.label('descendant_id'),
-                (aliased_walk.c.depth + cast(1, Integer)).label('current_depth'),
             ]
+        if with_depth:
+            selection_union_list.append((aliased_walk.c.depth + cast(1, Integer)).label('current_depth'))
         if expand_path:
             selection_union_list.append((aliased_walk.c.path+array([link2.input_id])).label('path'))
 
-        ancestors_recursive = aliased(aliased_walk.union_all(
-            select(selection_union_list).select_from(
-                    join(
-                        aliased_walk,
-                        link2,
-                        link2.output_id == aliased_walk.c.ancestor_id,
-                    )
-                ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT.value))) # I can't follow RETURN or CALL links
-            ))
+        union_from = join(
+                aliased_walk,
+                link2,
+                link2.output_id == aliased_walk.c.ancestor_id,
+            )
+        # By default, I can't follow RETURN or CALL links
+        union_conditions = [link2.type.in_(link_types)]
+        if traversal_filters:
+            node3 = aliased(self._impl.Node)
+            union_from = union_from.join(node3, link2.input_id == node3.id)
+            union_conditions.append(self._build_filters(node3, traversal_filters))
+        if depth_limit is not None:
+            union_conditions.append(aliased_walk.c.depth < depth_limit)
+        if expand_path:
+            # I don't walk back to a node that is already on the path
+            union_conditions.append(not_(aliased_walk.c.path.any(link2.input_id)))
+
+        recursive_step = select(selection_union_list).select_from(
+                union_from
+            ).where(and_(*union_conditions))
+        if distinct_walk:
+            ancestors_recursive = aliased(aliased_walk.union(recursive_step))
+        else:
+            ancestors_recursive = aliased(aliased_walk.union_all(recursive_step))
 
 
         self._query = self._query.join(
@@ -1650,8 +2006,10 @@ class QueryBuilder(object):
             'filters'   :   self._filters,
             'project'   :   self._projections,
             'order_by'  :   self._order_by,
+            'group_by'  :   self._group_by,
             'limit'     :   self._limit,
             'offset'    :   self._offset,
+            'after'     :   self._after,
         })
 
         #~ self._get_json_compatible()
@@ -1676,8 +2034,49 @@ class QueryBuilder(object):
         entity = self._get_projectable_entity(alias, column_name, attrpath, **entityspec)
         order = entityspec.get('order', 'asc')
         if order == 'desc':
-            entity = entity.desc()
-        self._query = self._query.order_by(entity)
+            self._query = self._query.order_by(entity.desc())
+        else:
+            self._query = self._query.order_by(entity)
+        return entity, order
+
+    def _build_after(self, ordered_entities):
+        """
+        Filter the rows that come after the values given with
+        :func:`QueryBuilder.after`, in the order of the ordered entities.
+
+        :param ordered_entities: a list of tuples (entity, order)
+        """
+        if len(ordered_entities) != len(self._after):
+            raise InputValidationError(
+                "after requires one value for each of the {} ordered "
+                "entities, {} were given".format(
+                    len(ordered_entities), len(self._after))
+            )
+        entities = [entity for entity, order in ordered_entities]
+        orders = set(order for entity, order in ordered_entities)
+        if len(orders) == 1:
+            # Same direction for all entities: a row-wise comparison,
+            # that can use a (composite) index
+            if orders.pop() == 'desc':
+                expr = tuple_(*entities) < tuple_(*self._after)
+            else:
+                expr = tuple_(*entities) > tuple_(*self._after)
+        else:
+            # Mixed directions: the row comes after if it has the same values
+            # for the first entities and comes after in the next one
+            conditions = []
+            for index, (entity, order) in enumerate(ordered_entities):
+                equals = [
+                    previous == value for (previous, _), value
+                    in zip(ordered_entities[:index], self._after[:index])
+                ]
+                if order == 'desc':
+                    comparison = entity < self._after[index]
+                else:
+                    comparison = entity > self._after[index]
+                conditions.append(and_(*(equals + [comparison])))
+            expr = or_(*conditions)
+        self._query = self._query.filter(expr)
 
 
     def _build(self):
@@ -1726,11 +2125,24 @@ class QueryBuilder(object):
                 # I also find out whether the path is used in a filter or a project
                 # if so, I instruct the recursive function to build the path on the fly!
                 # The default is False, cause it's super expensive
-                expand_path = (
-                    (self._filters[edge_tag].get('path', None) is not None) or 
-                    any(['path' in d.keys() for d in self._projections[edge_tag]])
+                expand_path = self._is_edge_entity_used(edge_tag, 'path')
+                # The depth is needed if it is used or if the recursion has to
+                # stop at a certain depth.
+                depth_limit = self._get_recursion_depth_limit(
+                        edge_tag, verticespec.get('max_depth', None))
+                with_depth = (
+                    depth_limit is not None or
+                    not verticespec.get('distinct_walk', False) or
+                    self._is_edge_entity_used(edge_tag, 'depth')
                 )
-                aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin, filter_dict=filter_dict, expand_path=expand_path)
+                aliased_edge = connection_func(
+                        toconnectwith, alias, isouterjoin=isouterjoin,
+                        filter_dict=filter_dict, expand_path=expand_path,
+                        with_depth=with_depth, depth_limit=depth_limit,
+                        link_types=verticespec.get('link_types', None),
+                        traversal_filters=verticespec.get('traversal_filters', None),
+                        distinct_walk=verticespec.get('distinct_walk', False)
+                    )
             else:
                 aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin)
             if aliased_edge is not None:
@@ -1792,13 +2204,37 @@ class QueryBuilder(object):
                 if edge_tag is not None:
                     self._build_projections(edge_tag)
 
+        ######################### GROUP BY #############################
+        for group_spec in self._group_by:
+            for tag, entities in group_spec.items():
+                alias = self._tag_to_alias_map[tag]
+                for entitydict in entities:
+                    for entitytag, entityspec in entitydict.items():
+                        column_name = entitytag.split('.')[0]
+                        attrpath = entitytag.split('.')[1:]
+                        self._check_attribute_func(
+                            column_name, entityspec.get('func', None),
+                            group_by=True)
+                        entity = self._get_projectable_entity(
+                            alias, column_name, attrpath,
+                            cast=entityspec.get('cast', None))
+                        self._query = self._query.group_by(
+                            self._apply_func(entity,
+                                             entityspec.get('func', None)))
+
         ######################### ORDER ################################
+        ordered_entities = []
         for order_spec in self._order_by:
             for tag, entities in order_spec.items():
                 alias = self._tag_to_alias_map[tag]
                 for entitydict in entities:
                     for entitytag, entityspec in entitydict.items():
-                        self._build_order(alias, entitytag, entityspec)
+                        ordered_entities.append(
+                            self._build_order(alias, entitytag, entityspec))
+
+        ######################### AFTER ################################
+        if self._after is not None:
+            self._build_after(ordered_entities)
 
         ######################### LIMIT ################################
         if self._limit is not None:
@@ -2063,9 +2499,22 @@ class QueryBuilder(object):
 
         :returns: the number of rows as an integer
         """
-        query = self.get_query()
+        # The ordering does not change the number of rows
+        query = self.get_query().order_by(None)
         return self._impl.count(query)
 
+    def estimate_count(self):
+        """
+        Estimates the number of rows returned by the backend, using the
+        statistics of the query planner of the database instead of
+        counting the rows. This is much faster than :func:`QueryBuilder.count`
+        for large tables, but can be very inaccurate for queries with filters.
+
+        :returns: the estimated number of rows as an integer
+        """
+        query = self.get_query().order_by(None)
+        return self._impl.estimate_count(query)
+
     def iterall(self, batch_size=100):
         """
         Same as :meth:`.all`, but returns a generator.
@@ -2184,6 +2633,99 @@ class QueryBuilder(object):
 
 
 
+    def arrays(self, batch_size=1000):
+        """
+        Executes the full query and returns the results by column, as numpy
+        arrays. The rows are fetched in batches (with a server-side cursor,
+        if the database backend supports it), and each batch is converted
+        directly to arrays, without creating an AiiDA object for each value.
+        This is much faster and uses much less memory than :meth:`.all` or
+        :meth:`.dict` for many rows, but only columns and attributes can be
+        projected (not whole entities with '*').
+
+        The dtype of each array is the one inferred by numpy. To get numeric
+        arrays for attributes, cast them in the projection, e.g.
+        ``project={'attributes.energy': {'cast': 'f'}}``.
+        Dates, and columns containing None values (e.g. attributes missing
+        in some nodes), are returned as arrays of objects. Columns containing
+        lists or dictionaries (e.g. all the attributes) are returned as
+        one-dimensional arrays of objects, with one list or dictionary per
+        row.
+
+        :param int batch_size: the number of rows fetched from the database
+            at a time.
+
+        :returns:
+            a dictionary with the same structure of the rows of :meth:`.dict`,
+            i.e. the key is the tag of the vertex and the value a dictionary
+            mapping each projected entity to the numpy array of its values.
+
+        Usage::
+
+            qb = QueryBuilder()
+            qb.append(
+                Node,
+                project=['id', 'ctime', {'attributes.energy': {'cast': 'f'}}],
+                tag='node'
+            )
+            arrays = qb.arrays()
+            arrays['node']['attributes.energy'].mean()
+        """
+        import numpy
+        from aiida.common.utils import grouper
+
+        query = self.get_query()
+
+        for tag, projected_entities_dict in \
+                self.tag_to_projected_entity_dict.items():
+            if '*' in projected_entities_dict:
+                raise InputValidationError(
+                    "Only columns and attributes can be returned as arrays, "
+                    "but '*' is projected for tag '{}'".format(tag))
+
+        nr_columns = len(self._attrkeys_as_in_sql_result)
+        # For each column, the list of the arrays of each batch
+        column_chunks = [[] for _ in range(nr_columns)]
+
+        try:
+            for batch in grouper(batch_size,
+                                 self._impl.yield_per(query, batch_size)):
+                for colindex, column in enumerate(zip(*batch)):
+                    column = self._impl.get_aiida_res_column(
+                        self._attrkeys_as_in_sql_result[colindex], column)
+                    if any(isinstance(value, (list, tuple, dict))
+                           for value in column):
+                        # numpy.array would make a multi-dimensional array
+                        # of lists, or fail if they have different lengths
+                        array = numpy.empty(len(column), dtype=object)
+                        for index, value in enumerate(column):
+                            array[index] = value
+                    else:
+                        array = numpy.array(column)
+                    column_chunks[colindex].append(array)
+        except Exception:
+            self._impl.get_session().rollback()
+            raise
+
+        arrays = []
+        for chunks in column_chunks:
+            if not chunks:
+                arrays.append(numpy.array([]))
+            elif len(chunks) == 1:
+                arrays.append(chunks[0])
+            else:
+                arrays.append(numpy.concatenate(chunks))
+
+        return {
+            tag: {
+                attrkey: arrays[index_in_sql_result]
+                for attrkey, index_in_sql_result
+                in projected_entities_dict.items()
+            }
+            for tag, projected_entities_dict
+            in self.tag_to_projected_entity_dict.items()
+        }
+
     def get_results_dict(self):
         """
         Deprecated, use :meth:`.dict` instead
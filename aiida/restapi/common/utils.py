@@ -8,6 +8,7 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 from datetime import datetime, timedelta
+from urllib import quote
 
 from flask import jsonify
 from flask.json import JSONEncoder
@@ -102,6 +103,10 @@ class Utils(object):
         '=ilike=': 'ilike'
     }
 
+    # Ways to compute the total count of results: counting the rows,
+    # estimating it with the query planner, or not computing it
+    count_modes = ('exact', 'estimate', 'none')
+
     def __init__(self, **kwargs):
         """
         Sets internally the configuration parameters
@@ -233,7 +238,8 @@ class Utils(object):
                 return (resource_type, page, id, query_type)
 
     def validate_request(self, limit=None, offset=None, perpage=None, page=None,
-                         query_type=None, is_querystring_defined=False):
+                         query_type=None, is_querystring_defined=False,
+                         after=None, count=None):
         """
         Performs various checks on the consistency of the request.
         Add here all the checks that you want to do, except validity of the page
@@ -260,6 +266,17 @@ class Utils(object):
         if query_type in ('schema') and is_querystring_defined:
             raise RestInputValidationError("schema requests do not allow "
                                            "specifying a query string")
+        # 5. after (keyset pagination) incompatible with offset and pages
+        if after is not None and (offset is not None or page is not None):
+            raise RestValidationError("after key is incompatible with offset "
+                                      "and with requesting a specific page")
+        # 6. Valid count modes, pages require the exact count
+        if count is not None and count not in self.count_modes:
+            raise RestInputValidationError("count can only be one of {}".format(
+                ', '.join(self.count_modes)))
+        if page is not None and count not in (None, 'exact'):
+            raise RestValidationError("requesting a specific page requires "
+                                      "the exact count")
 
 
     def paginate(self, page, perpage, total_count):
@@ -331,7 +348,8 @@ class Utils(object):
 
         return (limit, offset, rel_pages)
 
-    def build_headers(self, rel_pages=None, url=None, total_count=None):
+    def build_headers(self, rel_pages=None, url=None, total_count=None,
+                      count='exact', next_after=None):
         """
         Construct the header dictionary for an HTTP response. It includes
         related
@@ -341,15 +359,22 @@ class Utils(object):
         last)
         :param url: (string) the full url, i.e. the url that the client uses to
         get Rest resources
+        :param total_count: the total count of results, None if it has not
+        been computed
+        :param count: the count mode (one of count_modes). If 'estimate'
+        the total count is returned as X-Total-Count-Estimate
+        :param next_after: the values of the ordered columns of the last
+        result, to link the next page with keyset pagination (after=...)
         :return:
         """
 
         ## Type validation
-        # mandatory parameters
-        try:
-            total_count = int(total_count)
-        except ValueError:
-            raise InputValidationError("total_count must be a long integer")
+        # non mandatory parameters
+        if total_count is not None:
+            try:
+                total_count = int(total_count)
+            except ValueError:
+                raise InputValidationError("total_count must be a long integer")
 
         # non mandatory parameters
         if rel_pages is not None and not isinstance(rel_pages, dict):
@@ -363,16 +388,22 @@ class Utils(object):
 
         ## Input consistency
         # rel_pages cannot be defined without url
-        if rel_pages is not None and url is None:
-            raise InputValidationError("'rel_pages' parameter requires 'url' "
+        if (rel_pages is not None or next_after is not None) and url is None:
+            raise InputValidationError("'rel_pages' and 'next_after' "
+                                       "parameters require 'url' "
                                        "parameter to be defined")
 
         headers = {}
+        expose_header = []
 
-        ## Setting mandatory headers
-        # set X-Total-Count
-        headers['X-Total-Count'] = total_count
-        expose_header = ["X-Total-Count"]
+        # set X-Total-Count (or its estimate)
+        if total_count is not None:
+            if count == 'estimate':
+                total_count_header = 'X-Total-Count-Estimate'
+            else:
+                total_count_header = 'X-Total-Count'
+            headers[total_count_header] = total_count
+            expose_header.append(total_count_header)
 
         ## Two auxiliary functions
         def split_url(url):
@@ -406,11 +437,51 @@ class Utils(object):
             else:
                 pass
 
+        # set the link to the next page for keyset pagination
+        if next_after is not None:
+            (path, query_string, question_mark) = split_url(url)
+            fields = [field for field in query_string.split('&')
+                      if field and not field.startswith('after=')]
+            # quote only accepts byte strings with non-ascii characters
+            after_token = self.build_after_token(next_after)
+            if isinstance(after_token, unicode):
+                after_token = after_token.encode('utf-8')
+            fields.append('after=' + quote(after_token, safe=''))
+            headers['Link'] = '<' + path + '?' + '&'.join(fields) + \
+                              '>; rel=next'
+            expose_header.append("Link")
+
         # to expose header access in cross-domain requests
         headers['Access-Control-Expose-Headers'] = ','.join(expose_header)
 
         return headers
 
+    def build_after_token(self, values):
+        """
+        Build the value of the after key of the query string (keyset
+        pagination), such that it is parsed back to the given values.
+
+        :param values: the values of the ordered columns of the last result
+        :return: a string with the comma-separated values
+        """
+        token = []
+        for value in values:
+            if isinstance(value, datetime):
+                token.append(value.isoformat())
+            elif isinstance(value, bool):
+                token.append('true' if value else 'false')
+            elif isinstance(value, (int, long)):
+                token.append(str(value))
+            elif isinstance(value, float):
+                token.append(repr(value))
+            elif isinstance(value, basestring):
+                token.append('"' + value.replace('"', '""') + '"')
+            else:
+                raise InputValidationError("Cannot build the after token for "
+                                           "a value of type {}".format(
+                    type(value)))
+        return ','.join(token)
+
     def build_response(self, status=200, headers=None, data=None):
         """
 
@@ -512,6 +583,8 @@ class Utils(object):
         visformat = None
         filename = None
         rtype = None
+        after = None
+        count = None
 
         ## Count how many time a key has been used for the filters and check if
         # reserved keyword
@@ -579,6 +652,14 @@ class Utils(object):
             raise RestInputValidationError(
                 "You cannot specify rtype more than "
                 "once")
+        if 'after' in field_counts.keys() and field_counts['after'] > 1:
+            raise RestInputValidationError(
+                "You cannot specify after more than "
+                "once")
+        if 'count' in field_counts.keys() and field_counts['count'] > 1:
+            raise RestInputValidationError(
+                "You cannot specify count more than "
+                "once")
 
         ## Extract results
         for field in field_list:
@@ -679,6 +760,29 @@ class Utils(object):
                         "only assignment operator '=' "
                         "is permitted after 'rtype'")
 
+            elif field[0] == 'after':
+                if field[1] == '=':
+                    # Consider value and valueList cases. The datetimes are
+                    # taken exactly, disregarding their precision
+                    if type(field[2]) == list:
+                        after = field[2]
+                    else:
+                        after = [field[2]]
+                    after = [value.dt if isinstance(value, datetime_precision)
+                             else value for value in after]
+                else:
+                    raise RestInputValidationError(
+                        "only assignment operator '=' "
+                        "is permitted after 'after'")
+
+            elif field[0] == 'count':
+                if field[1] == '=':
+                    count = field[2]
+                else:
+                    raise RestInputValidationError(
+                        "only assignment operator '=' "
+                        "is permitted after 'count'")
+
             else:
 
                 ## Construct the filter entry.
@@ -711,7 +815,8 @@ class Utils(object):
         #     limit = self.LIMIT_DEFAULT
 
         return (limit, offset, perpage, orderby, filters, alist, nalist, elist,
-                nelist, downloadformat, visformat, filename, rtype)
+                nelist, downloadformat, visformat, filename, rtype, after,
+                count)
 
     def parse_query_string(self, query_string):
         """
@@ -757,12 +862,13 @@ class Utils(object):
             Literal('-') + Word(nums, exact=2) +
             Literal('-') + Word(nums, exact=2)
         )
-        # Time
+        # Time (seconds can have a fractional part)
         valueTime = Combine(
             Literal('T') +
             Word(nums, exact=2) +
             Optional(Literal(':') + Word(nums, exact=2)) +
-            Optional(Literal(':') + Word(nums, exact=2))
+            Optional(Literal(':') + Word(nums, exact=2) +
+                     Optional(Literal('.') + Word(nums)))
         )
         # Shift
         valueShift = Combine(
@@ -774,9 +880,9 @@ class Utils(object):
         valueDateTime = Combine(
             valueDate +
             Optional(valueTime) +
-            Optional(valueShift) + WE(printables.translate(None, '&'))
+            Optional(valueShift) + WE(printables.translate(None, '&,'))
             # To us the
-            # word must end with '&' or end of the string
+            # word must end with '&', ',' (in lists) or end of the string
             # Adding  WordEnd  only here is very important. This makes atomic
             # values for date, time and shift not really
             # usable alone individually.
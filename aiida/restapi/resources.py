@@ -122,12 +122,14 @@ class BaseResource(Resource):
         (resource_type, page, id, query_type) = self.utils.parse_path(path,
                                                                       parse_pk_uuid=self.parse_pk_uuid)
         (limit, offset, perpage, orderby, filters, alist, nalist, elist,
-         nelist, downloadformat, visformat, filename, rtype) = self.utils.parse_query_string(query_string)
+         nelist, downloadformat, visformat, filename, rtype, after,
+         count) = self.utils.parse_query_string(query_string)
 
         ## Validate request
         self.utils.validate_request(limit=limit, offset=offset, perpage=perpage,
                                     page=page, query_type=query_type,
-                                    is_querystring_defined=(bool(query_string)))
+                                    is_querystring_defined=(bool(query_string)),
+                                    after=after, count=count)
 
         ## Treat the schema case which does not imply access to the DataBase
         if query_type == 'schema':
@@ -142,23 +144,26 @@ class BaseResource(Resource):
             self.trans.set_query(filters=filters, orders=orderby, id=id)
 
             ## Count results
-            total_count = self.trans.get_total_count()
+            total_count = self.trans.get_total_count(count=count)
 
             ## Pagination (if required)
             if page is not None:
                 (limit, offset, rel_pages) = self.utils.paginate(page, perpage,
                                                                  total_count)
                 self.trans.set_limit_offset(limit=limit, offset=offset)
+                ## Retrieve results
+                results = self.trans.get_results()
                 headers = self.utils.build_headers(rel_pages=rel_pages,
                                                    url=request.url,
                                                    total_count=total_count)
             else:
-                self.trans.set_limit_offset(limit=limit, offset=offset)
-                headers = self.utils.build_headers(url=request.url,
-                                                   total_count=total_count)
-
-            ## Retrieve results
-            results = self.trans.get_results()
+                self.trans.set_limit_offset(limit=limit, offset=offset,
+                                            after=after)
+                ## Retrieve results
+                results = self.trans.get_results()
+                headers = self.utils.build_headers(
+                    url=request.url, total_count=total_count, count=count,
+                    next_after=self.trans.get_next_after())
 
         ## Build response and return it
         data = dict(method=request.method,
@@ -209,12 +214,14 @@ class Node(Resource):
         (resource_type, page, id, query_type) = self.utils.parse_path(path, parse_pk_uuid=self.parse_pk_uuid)
 
         (limit, offset, perpage, orderby, filters, alist, nalist, elist,
-         nelist, downloadformat, visformat, filename, rtype) = self.utils.parse_query_string(query_string)
+         nelist, downloadformat, visformat, filename, rtype, after,
+         count) = self.utils.parse_query_string(query_string)
 
         ## Validate request
         self.utils.validate_request(limit=limit, offset=offset, perpage=perpage,
                                     page=page, query_type=query_type,
-                                    is_querystring_defined=(bool(query_string)))
+                                    is_querystring_defined=(bool(query_string)),
+                                    after=after, count=count)
 
         ## Treat the schema case which does not imply access to the DataBase
         if query_type == 'schema':
@@ -227,8 +234,6 @@ class Node(Resource):
 
         ## Treat the statistics
         elif query_type == "statistics":
-            (limit, offset, perpage, orderby, filters, alist, nalist, elist,
-             nelist, downloadformat, visformat, filename, rtype) = self.utils.parse_query_string(query_string)
             headers = self.utils.build_headers(url=request.url, total_count=0)
             if len(filters) > 0:
                 usr = filters["user"]["=="]
@@ -249,7 +254,7 @@ class Node(Resource):
                                  filename=filename, rtype=rtype)
 
             ## Count results
-            total_count = self.trans.get_total_count()
+            total_count = self.trans.get_total_count(count=count)
 
             ## Pagination (if required)
             if page is not None:
@@ -265,7 +270,8 @@ class Node(Resource):
                                                    total_count=total_count)
             else:
 
-                self.trans.set_limit_offset(limit=limit, offset=offset)
+                self.trans.set_limit_offset(limit=limit, offset=offset,
+                                            after=after)
                 ## Retrieve results
                 results = self.trans.get_results()
 
@@ -301,8 +307,9 @@ class Node(Resource):
                         results = results[query_type]["data"]
 
 
-                headers = self.utils.build_headers(url=request.url,
-                                                   total_count=total_count)
+                headers = self.utils.build_headers(
+                    url=request.url, total_count=total_count, count=count,
+                    next_after=self.trans.get_next_after())
 
         ## Build response
         data = dict(method=request.method,
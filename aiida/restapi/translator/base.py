@@ -78,6 +78,13 @@ class BaseTranslator(object):
         #  no specific node is requested
         self._id_filter = None
 
+        # Keyset pagination: the ordered columns of the results, the limit,
+        # and the values of the ordered columns of the last result (when
+        # there might be a next page)
+        self._order_columns = []
+        self._limit = None
+        self._next_after = None
+
         # basic query_help object
         self._query_help = {
             "path": [{
@@ -236,11 +243,24 @@ class BaseTranslator(object):
 
             #    @cache.memoize(timeout=CACHING_TIMEOUTS[self.__label__])
 
-    def get_total_count(self):
+    def get_total_count(self, count=None):
         """
         Returns the number of rows of the query
-        :return: total_count
+
+        :param count: how to compute the count: 'exact' (default) counts the
+            rows, 'estimate' asks the query planner of the database for an
+            estimate (much faster for large tables), 'none' skips the count
+        :return: total_count, or None if the count is skipped
         """
+        if count == 'none':
+            return None
+        elif count == 'estimate':
+            if self._is_qb_initialized:
+                return self.qb.estimate_count()
+            else:
+                raise InvalidOperation("query builder object has not been "
+                                       "initialized.")
+
         ## Count the results if needed
         if not self._total_count:
             self.count()
@@ -332,25 +352,34 @@ class BaseTranslator(object):
             """
             Takes a list of signed column names ex. ['id', '-ctime',
             '+mtime']
-            and transforms it in a order_by compatible dictionary
+            and transforms it in a order_by compatible list of dictionaries,
+            preserving the order of the columns. The pk is appended as last
+            column (if not present), so that the ordering is total and
+            consistent across pages.
             :param columns: (list of strings)
-            :return: a dictionary
+            :return: a list of dictionaries
             """
-            order_dict = {}
+            order_list = []
             for column in columns:
                 if column[0] == '-':
-                    order_dict[column[1:]] = 'desc'
+                    (column, order) = (column[1:], 'desc')
                 elif column[0] == '+':
-                    order_dict[column[1:]] = 'asc'
+                    (column, order) = (column[1:], 'asc')
                 else:
-                    order_dict[column] = 'asc'
-            if order_dict.has_key('pk'):
-                order_dict[pk_dbsynonym] = order_dict.pop('pk')
-            return order_dict
+                    order = 'asc'
+                if column == 'pk':
+                    column = pk_dbsynonym
+                order_list.append({column: order})
+            if not any(pk_dbsynonym in item for item in order_list):
+                order_list.append({pk_dbsynonym: 'asc'})
+            return order_list
 
         ## Assign orderby field query_help
         for tag, columns in orders.iteritems():
             self._query_help['order_by'][tag] = def_order(columns)
+            if tag == self._result_type:
+                self._order_columns = [item.keys()[0] for item in
+                                       self._query_help['order_by'][tag]]
 
     def set_query(self, filters=None, orders=None, projections=None, id=None):
         """
@@ -409,12 +438,15 @@ class BaseTranslator(object):
         """
         return self._query_help
 
-    def set_limit_offset(self, limit=None, offset=None):
+    def set_limit_offset(self, limit=None, offset=None, after=None):
         """
         sets limits and offset directly to the query_builder object
 
         :param limit:
         :param offset:
+        :param after: list with the values of the ordered columns of the
+            last result of the previous page (keyset pagination), to be used
+            instead of the offset for large queries
         :return:
         """
 
@@ -440,6 +472,14 @@ class BaseTranslator(object):
                 raise InputValidationError("Offset value must be an "
                                            "integer")
 
+        if after is not None and len(after) != len(self._order_columns):
+            raise RestInputValidationError("after requires one value for "
+                                           "each of the ordering columns "
+                                           "({})".format(
+                ', '.join(self._order_columns)))
+
+        self._limit = limit
+
         if self._is_qb_initialized:
             if limit is not None:
                 self.qb.limit(limit)
@@ -449,6 +489,10 @@ class BaseTranslator(object):
                 self.qb.offset(offset)
             else:
                 pass
+            if after is not None:
+                self.qb.after(after)
+            else:
+                pass
         else:
             raise InvalidOperation("query builder object has not been "
                                    "initialized.")
@@ -466,9 +510,17 @@ class BaseTranslator(object):
                                    "initialized.")
 
         results = []
-        if self._total_count > 0:
+        # The total count might not have been computed
+        if self._total_count != 0:
             results = [res[label] for res in self.qb.dict()]
 
+        # A full page: there might be a next one, after the last result
+        self._next_after = None
+        if results and len(results) == self._limit and all(
+                column in results[-1] for column in self._order_columns):
+            self._next_after = [results[-1][column] for column in
+                                self._order_columns]
+
         # TODO think how to make it less hardcoded
         if self._result_type == 'input_of':
             return {'inputs': results}
@@ -490,15 +542,21 @@ class BaseTranslator(object):
             raise InvalidOperation("query builder object has not been "
                                    "initialized.")
 
-        ## Count the total number of rows returned by the query (if not
-        # already done)
-        if self._total_count is None:
-            self.count()
-
         ## Retrieve data
         data = self.get_formatted_result(self._result_type)
         return data
 
+    def get_next_after(self):
+        """
+        Returns the values to request the next page with keyset pagination
+        (i.e. the after key of the query string), after get_results()
+
+        :return: a list with the values of the ordered columns of the last
+            result, or None if there is no next page (or if the ordered
+            columns are not projected)
+        """
+        return self._next_after
+
     def _check_id_validity(self, id):
         """
         Checks whether a id full id or id starting pattern) corresponds to
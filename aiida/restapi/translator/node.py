@@ -277,73 +277,16 @@ class NodeTranslator(BaseTranslator):
 
         return data
 
-    def _get_subclasses(self, parent=None, parent_class=None, recursive=True):
+    def _get_subclasses(self):
         """
-        Import all submodules of the package containing the present class,
-        including subpackages recursively, if specified.
-        :parent: package/class. If package look for the classes in submodules.
-            If class, it first looks for the package where it is contained
-        :parent_class: class of which to look for subclasses
-        :recursive: True/False (go recursively into submodules)
+        Return the translators of the subclasses of the present class
+        (including the class itself), taken from the registry of the node
+        translators that is built only once (see get_node_translators)
+        :return: a dictionary {class name: translator class}
         """
-
-        import pkgutil
-        import imp
-        import inspect
-        import os
-
-        # If no parent class is specified set it to self.__class
-        parent = self.__class__ if parent is None else parent
-
-        # Suppose parent is class
-        if inspect.isclass(parent):
-
-            # Set the package where the class is contained
-            classfile = inspect.getfile(parent)
-            package_path = os.path.dirname(classfile)
-
-            # If parent class is not specified, assume it is the parent
-            if parent_class is None:
-                parent_class = parent
-
-        # Suppose parent is a package (directory containing __init__.py).
-        # Check if it contains attribute __path__
-        elif inspect.ismodule(parent) and hasattr(parent, '__path__'):
-
-            # Assume path is one element list
-            package_path = parent.__path__[0]
-
-            # if parent is a package, parent_class cannot be None
-            if parent_class is None:
-                raise TypeError('argument parent_class cannot be None')
-
-                # Recursively check the subpackages
-        results = {}
-
-        for loader, name, is_pkg in pkgutil.walk_packages([package_path]):
-            # N.B. pkgutil.walk_package requires a LIST of paths.
-
-            full_path_base = os.path.join(package_path, name)
-
-            if is_pkg:
-                app_module = imp.load_package(full_path_base, full_path_base)
-            else:
-                full_path = full_path_base + '.py'
-                # I could use load_module but it takes lots of arguments,
-                # then I use load_source
-                app_module = imp.load_source("rst"+name, full_path)
-
-            # Go through the content of the module
-            if not is_pkg:
-                for name, obj in inspect.getmembers(app_module):
-                    if inspect.isclass(obj) and issubclass(obj, parent_class):
-                        results[name] = obj
-            # Look in submodules
-            elif is_pkg and recursive:
-                results.update(self._get_subclasses(parent=app_module,
-                                                    parent_class=parent_class))
-
-        return results
+        return {name: translator for name, translator
+                in get_node_translators().iteritems()
+                if issubclass(translator, self.__class__)}
 
     def get_visualization_data(self, node, format=None):
         """
@@ -606,4 +549,51 @@ class NodeTranslator(BaseTranslator):
                 })
                 nodeCount += 1
 
-        return {"nodes": nodes, "edges": edges}
\ No newline at end of file
+        return {"nodes": nodes, "edges": edges}
+
+
+# The modules of the built-in translators of the subclasses of Node
+_node_translator_modules = (
+    'aiida.restapi.translator.calculation',
+    'aiida.restapi.translator.code',
+    'aiida.restapi.translator.data',
+    'aiida.restapi.translator.data.bands',
+    'aiida.restapi.translator.data.kpoints',
+    'aiida.restapi.translator.data.structure',
+    'aiida.restapi.translator.data.upf',
+)
+
+# Registry of the node translators, built by get_node_translators
+_node_translators = None
+
+
+def get_node_translators():
+    """
+    Return the translators of the Node class and of all its subclasses.
+    The first time it is called, it imports the built-in translators and the
+    ones registered by plugins with the 'aiida.restapi.translators' entry
+    points (that have to be subclasses of NodeTranslator), the following
+    calls return the same registry.
+
+    :return: a dictionary {class name: translator class}
+    """
+    global _node_translators
+
+    if _node_translators is None:
+        import importlib
+        from aiida.common.pluginloader import plugin_list, get_plugin
+
+        for module in _node_translator_modules:
+            importlib.import_module(module)
+        for name in plugin_list('restapi.translators'):
+            get_plugin('restapi.translators', name)
+
+        translators = {}
+        classes = [NodeTranslator]
+        while classes:
+            translator = classes.pop()
+            translators[translator.__name__] = translator
+            classes.extend(translator.__subclasses__())
+        _node_translators = translators
+
+    return _node_translators
@@ -80,6 +80,10 @@ class LocalTransport(Transport):
                                    "it is already closed")
         self._is_open = False
 
+    @property
+    def is_open(self):
+        return self._is_open
+
     def __str__(self):
         """
         Return a description as a string.
@@ -48,6 +48,9 @@ class SshTransport(aiida.transport.Transport):
     """
     Support connection, command execution and data transfer to remote computers via SSH+SFTP.
     """
+    # Interval (in seconds) between keepalive packets sent on open connections
+    _KEEPALIVE_INTERVAL = 30
+
     # Valid keywords accepted by the connect method of paramiko.SSHClient
     # I disable 'password' and 'pkey' to avoid these data to get logged in the
     # aiida log file.
@@ -452,7 +455,7 @@ class SshTransport(aiida.transport.Transport):
         if self._is_open:
             raise InvalidOperation("Cannot open the transport twice")
         # Open a SSHClient
-        connection_arguments = self._connect_args
+        connection_arguments = dict(self._connect_args)
         proxystring = connection_arguments.pop('proxy_command', None)
         if proxystring is not None:
             proxy = paramiko.ProxyCommand(proxystring)
@@ -468,6 +471,10 @@ class SshTransport(aiida.transport.Transport):
                 self._connect_args))
             raise
 
+        # Keep the connection alive, so that it can be reused between batches
+        # of operations without being dropped by firewalls or the server
+        self._client.get_transport().set_keepalive(self._KEEPALIVE_INTERVAL)
+
         # Open also a SFTPClient
         self._sftp = self._client.open_sftp()
         # Set the current directory to a explicit path, and not to None
@@ -495,6 +502,17 @@ class SshTransport(aiida.transport.Transport):
         self._client.close()
         self._is_open = False
 
+    @property
+    def is_open(self):
+        """
+        Whether the SSH connection is open and still alive.
+        """
+        if not self._is_open:
+            return False
+
+        transport = self._client.get_transport()
+        return transport is not None and transport.is_active()
+
     @property
     def sshclient(self):
         if not self._is_open:
@@ -79,6 +79,19 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    @property
+    def is_open(self):
+        """
+        Whether the transport is currently open and usable.  Transports that
+        hold a connection should also check that the connection is still alive.
+
+        By default a transport is never considered open, so that it will not
+        be reused by clients that keep transports open between operations.
+
+        :rtype: bool
+        """
+        return False
+
     def __repr__(self):
         return '<{}: {}>'.format(self.__class__.__name__, str(self))
 
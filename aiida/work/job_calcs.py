@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from collections import namedtuple
+from functools import partial
+import logging
+import threading
+import traceback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JobManager(object):
+    """
+    A manager that coalesces scheduler state requests for job calculations.
+
+    Clients register their interest in the scheduler state of a job by
+    passing the authinfo, the job id and a callback.  Requests for the same
+    authinfo are collected until the transport queue hands over an open
+    transport, at which point the scheduler is queried *once* for all the
+    pending jobs and the resulting :class:`aiida.scheduler.datastructures.JobInfo`
+    objects are passed to each of the interested callbacks.
+
+    If the scheduler query fails the pending requests are retried after a
+    delay, that starts from the safe open interval of the transport and is
+    doubled after every consecutive failure up to ``MAX_BACKOFF`` seconds.
+    Requests arriving in the meantime wait for the same retry.
+    """
+    MIN_BACKOFF = 5.0
+    MAX_BACKOFF = 600.0
+    JobsListEntry = namedtuple("JobsListEntry", ['authinfo', 'callbacks'])
+
+    def __init__(self, transport_queue, loop):
+        """
+        :param transport_queue: The transport queue used to obtain transports
+        :type transport_queue: :class:`aiida.work.transport.TransportQueue`
+        :param loop: The io loop, used to delay the retries of failed queries
+        """
+        super(JobManager, self).__init__()
+
+        self._transport_queue = transport_queue
+        self._loop = loop
+        self._entries = {}
+        # The current retry delay of the authinfos whose last query failed
+        self._backoffs = {}
+        self._entries_lock = threading.Lock()
+
+    def request_job_info_update(self, authinfo, job_id, callback):
+        """
+        Request the scheduler state of a job.  The callback will be called
+        as soon as the next batched scheduler query for the authinfo has
+        completed, while the transport is still open, with the signature::
+
+            callback(authinfo, transport, job_info)
+
+        where ``job_info`` is ``None`` if the scheduler did not report the job.
+
+        :param authinfo: The authinfo of the computer the job is running on
+        :param job_id: The scheduler job id
+        :param callback: The callback function
+        """
+        _LOGGER.debug("Got request for job info of job '{}' with callback '{}'".format(job_id, callback))
+
+        with self._entries_lock:
+            entry = self._entries.get(authinfo.id)
+            if entry is None:
+                entry = self.JobsListEntry(authinfo, {})
+                self._entries[authinfo.id] = entry
+                # Only the first request for this authinfo asks for a transport,
+                # all subsequent ones will be serviced by the same query
+                self._request_transport(authinfo)
+
+            entry.callbacks.setdefault(str(job_id), []).append(callback)
+
+    def get_num_waiting(self):
+        """
+        :return: The total number of callbacks waiting for a job info update
+        """
+        total = 0
+        for entry in self._entries.itervalues():
+            for callbacks in entry.callbacks.itervalues():
+                total += len(callbacks)
+        return total
+
+    def _update_job_infos(self, authinfo_id, authinfo, transport):
+        with self._entries_lock:
+            # Release the entry so that new requests will trigger a new query
+            entry = self._entries.pop(authinfo_id)
+
+        job_ids = entry.callbacks.keys()
+        _LOGGER.debug("Querying scheduler for {} job(s) of authinfo '{}'".format(len(job_ids), authinfo_id))
+
+        try:
+            found_jobs = self._get_jobs_from_scheduler(authinfo, transport, job_ids)
+        except BaseException:
+            backoff = self._next_backoff(authinfo_id, transport)
+            _LOGGER.error(
+                "Querying the scheduler for authinfo '{}' failed, retrying in {:.0f}s:\n{}".format(
+                    authinfo_id, backoff, traceback.format_exc())
+            )
+            self._requeue(entry, backoff)
+            return
+
+        self._backoffs.pop(authinfo_id, None)
+
+        for job_id, callbacks in entry.callbacks.iteritems():
+            job_info = found_jobs.get(job_id, None)
+            for fn in callbacks:
+                try:
+                    fn(authinfo, transport, job_info)
+                except BaseException:
+                    _LOGGER.error(
+                        "Callback '{}' raised exception when passed job info:\n{}".format(
+                            fn, traceback.format_exc())
+                    )
+
+    def _request_transport(self, authinfo):
+        self._transport_queue.call_me_with_transport(
+            authinfo, partial(self._update_job_infos, authinfo.id))
+
+    def _next_backoff(self, authinfo_id, transport):
+        """
+        Get the delay before retrying a failed query for the authinfo: the
+        previous delay doubled, but at least the safe open interval of the
+        transport and at most ``MAX_BACKOFF``.
+
+        :return: The delay in seconds
+        """
+        backoff = max(2. * self._backoffs.get(authinfo_id, 0.), self.MIN_BACKOFF,
+                      transport.get_safe_open_interval())
+        backoff = min(backoff, self.MAX_BACKOFF)
+        self._backoffs[authinfo_id] = backoff
+        return backoff
+
+    def _requeue(self, entry, backoff):
+        """
+        Put the callbacks of an entry back in the queue so that they are
+        serviced by a scheduler query after the given delay.  Requests made
+        in the meantime are added to the same entry.
+
+        :param entry: The entry whose query failed
+        :param backoff: The delay in seconds before asking for a transport
+        """
+        authinfo_id = entry.authinfo.id
+        with self._entries_lock:
+            pending = self._entries.get(authinfo_id)
+            if pending is None:
+                self._entries[authinfo_id] = entry
+                self._loop.call_later(backoff, self._request_transport, entry.authinfo)
+                return
+
+        # A new query was already requested, the callbacks are serviced by it
+        for job_id, callbacks in entry.callbacks.iteritems():
+            for fn in callbacks:
+                self.request_job_info_update(entry.authinfo, job_id, fn)
+
+    @staticmethod
+    def _get_jobs_from_scheduler(authinfo, transport, job_ids):
+        """
+        Get the job infos of the given jobs using a single scheduler query.
+
+        :return: A dictionary of job ids to job infos
+        """
+        from aiida.orm.computer import Computer
+
+        scheduler = Computer(dbcomputer=authinfo.dbcomputer).get_scheduler()
+        scheduler.set_transport(transport)
+
+        if scheduler.get_feature('can_query_by_user'):
+            return scheduler.getJobs(user="$USER", as_dict=True)
+        else:
+            return scheduler.getJobs(jobs=job_ids, as_dict=True)
@@ -39,16 +39,14 @@ class Waiting(plum.Waiting):
 
     def _action_command(self):
         if self.data == SUBMIT_COMMAND:
-            op = self.process._submit_with_transport
+            self._launch_transport_operation(self.process._submit_with_transport)
         elif self.data == UPDATE_SCHEDULER_COMMAND:
-            op = self.process._update_scheduler_state_with_transport
+            self._launch_job_info_update()
         elif self.data == RETRIEVE_COMMAND:
-            op = self.process._retrieve_with_transport
+            self._launch_transport_operation(self.process._retrieve_with_transport)
         else:
             raise RuntimeError("Unknown waiting command")
 
-        self._launch_transport_operation(op)
-
     def _launch_transport_operation(self, operation):
         """
         Schedule a callback to a function that requires transport
@@ -61,6 +59,24 @@ class Waiting(plum.Waiting):
             self.process.runner.transport.call_me_with_transport(
                 self.process._get_authinfo(), fn)
 
+    def _launch_job_info_update(self):
+        """
+        Request the scheduler state of our job, the query is batched with
+        those of all the other jobs waiting on the same authinfo
+        """
+        self.process.runner.job_manager.request_job_info_update(
+            self.process._get_authinfo(), self.process.calc.get_job_id(), self._do_job_info_update)
+
+    def _do_job_info_update(self, authinfo, transport, job_info):
+        # Guard in case we left the state already
+        if self.in_state:
+            try:
+                self.process._update_scheduler_state_with_job_info(authinfo, transport, job_info)
+            except BaseException:
+                import sys
+                exc_info = sys.exc_info()
+                self.process.fail(exc_info[1], exc_info[2])
+
     def _do_transport_operation(self, operation, authinfo, transport):
         # Guard in case we left the state already
         if self.in_state:
@@ -76,6 +92,8 @@ class JobProcess(processes.Process):
     TRANSPORT_OPERATION = 'TRANSPORT_OPERATION'
     CALC_NODE_LABEL = 'calc_node'
     OPTIONS_INPUT_LABEL = '_options'
+    USE_CACHE_INPUT_LABEL = '_use_cache'
+    CACHED_FROM_EXTRA_KEY = '_aiida_cached_from'
     _CALC_CLASS = None
 
     # Class defaults
@@ -107,6 +125,9 @@ class JobProcess(processes.Process):
                 "append_text": unicode,
             }
             spec.input(cls.OPTIONS_INPUT_LABEL, validator=processes.DictSchema(options))
+            spec.input(cls.USE_CACHE_INPUT_LABEL, valid_type=bool, default=False, non_db=True,
+                       help="If an identical calculation already finished, reuse its "
+                            "outputs instead of running on the computer")
 
             # Inputs from use methods
             for k, v in calc_class._use_methods.iteritems():
@@ -194,6 +215,12 @@ class JobProcess(processes.Process):
 
     @override
     def _run(self):
+        if self.inputs.get(self.USE_CACHE_INPUT_LABEL, False):
+            cached_calc = self.calc._get_same_node()
+            if cached_calc is not None:
+                self._use_cached_calc(cached_calc)
+                return
+
         # Put the calculation in the TOSUBMIT state
         self.calc.submit()
         # Launch the submit operation
@@ -201,6 +228,26 @@ class JobProcess(processes.Process):
 
     # endregion
 
+    def _use_cached_calc(self, cached_calc):
+        """
+        Finish the calculation using copies of the outputs of an identical
+        calculation that already finished, instead of running it.
+
+        :param cached_calc: the finished calculation with the same hash
+        """
+        from aiida.common.links import LinkType
+
+        self.logger.info("Using the outputs of the identical calculation {}".format(cached_calc.pk))
+
+        for label, node in cached_calc.get_outputs(also_labels=True, link_type=LinkType.CREATE):
+            output = node.copy()
+            output.add_link_from(self.calc, label, LinkType.CREATE)
+            output.store()
+            self.out(label, output)
+
+        self.calc.set_extra(self.CACHED_FROM_EXTRA_KEY, cached_calc.uuid)
+        self.calc._set_state(calc_states.FINISHED)
+
     def _get_authinfo(self):
         if self._authinfo is None:
             self._authinfo = \
@@ -211,25 +258,21 @@ class JobProcess(processes.Process):
 
     # region Functions that require transport
 
-    def _update_scheduler_state_with_transport(self, authinfo, trans):
+    def _update_scheduler_state_with_job_info(self, authinfo, trans, info):
         """
-        Given a transport this method updates the calculation scheduler state.
-        
+        Given the job info obtained from the scheduler this method updates the
+        calculation scheduler state.
+
         :param authinfo: The authentication info
         :param trans: The (opened) transport
-        :return: True if the job is done, False otherwise 
+        :param info: The job info as returned by the scheduler, None if the
+            job could not be found
         """
         scheduler = self.calc.get_computer().get_scheduler()
         scheduler.set_transport(trans)
 
         job_id = self.calc.get_job_id()
 
-        kwargs = {'jobs': [job_id], 'as_dict': True}
-        if scheduler.get_feature('can_query_by_user'):
-            kwargs['user'] = "$USER"
-        found_jobs = scheduler.getJobs(**kwargs)
-
-        info = found_jobs.get(job_id, None)
         if info is None:
             # If the job is computed or not found assume it's done
             job_done = True
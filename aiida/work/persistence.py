@@ -93,6 +93,81 @@ def _create_storage():
         )
 
 
+class CheckpointFormat(object):
+    """
+    A format used to serialize process checkpoints to a string that can be
+    stored in a node attribute.  Serialized checkpoints start with the
+    ``prefix`` of their format so that they can be loaded whatever the
+    format currently in use.
+    """
+    prefix = None
+
+    def dumps(self, bundle):
+        """
+        Serialize a bundle
+
+        :param bundle: the bundle of the process
+        :return: the serialized checkpoint, without the prefix
+        :rtype: str
+        """
+        raise NotImplementedError
+
+    def loads(self, string):
+        """
+        Deserialize a bundle
+
+        :param string: the serialized checkpoint, without the prefix
+        :return: the bundle
+        """
+        raise NotImplementedError
+
+
+class YamlCheckpointFormat(CheckpointFormat):
+    """
+    Human readable checkpoints, this is also the format of checkpoints that
+    were saved without a prefix.
+    """
+    prefix = 'yaml:'
+
+    def dumps(self, bundle):
+        return yaml.dump(bundle)
+
+    def loads(self, string):
+        return yaml.load(string)
+
+
+class PickleCheckpointFormat(CheckpointFormat):
+    """
+    Compact and fast checkpoints: the bundle is pickled with protocol 2,
+    compressed with zlib and base64 encoded to be stored as a string.
+    """
+    prefix = 'pickle+zlib:'
+
+    def __init__(self, compression_level=1):
+        """
+        :param compression_level: the zlib compression level, from 0 to 9
+        """
+        self._compression_level = compression_level
+
+    def dumps(self, bundle):
+        import base64
+        import cPickle
+        import zlib
+
+        return base64.b64encode(
+            zlib.compress(cPickle.dumps(bundle, 2), self._compression_level))
+
+    def loads(self, string):
+        import base64
+        import cPickle
+        import zlib
+
+        return cPickle.loads(zlib.decompress(base64.b64decode(string)))
+
+
+CHECKPOINT_FORMATS = [PickleCheckpointFormat(), YamlCheckpointFormat()]
+
+
 class AiiDAPersister(plum.Persister):
     """
     This node is responsible to taking saved process instance states and
@@ -100,6 +175,18 @@ class AiiDAPersister(plum.Persister):
     """
     CALC_NODE_CHECKPOINT_KEY = 'checkpoints'
 
+    def __init__(self, checkpoint_format=None):
+        """
+        :param checkpoint_format: the format used to save checkpoints, by
+            default :class:`PickleCheckpointFormat`.  Checkpoints of any of
+            the known formats can be loaded, whatever the format in use.
+        :type checkpoint_format: :class:`CheckpointFormat`
+        """
+        super(AiiDAPersister, self).__init__()
+        if checkpoint_format is None:
+            checkpoint_format = PickleCheckpointFormat()
+        self._checkpoint_format = checkpoint_format
+
     def save_checkpoint(self, process, tag=None):
         if tag is not None:
             raise NotImplementedError("Checkpoint tags not supported yet")
@@ -107,14 +194,32 @@ class AiiDAPersister(plum.Persister):
         bundle = Bundle(process)
         calc = process.calc
         calc._set_attr(self.CALC_NODE_CHECKPOINT_KEY,
-                       yaml.dump(bundle))
+                       self.dumps(bundle))
 
     def load_checkpoint(self, pid, tag=None):
         if tag is not None:
             raise NotImplementedError("Checkpoint tags not supported yet")
 
         calc = orm.load_node(pid)
-        return yaml.load(calc[self.CALC_NODE_CHECKPOINT_KEY])
+        return self.loads(calc[self.CALC_NODE_CHECKPOINT_KEY])
+
+    def dumps(self, bundle):
+        """
+        Serialize a bundle using the checkpoint format of this persister
+        """
+        return self._checkpoint_format.prefix + self._checkpoint_format.dumps(bundle)
+
+    def loads(self, checkpoint):
+        """
+        Deserialize a checkpoint, detecting its format from the prefix.  The
+        format of this persister is tried first, then the built-in formats.
+        """
+        for checkpoint_format in [self._checkpoint_format] + CHECKPOINT_FORMATS:
+            if checkpoint.startswith(checkpoint_format.prefix):
+                return checkpoint_format.loads(checkpoint[len(checkpoint_format.prefix):])
+
+        # Checkpoints saved before formats were introduced are plain YAML
+        return yaml.load(checkpoint)
 
     def get_checkpoints(self):
         """
@@ -6,6 +6,7 @@ import inspect
 import logging
 
 import aiida.orm
+from . import job_calcs
 from . import persistence
 from . import transport
 from . import utils
@@ -17,6 +18,7 @@ _LOGGER = logging.getLogger(__name__)
 
 ResultAndCalcNode = namedtuple("ResultWithPid", ["result", "calc"])
 ResultAndPid = namedtuple("ResultWithPid", ["result", "pid"])
+CalculationPollStats = namedtuple("CalculationPollStats", ["num_polls", "num_failed", "total_time", "last_time"])
 
 _runner = None
 
@@ -94,18 +96,31 @@ class Runner(object):
     _rmq_connector = None
 
     def __init__(self, rmq_config=None, loop=None, poll_interval=5.,
-                 rmq_submit=False, enable_persistence=True, transp=None):
+                 rmq_submit=False, enable_persistence=True, transp=None,
+                 job_manager=None):
         self._loop = loop if loop is not None else plum.new_event_loop()
         self._poll_interval = poll_interval
 
+        # Only close the transport queue if we own it, child runners share it
+        self._close_transport = transp is None
         if transp is None:
             self._transport = transport.TransportQueue(self._loop)
         else:
             self._transport = transp
 
+        if job_manager is None:
+            self._job_manager = job_calcs.JobManager(self._transport, self._loop)
+        else:
+            self._job_manager = job_manager
+
         if enable_persistence:
             self._persister = persistence.AiiDAPersister()
 
+        # The callbacks of the calculations being waited for, keyed by pk
+        self._calculation_callbacks = {}
+        self._polling_calculations = False
+        self._calculation_poll_stats = CalculationPollStats(0, 0, 0., 0.)
+
         self._rmq_submit = rmq_submit
         if rmq_config is not None:
             self._rmq_connector = plum.rmq.RmqConnector(**rmq_config)
@@ -128,6 +143,15 @@ class Runner(object):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    @property
+    def calculation_poll_stats(self):
+        """
+        The number of polls of the calculations being waited for (one query
+        each), how many of them failed, and the total and last time in
+        seconds they took
+        """
+        return self._calculation_poll_stats
+
     @property
     def loop(self):
         return self._loop
@@ -140,6 +164,10 @@ class Runner(object):
     def transport(self):
         return self._transport
 
+    @property
+    def job_manager(self):
+        return self._job_manager
+
     @property
     def persister(self):
         return self._persister
@@ -147,6 +175,8 @@ class Runner(object):
     def close(self):
         if self._rmq_connector is not None:
             self._rmq_connector.close()
+        if self._close_transport:
+            self._transport.close()
 
     def run(self, process, *args, **inputs):
         """
@@ -193,8 +223,22 @@ class Runner(object):
         self._poll_legacy_wf(legacy_wf, callback)
 
     def call_on_calculation_finish(self, pk, callback):
-        calc_node = aiida.orm.load_node(pk=pk)
-        self._poll_calculation(calc_node, callback)
+        """
+        Call the callback with the pk once the calculation has finished.  The
+        states of all the calculations being waited for are polled together.
+
+        :param pk: the pk of the calculation
+        :param callback: the callback function
+        :raise NotExistent: if there is no calculation with this pk
+        """
+        from aiida.orm.calculation import Calculation
+
+        if pk not in self._calculation_callbacks:
+            aiida.orm.load_node(pk=pk, parent_class=Calculation)
+        self._calculation_callbacks.setdefault(pk, []).append(callback)
+        if not self._polling_calculations:
+            self._polling_calculations = True
+            self._loop.add_callback(self._poll_calculations)
 
     def _submit(self, process, *args, **kwargs):
         pass
@@ -208,7 +252,7 @@ class Runner(object):
             runner.close()
 
     def _create_child_runner(self):
-        return Runner(transp=self._transport, **self._kwargs)
+        return Runner(transp=self._transport, job_manager=self._job_manager, **self._kwargs)
 
     def _poll_legacy_wf(self, workflow, callback):
         if workflow.has_finished_ok() or workflow.has_failed():
@@ -216,8 +260,78 @@ class Runner(object):
         else:
             self._loop.call_later(self._poll_interval, self._poll_legacy_wf, workflow, callback)
 
-    def _poll_calculation(self, calc_node, callback):
-        if calc_node.has_finished():
-            self._loop.add_callback(callback, calc_node.pk)
-        else:
-            self._loop.call_later(self._poll_interval, self._poll_calculation, calc_node, callback)
+    def _poll_calculations(self):
+        """
+        Check which of the calculations being waited for have finished, using
+        a single query that also projects their states, and call their
+        callbacks. Calculations that no longer exist are no longer waited for.
+        Polling is rescheduled even if the query fails.
+        """
+        import time
+
+        start = time.time()
+        failed = True
+        try:
+            finished, missing = self._get_finished_calculations(self._calculation_callbacks.keys())
+            failed = False
+
+            _LOGGER.debug("Polled {} calculation(s) in {:.3f}s, {} finished".format(
+                len(self._calculation_callbacks), time.time() - start, len(finished)))
+
+            for pk in missing:
+                _LOGGER.error("Calculation {} no longer exists, its {} callback(s) will not be called".format(
+                    pk, len(self._calculation_callbacks.pop(pk))))
+
+            for pk in finished:
+                for callback in self._calculation_callbacks.pop(pk):
+                    self._loop.add_callback(callback, pk)
+        finally:
+            elapsed = time.time() - start
+            stats = self._calculation_poll_stats
+            self._calculation_poll_stats = CalculationPollStats(
+                stats.num_polls + 1, stats.num_failed + int(failed), stats.total_time + elapsed, elapsed)
+
+            if self._calculation_callbacks:
+                self._loop.call_later(self._poll_interval, self._poll_calculations)
+            else:
+                self._polling_calculations = False
+
+    @staticmethod
+    def _get_finished_calculations(pks):
+        """
+        Return the pks of the given calculations that have finished. The
+        state of job calculations is read from their 'state' attribute, that
+        of the other calculations from their process state attribute, as
+        their has_finished() methods do, without a query per calculation.
+
+        :param pks: the pks of the calculations
+        :return: a tuple with the list of the pks of the calculations that
+            have finished and the list of those that do not exist
+        """
+        from aiida.common.datastructures import calc_states
+        from aiida.orm.calculation import Calculation
+        from aiida.orm.calculation.job import JobCalculation
+        from aiida.orm.calculation.work import WorkCalculation
+        from aiida.orm.querybuilder import QueryBuilder
+
+        job_finished_states = (calc_states.FINISHED, calc_states.SUBMISSIONFAILED,
+                               calc_states.RETRIEVALFAILED, calc_states.PARSINGFAILED,
+                               calc_states.FAILED)
+        process_finished_states = (plum.ProcessState.FINISHED.value, plum.ProcessState.FAILED.value,
+                                   plum.ProcessState.CANCELLED.value)
+
+        qb = QueryBuilder()
+        qb.append(Calculation, filters={'id': {'in': pks}},
+                  project=['id', 'type', 'attributes.state',
+                           'attributes.{}'.format(WorkCalculation.PROCESS_STATE_KEY)])
+
+        finished = []
+        missing = set(pks)
+        for pk, type_, state, process_state in qb.iterall():
+            missing.discard(pk)
+            if type_.startswith(JobCalculation._query_type_string):
+                if state in job_finished_states:
+                    finished.append(pk)
+            elif process_state in process_finished_states:
+                finished.append(pk)
+        return finished, list(missing)
@@ -1,6 +1,7 @@
 from collections import namedtuple
 import logging
 import threading
+import time
 import traceback
 
 _LOGGER = logging.getLogger(__name__)
@@ -16,20 +17,39 @@ class TransportQueue(object):
     it will open the transport and give it to all the clients that asked for it
     up to that point.  This way opening of transports (a costly operation) can
     be minimised.
+
+    Once opened, a transport is kept open for ``idle_timeout`` seconds after the
+    last batch of callbacks has been serviced, so that requests arriving in the
+    meantime reuse the existing connection.  An open transport is handed out
+    at most once every ``interval`` seconds, or every safe open interval of the
+    transport if it is shorter, so that clients that ask again as soon as they
+    are serviced (e.g. to poll a scheduler) do not end up in a busy loop.  If
+    the connection was dropped in the meantime a new transport is opened, once
+    again honouring the safe open interval of the transport.
     """
     DEFAULT_INTERVAL = 30.0
+    DEFAULT_IDLE_TIMEOUT = 60.0
     AuthinfoEntry = namedtuple("AuthinfoEntry", ['authinfo', 'transport', 'callbacks', 'callback_handle'])
+    OpenTransport = namedtuple("OpenTransport", ['transport', 'use_count'])
 
-    def __init__(self, loop=None, interval=DEFAULT_INTERVAL):
+    def __init__(self, loop=None, interval=DEFAULT_INTERVAL, idle_timeout=DEFAULT_IDLE_TIMEOUT):
         """
         :param loop: The io loop
-        :param interval: The callback interval in seconds
+        :param interval: The minimum interval in seconds between two batches of
+            callbacks serviced with the same open transport, bounded by the safe
+            open interval of the transport
+        :param idle_timeout: The time in seconds an unused transport is kept open,
+            if 0. transports are closed as soon as the callbacks are done
         """
         super(TransportQueue, self).__init__()
 
         self._loop = loop
         self._entries = {}
+        self._open_transports = {}
+        # The time at which the callbacks of each authinfo were last serviced
+        self._last_used = {}
         self._interval = interval
+        self._idle_timeout = idle_timeout
         self._entries_lock = threading.Lock()
 
         self._callback_handle = None
@@ -40,35 +60,119 @@ class TransportQueue(object):
         with self._entries_lock:
             self._get_or_create_entry(authinfo).callbacks.append(callback)
 
+    def close(self):
+        """
+        Close all the transports that are being kept open
+        """
+        for authinfo_id in list(self._open_transports.keys()):
+            self._close_transport(authinfo_id)
+
     def _get_or_create_entry(self, authinfo):
         if authinfo.id in self._entries:
             return self._entries[authinfo.id]
 
-        transport = authinfo.get_transport()
-
-        # Check if the transport is happy to be opened with any frequency
-        safe_open_interval = transport.get_safe_open_interval()
-        if safe_open_interval == 0.:
-            callback_handle = self._loop.add_callback(self._do_callback, authinfo.id)
+        transport = self._get_open_transport(authinfo.id)
+        if transport is not None:
+            # Reuse the connection that is already open, but not more often
+            # than the interval: there is no point in waiting longer than it
+            # would take to open a new transport
+            interval = min(self._interval, transport.get_safe_open_interval())
+            delay = self._last_used.get(authinfo.id, 0.) + interval - time.time()
+            if delay <= 0.:
+                callback_handle = self._loop.add_callback(self._do_callback, authinfo.id)
+            else:
+                callback_handle = self._loop.call_later(delay, self._do_callback, authinfo.id)
         else:
-            # Ok, we have to use a delay
-            callback_handle = self._loop.call_later(safe_open_interval, self._do_callback, authinfo.id)
+            transport = authinfo.get_transport()
+
+            # Check if the transport is happy to be opened with any frequency
+            safe_open_interval = transport.get_safe_open_interval()
+            if safe_open_interval == 0.:
+                callback_handle = self._loop.add_callback(self._do_callback, authinfo.id)
+            else:
+                # Ok, we have to use a delay
+                callback_handle = self._loop.call_later(safe_open_interval, self._do_callback, authinfo.id)
 
         entry = self.AuthinfoEntry(authinfo, transport, [], callback_handle)
         self._entries[authinfo.id] = entry
 
         return entry
 
+    def _get_open_transport(self, authinfo_id):
+        """
+        Get the transport being kept open for the authinfo, if there is one and
+        it is still alive.
+
+        :return: The open transport or None
+        """
+        open_transport = self._open_transports.get(authinfo_id)
+        if open_transport is None:
+            return None
+
+        if not open_transport.transport.is_open:
+            _LOGGER.debug("Transport for authinfo '{}' was dropped, a new one will be opened".format(authinfo_id))
+            self._close_transport(authinfo_id)
+            return None
+
+        return open_transport.transport
+
     def _do_callback(self, authinfo_id):
-        entry = self._entries.pop(authinfo_id)
-        with entry.transport:
+        with self._entries_lock:
+            entry = self._entries.pop(authinfo_id)
+            self._last_used[authinfo_id] = time.time()
+
+        transport = entry.transport
+        use_count = self._keep_open(authinfo_id, transport)
+
+        with transport:
             for fn in entry.callbacks:
                 _LOGGER.debug("Passing transport to {}...".format(fn))
                 try:
-                    fn(entry.authinfo, entry.transport)
+                    fn(entry.authinfo, transport)
                 except BaseException:
                     _LOGGER.error(
                         "Callback '{}' raised exception when passed transport:\n{}".format(
                             fn, traceback.format_exc())
                     )
                 _LOGGER.debug("...callback finished")
+
+        if self._idle_timeout > 0.:
+            self._loop.call_later(self._idle_timeout, self._close_if_idle, authinfo_id, use_count)
+        else:
+            self._close_transport(authinfo_id)
+
+    def _keep_open(self, authinfo_id, transport):
+        """
+        Register the transport as open for the authinfo, opening it if necessary.
+
+        :return: The number of times the open transport has been used
+        """
+        open_transport = self._open_transports.get(authinfo_id)
+        if open_transport is None or open_transport.transport is not transport:
+            # Hold the transport open outside of the scope of the callbacks
+            transport.__enter__()
+            use_count = 1
+        else:
+            use_count = open_transport.use_count + 1
+
+        self._open_transports[authinfo_id] = self.OpenTransport(transport, use_count)
+        return use_count
+
+    def _close_if_idle(self, authinfo_id, use_count):
+        open_transport = self._open_transports.get(authinfo_id)
+        if open_transport is not None and open_transport.use_count == use_count \
+                and authinfo_id not in self._entries:
+            self._close_transport(authinfo_id)
+
+    def _close_transport(self, authinfo_id):
+        open_transport = self._open_transports.pop(authinfo_id, None)
+        if open_transport is None:
+            return
+
+        _LOGGER.debug("Closing transport for authinfo '{}'".format(authinfo_id))
+        try:
+            open_transport.transport.__exit__(None, None, None)
+        except BaseException:
+            _LOGGER.warning(
+                "Closing transport for authinfo '{}' failed:\n{}".format(authinfo_id, traceback.format_exc())
+            )
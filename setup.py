@@ -85,6 +85,7 @@ if __name__ == '__main__':
                 'local = aiida.transport.plugins.local:LocalTransport',
             ],
             'aiida.workflows': [],
+            'aiida.restapi.translators': [],
             'aiida.tools.dbexporters': [
                 'tcod = aiida.tools.dbexporters.tcod'
             ],